@@ -1,11 +1,37 @@
-from flask import Flask, jsonify, request, send_from_directory
+# Patch for ASYNC_MODE before anything imports socket or threading (config's dotenv pulls in logging)
+import async_runtime
+async_runtime.patch()
+
+from config import Config
+if Config.ASYNC_MODE != async_runtime.async_mode():
+    raise RuntimeError("ASYNC_MODE must be set in the process environment, not only in .env: "
+                       "the standard library is patched before .env is read")
+async_runtime.configure_pools({"cpu": Config.CPU_EXECUTOR_WORKERS, "video": Config.VIDEO_EXECUTOR_WORKERS})
+
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 from datetime import datetime
+import base64
+import logging
 import os
-from config import Config
+import http_client
+from async_runtime import offload
+from logging_config import configure_logging, dropped_records
+from warmup import Readiness, start_warmup
 from utils import ensure_upload_folder
-from services.realtime_detection import RealtimeBodyDetector
+from services.detector_pool import DetectorPool, DetectorPoolFullError
+from services.frame_metrics import FrameMetrics
+from services.realtime_detection import (
+    RealtimeBodyDetector, FRAME_TRANSPORTS, TRANSPORT_BASE64, TRANSPORT_BINARY, CLEAN_FRAME_MODES,
+    CLEAN_FRAME_ECHO, RENDER_MODES, RENDER_IMAGE, DETECTION_PROFILES, DEFAULT_DETECTION_MODE
+)
+from services.frame_queue import FrameDispatcher
+from services.inference_pool import InferencePool
+from services.body_detection import configure_video_scan
+from services.capture_stability import StabilityDetector
+from services.rate_control import RateController
+from services.session_store import create_session_store
 
 # Import blueprints
 from routes.garments import garments_bp
@@ -14,26 +40,142 @@ from routes.tryon import tryon_bp
 from routes.interview import interview_bp
 from routes.recommendations import recommendations_bp
 
-def create_app():
-    """Create and configure the Flask application"""
+logger = logging.getLogger(__name__)
+
+def create_app(session_store=None, warmup=None):
+    """
+    Create and configure the Flask application
+    
+    Args:
+        session_store: Shared SessionStore to use instead of the one named by
+            SESSION_STORE_URL (tests pass one store to several app instances)
+        warmup: Start background warm-up (defaults to WARMUP_ENABLED)
+    """
+    # Queue-backed logging so request and frame threads never block on stdout
+    configure_logging(Config.LOG_LEVEL, Config.LOG_QUEUE_SIZE)
+    
     app = Flask(__name__)
     
     # Configure CORS for development - more permissive
     CORS(app, origins=["*"])
     
-    # Configure SocketIO
-    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+    # Configure SocketIO - "eventlet"/"gevent" for production, "threading" for development.
+    # With a message queue, emits reach clients connected to any node.
+    socketio = SocketIO(
+        app,
+        cors_allowed_origins="*",
+        async_mode=Config.ASYNC_MODE,
+        message_queue=Config.SOCKETIO_MESSAGE_QUEUE or None
+    )
     
     # Configure upload folder
     ensure_upload_folder()
     app.config['UPLOAD_FOLDER'] = Config.UPLOAD_FOLDER
     app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
     
-    # Initialize real-time body detector
-    detector = RealtimeBodyDetector()
+    # Optionally move pose inference into worker processes to use every core
+    inference_pool = None
+    if Config.INFERENCE_WORKERS > 0 and Config.ASYNC_MODE != 'threading':
+        # Its result collector and multiprocessing queues need native threads
+        logger.warning("INFERENCE_WORKERS is only supported with ASYNC_MODE=threading; running inference in-process")
+    elif Config.INFERENCE_WORKERS > 0:
+        inference_pool = InferencePool(
+            num_workers=Config.INFERENCE_WORKERS,
+            max_width=Config.INFERENCE_MAX_WIDTH,
+            max_height=Config.INFERENCE_MAX_HEIGHT,
+            graphs_per_worker=max(1, -(-Config.DETECTOR_POOL_MAX_SIZE // Config.INFERENCE_WORKERS))
+        )
+    app.inference_pool = inference_pool
+    
+    # Split uploaded video scans across worker processes
+    scan_workers = Config.VIDEO_SCAN_WORKERS
+    if scan_workers > 1 and Config.ASYNC_MODE != 'threading':
+        # Waiting on process pool futures needs native threads too
+        logger.warning("VIDEO_SCAN_WORKERS is only supported with ASYNC_MODE=threading; scanning videos in-process")
+        scan_workers = 1
+    configure_video_scan(
+        workers=scan_workers,
+        min_chunk_frames=Config.VIDEO_SCAN_MIN_CHUNK_FRAMES,
+        samples=Config.VIDEO_SCAN_SAMPLES,
+        time_budget=Config.VIDEO_SCAN_TIME_BUDGET,
+        seek_seconds=Config.VIDEO_SCAN_SEEK_SECONDS,
+        work_size=Config.VIDEO_SCAN_WORK_SIZE,
+        coarse_size=Config.VIDEO_SCAN_COARSE_SIZE,
+        candidates=Config.VIDEO_SCAN_CANDIDATES,
+        refine_radius=Config.VIDEO_SCAN_REFINE_RADIUS
+    )
+    
+    def forget_evicted_session(sid):
+        """Drop the per-session state an idle-evicted session leaves outside the pool"""
+        logger.info("Evicted idle session: %s", sid, extra={"event": "stream_lifecycle"})
+        frame_dispatcher.discard(sid)
+        rate_controller.remove(sid)
+        frame_metrics.remove_session(sid)
+    
+    # Initialize per-session real-time body detector pool
+    detector_pool = DetectorPool(
+        max_size=Config.DETECTOR_POOL_MAX_SIZE,
+        idle_timeout=Config.DETECTOR_IDLE_TIMEOUT,
+        on_evict=forget_evicted_session,
+        factory=lambda: RealtimeBodyDetector(
+            inference_pool=inference_pool,
+            motion_threshold=Config.MOTION_THRESHOLD,
+            max_motion_skips=Config.MAX_MOTION_SKIPS,
+            best_frame_candidates=Config.BEST_FRAME_CANDIDATES,
+            decode_min_size=Config.DECODE_MIN_SIZE,
+            stability=StabilityDetector(
+                required_valid=Config.CAPTURE_STABLE_FRAMES,
+                window=Config.CAPTURE_WINDOW,
+                max_jitter=Config.CAPTURE_MAX_JITTER
+            )
+        )
+    )
+    
+    # Store detector pool for access from endpoints
+    app.detector_pool = detector_pool
+    
+    # Best frames and stats shared across nodes, so any node can answer for any session
+    if session_store is None:
+        session_store = create_session_store(Config.SESSION_STORE_URL, ttl=Config.SESSION_STORE_TTL)
+    app.session_store = session_store
+    
+    # Per-stage timings for the realtime path, exported at /metrics
+    frame_metrics = FrameMetrics(window=Config.METRICS_SESSION_WINDOW)
+    app.frame_metrics = frame_metrics
     
-    # Store detector instance for access from endpoints
-    app.detector = detector
+    # Capture-rate hints from measured per-session cost and global load
+    rate_controller = RateController(
+        workers=min(Config.FRAME_WORKERS, Config.CPU_EXECUTOR_WORKERS),
+        min_fps=Config.RATE_HINT_MIN_FPS,
+        headroom=Config.RATE_HINT_HEADROOM,
+        interval=Config.RATE_HINT_INTERVAL
+    )
+    app.rate_controller = rate_controller
+    
+    # Warm the detector graphs, MongoDB and outbound HTTP pools in the background;
+    # /ready turns 200 once they're all done, /health answers immediately
+    readiness = Readiness(["detector", "mongo", "http"])
+    app.readiness = readiness
+    
+    def warm_detectors():
+        # Graph setup is CPU-bound, so keep it off the event loop in eventlet/gevent mode
+        added = offload(detector_pool.warm, Config.WARMUP_DETECTORS)
+        return f"{added} idle detector(s) warmed"
+    
+    def ping_mongo():
+        from models import mongo_client
+        mongo_client.admin.command('ping')
+        return "ping ok"
+    
+    if warmup is None:
+        warmup = Config.WARMUP_ENABLED
+    if warmup:
+        start_warmup(readiness, [
+            ("detector", warm_detectors),
+            ("mongo", ping_mongo),
+            # Best effort: an unreachable API is reported but doesn't hold the node back
+            ("http", lambda: http_client.warm(Config.WARMUP_HTTP_URLS))
+        ], retry_interval=Config.WARMUP_RETRY_INTERVAL)
     
     # Register blueprints
     app.register_blueprint(garments_bp, url_prefix='/api')
@@ -70,76 +212,231 @@ def create_app():
     @socketio.on('connect')
     def handle_connect():
         """Handle client connection"""
-        print(f"Client connected: {request.sid}")
+        logger.info("Client connected: %s", request.sid, extra={"event": "stream_lifecycle"})
         emit('connected', {'status': 'connected', 'message': 'Connected to real-time body detection service'})
     
     @socketio.on('disconnect')
     def handle_disconnect():
         """Handle client disconnection"""
-        print(f"Client disconnected: {request.sid}")
+        logger.info("Client disconnected: %s", request.sid, extra={"event": "stream_lifecycle"})
+        # Releasing resets the detector, so its running frame has to finish first
+        if frame_dispatcher.discard(request.sid, wait=True, timeout=Config.FRAME_DRAIN_TIMEOUT):
+            detector_pool.release(request.sid)
+        else:
+            # Still busy: leave the detector to idle eviction rather than recycle it under the worker
+            logger.warning("Frame for %s still running after disconnect; leaving its detector to idle eviction",
+                           request.sid, extra={"event": "stream_lifecycle"})
+        frame_metrics.remove_session(request.sid)
+        rate_controller.remove(request.sid)
+    
+    def stream_option(data, key, allowed, default):
+        """Read a negotiated stream option, falling back to the default for unknown values"""
+        value = data.get(key, default)
+        return value if value in allowed else default
     
     @socketio.on('start_stream')
     def handle_start_stream(data):
         """Handle stream start request"""
         try:
-            print(f"Starting stream for client: {request.sid}")
-            detector.reset()  # Reset detection state
+            logger.info("Starting stream for client: %s", request.sid, extra={"event": "stream_lifecycle"})
+            detector = detector_pool.acquire(request.sid)
+            # Old clients don't send these and keep the base64, server-rendered path
+            transport = stream_option(data, 'transport', FRAME_TRANSPORTS, TRANSPORT_BASE64)
+            clean_frame_mode = stream_option(data, 'clean_frame_mode', CLEAN_FRAME_MODES, CLEAN_FRAME_ECHO)
+            render_mode = stream_option(data, 'render_mode', RENDER_MODES, RENDER_IMAGE)
+            detection_mode = stream_option(data, 'detection_mode', DETECTION_PROFILES, DEFAULT_DETECTION_MODE)
+            confidence_threshold = float(data.get('confidence_threshold', 0.7))
+            include_timings = bool(data.get('include_timings', False))
+            frame_rate = float(data.get('frame_rate', 15))
+            auto_capture = bool(data.get('auto_capture', False))
+            # Frames sent until the detector is reset and reconfigured are dropped, not run against it
+            frame_dispatcher.pause(request.sid)
+            try:
+                # Drop queued frames and wait out the running one: reset() must not race process_frame
+                if not frame_dispatcher.discard(request.sid, wait=True, timeout=Config.FRAME_DRAIN_TIMEOUT):
+                    raise TimeoutError("previous frame is still being processed")
+                offload(detector.reset)  # Reset this session's detection state
+                session_store.clear(request.sid)
+                detector.configure(
+                    transport=transport,
+                    clean_frame_mode=clean_frame_mode,
+                    render_mode=render_mode,
+                    detection_mode=detection_mode,
+                    confidence_threshold=confidence_threshold,
+                    include_timings=include_timings,
+                    auto_capture=auto_capture
+                )
+            finally:
+                frame_dispatcher.resume(request.sid)
+            rate_controller.start(request.sid, frame_rate, frame_dispatcher.stats(request.sid))
             emit('stream_started', {
                 'status': 'success',
                 'message': 'Real-time body detection stream started',
-                'detection_mode': data.get('detection_mode', 'realtime'),
-                'confidence_threshold': data.get('confidence_threshold', 0.7)
+                'transport': transport,
+                'clean_frame_mode': clean_frame_mode,
+                'render_mode': render_mode,
+                'detection_mode': detection_mode,
+                'confidence_threshold': confidence_threshold,
+                'include_timings': include_timings,
+                'frame_rate': frame_rate,
+                'auto_capture': auto_capture,
+                'profile': detector.profile,
+                'session_id': request.sid
             })
+        except DetectorPoolFullError as e:
+            logger.warning("Rejecting stream for client %s: %s", request.sid, e, extra={"event": "stream_lifecycle"})
+            emit('stream_error', {'error': f'Server is at capacity: {str(e)}'})
         except Exception as e:
-            print(f"Error starting stream: {str(e)}")
+            logger.error("Error starting stream: %s", e)
             emit('stream_error', {'error': f'Failed to start stream: {str(e)}'})
     
+    def process_session_frame(sid, queued_frame, queue_stats):
+        """Process a queued frame on a worker thread and emit the result to its session"""
+        frame_data, frame_id = queued_frame
+        detector = detector_pool.get(sid)
+        if detector is None or detector.capture_complete:
+            return  # Session ended, or already captured, while the frame was queued
+        
+        logger.debug("🔄 Processing frame from client %s", sid, extra={"event": "frame_received"})
+        
+        try:
+            # Process frame with body detection on a native thread (CPU-bound)
+            result = offload(detector.process_frame, frame_data)
+        except Exception as e:
+            logger.exception("Error processing frame: %s", e, extra={"event": "frame_error"})
+            frame_metrics.observe_error()
+            socketio.emit('frame_error', {'error': f'Frame processing error: {str(e)}'}, to=sid)
+            return
+        
+        if 'error' in result:
+            logger.warning("❌ Frame processing error: %s", result['error'], extra={"event": "frame_error"})
+            frame_metrics.observe_error()
+            socketio.emit('frame_error', result, to=sid)
+        else:
+            logger.info("✅ Frame processed successfully - Confidence: %.3f", result['confidence'],
+                        extra={"event": "frame_processed"})
+            timings = result['timings']
+            frame_metrics.observe(sid, dict(timings, queue_wait=queue_stats['queue_wait_ms']))
+            publish_session_state(sid, detector, result, queue_stats)
+            # Send both annotated frame (for display) and clean frame (for try-on) back to client
+            payload = {
+                'annotated_frame': result['annotated_frame'],  # None in "vector" render mode, unannotated if the profile doesn't draw
+                'clean_frame': result['clean_frame'],  # Client's original frame, or None in "omit" mode
+                'confidence': result['confidence'],
+                'meets_threshold': result['meets_threshold'],  # confidence >= the session's confidence_threshold
+                'frame_number': result['frame_number'],
+                'timestamp': result['timestamp'],
+                'detection_quality': result['detection_quality'],
+                'essential_landmarks': result['essential_landmarks'],
+                'full_body_validation': result.get('full_body_validation'),
+                'frame_size': result['frame_size'],  # Pixel space of essential_landmarks
+                'motion_skipped': result['motion_skipped'],  # Pose reused from a near-identical frame
+                # Backpressure counters - frames replaced by newer ones or skipped for age
+                'dropped_frames': queue_stats['dropped_frames'],
+                'stale_frames': queue_stats['stale_frames'],
+                'queue_wait_ms': queue_stats['queue_wait_ms']
+            }
+            if frame_id is not None:
+                payload['frame_id'] = frame_id  # Echoed so clients can measure round-trip latency
+            if detector.include_timings:
+                payload['timings'] = timings  # Per-stage milliseconds, opted into in start_stream
+            socketio.emit('annotated_frame', payload, to=sid)
+            # Ask the client to capture slower (or faster again) to match server load
+            hint = rate_controller.observe(sid, timings['total'], queue_stats)
+            if hint is not None:
+                socketio.emit('rate_hint', hint, to=sid)
+            if result['capture_complete']:
+                complete_capture(sid, detector)
+    
+    def complete_capture(sid, detector):
+        """Send an auto_capture session its frozen best frame and tell it to stop streaming"""
+        frame_dispatcher.discard(sid)
+        rate_controller.remove(sid)
+        best = detector.best_frames.best()
+        logger.info("Capture complete for client %s after %d frames", sid, detector.frame_count,
+                    extra={"event": "stream_lifecycle"})
+        if detector.transport == TRANSPORT_BINARY:
+            best_frame = best['frame']
+        else:
+            best_frame = detector.best_frames.best_data_url()
+        socketio.emit('capture_complete', {
+            'best_frame': best_frame,  # Clean frame for try-on, in the session's transport
+            'confidence': best['confidence'],
+            'is_valid': best['is_valid'],
+            'score': best['score'],
+            'frame_count': detector.frame_count,
+            'jitter': detector.stability.jitter,
+            'session_id': sid,
+            'stop_streaming': True  # No further frames are processed for this stream
+        }, to=sid)
+    
+    def publish_session_state(sid, detector, result, queue_stats):
+        """Mirror a session's best frame and stats into the shared store"""
+        try:
+            if result['best_frame_changed']:
+                best = detector.best_frames.best()
+                if best is not None:
+                    session_store.put_best_frame(sid, best['frame'], {
+                        'confidence': best['confidence'],
+                        'is_valid': best['is_valid'],
+                        'score': best['score']
+                    })
+            elif result['frame_number'] % Config.SESSION_STATS_INTERVAL != 0:
+                return
+            session_store.put_stats(sid, {
+                'node': Config.NODE_ID,
+                'frame_count': detector.frame_count,
+                'best_confidence': detector.best_confidence,
+                'detection_mode': detector.detection_mode,
+                'dropped_frames': queue_stats['dropped_frames'],
+                'stale_frames': queue_stats['stale_frames'],
+                'updated_at': datetime.utcnow().isoformat()
+            })
+        except Exception as e:
+            logger.error("Error publishing session state: %s", e, extra={"event": "frame_error"})
+    
+    # Latest-frame-wins queue so slow inference never builds up a backlog
+    frame_dispatcher = FrameDispatcher(
+        process_session_frame,
+        num_workers=Config.FRAME_WORKERS,
+        max_frame_age=Config.FRAME_MAX_AGE
+    )
+    app.frame_dispatcher = frame_dispatcher
+    
     @socketio.on('video_frame')
     def handle_video_frame(data):
-        """Handle incoming video frame for real-time processing"""
+        """Queue an incoming video frame for real-time processing"""
         try:
             frame_data = data.get('frame')
             if not frame_data:
                 emit('frame_error', {'error': 'No frame data provided'})
                 return
             
-            print(f"🔄 Processing frame from client {request.sid}")
-            
-            # Process frame with body detection
-            result = detector.process_frame(frame_data)
-            
-            if 'error' in result:
-                print(f"❌ Frame processing error: {result['error']}")
-                emit('frame_error', result)
-            else:
-                print(f"✅ Frame processed successfully - Confidence: {result['confidence']:.3f}")
-                # Send both annotated frame (for display) and clean frame (for try-on) back to client
-                emit('annotated_frame', {
-                    'annotated_frame': result['annotated_frame'],
-                    'clean_frame': result['clean_frame'],  # Clean frame without annotations for try-on
-                    'confidence': result['confidence'],
-                    'frame_number': result['frame_number'],
-                    'timestamp': result['timestamp'],
-                    'detection_quality': result['detection_quality'],
-                    'essential_landmarks': result['essential_landmarks'],
-                    'full_body_validation': result.get('full_body_validation')
-                })
+            # Make sure the session has a detector before queueing work for it
+            detector = detector_pool.acquire(request.sid)
+            if detector.capture_complete:
+                return  # Already captured; frames still in flight from the client are ignored
+            frame_dispatcher.submit(request.sid, (frame_data, data.get('frame_id')))
                 
+        except DetectorPoolFullError as e:
+            emit('frame_error', {'error': f'Server is at capacity: {str(e)}'})
         except Exception as e:
-            print(f"Error processing frame: {str(e)}")
+            logger.error("Error queueing frame: %s", e, extra={"event": "frame_error"})
             emit('frame_error', {'error': f'Frame processing error: {str(e)}'})
     
     @socketio.on('stop_stream')
     def handle_stop_stream():
         """Handle stream stop request"""
         try:
-            print(f"Stopping stream for client: {request.sid}")
+            logger.info("Stopping stream for client: %s", request.sid, extra={"event": "stream_lifecycle"})
+            frame_dispatcher.discard(request.sid)
+            rate_controller.remove(request.sid)
             emit('stream_stopped', {
                 'status': 'success',
                 'message': 'Real-time body detection stream stopped'
             })
         except Exception as e:
-            print(f"Error stopping stream: {str(e)}")
+            logger.error("Error stopping stream: %s", e)
             emit('stream_error', {'error': f'Failed to stop stream: {str(e)}'})
     
     # Health check endpoint
@@ -175,12 +472,14 @@ def create_app():
             },
             "test_endpoints": {
                 "test_video_download": "GET /api/test-body-detection",
-                "test_body_detection_full": "POST /api/test-body-detection"
+                "test_body_detection_full": "POST /api/test-body-detection",
+                "metrics": "GET /metrics",
+                "readiness": "GET /ready"
             },
             "websocket_endpoints": {
                 "connect": "WebSocket connection to /",
                 "start_stream": "Emit 'start_stream' event",
-                "video_frame": "Emit 'video_frame' event with frame data",
+                "video_frame": "Emit 'video_frame' event with frame data (JPEG bytes when start_stream negotiated transport 'binary') and an optional frame_id echoed back",
                 "stop_stream": "Emit 'stop_stream' event"
             }
         })
@@ -194,43 +493,103 @@ def create_app():
             "timestamp": datetime.utcnow().isoformat()
         })
     
+    # Readiness probe for load balancers and rolling deploys (liveness is /health)
+    @app.route('/ready', methods=['GET'])
+    def ready():
+        """Report 200 once the detector, MongoDB and outbound HTTP pools are warm, 503 until then"""
+        is_ready = readiness.is_ready()
+        return jsonify({
+            "ready": is_ready,
+            "node": Config.NODE_ID,
+            "components": readiness.snapshot()
+        }), 200 if is_ready else 503
+    
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Realtime frame timings and pool occupancy in Prometheus text format"""
+        pool_stats = detector_pool.stats()
+        gauges = {
+            "active_sessions": pool_stats["active_sessions"],
+            "free_detectors": pool_stats["free_detectors"]
+        }
+        counters = {"log_records_dropped_total": dropped_records()}
+        return Response(frame_metrics.render_prometheus(gauges, counters), mimetype='text/plain; version=0.0.4')
+    
     # Get best frame endpoint
     @app.route('/api/best-frame', methods=['GET'])
     def get_best_frame():
         """Get the best frame captured during real-time detection (clean frame without annotations for try-on)"""
         try:
-            best_frame, best_confidence = detector.get_best_frame()
+            # Streaming clients identify themselves with their Socket.IO session id
+            session_id = request.args.get('session_id')
+            if not session_id:
+                return jsonify({
+                    "success": False,
+                    "error": "session_id query parameter is required"
+                }), 400
+            
+            detector = detector_pool.get(session_id)
+            if detector is None:
+                # Streaming on another node (or already disconnected) - use the shared store
+                return best_frame_from_store(session_id)
             
-            if best_frame is None:
+            best = detector.best_frames.best()
+            
+            if best is None:
                 return jsonify({
                     "success": False,
                     "error": "No frames have been processed yet"
                 }), 404
             
-            # Convert frame to base64
-            import cv2
-            import base64
-            _, buffer = cv2.imencode('.jpg', best_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            frame_b64 = base64.b64encode(buffer).decode('utf-8')
+            # Best frame is kept as the client's original JPEG - no re-encode needed
+            if request.args.get('format') == 'jpeg':
+                return Response(best["frame"], mimetype='image/jpeg')
             
             return jsonify({
                 "success": True,
-                "best_frame": f"data:image/jpeg;base64,{frame_b64}",
-                "confidence": best_confidence,
+                "best_frame": detector.best_frames.best_data_url(),  # Encoded once per winner
+                "confidence": best["confidence"],
+                "is_valid": best["is_valid"],
+                "score": best["score"],
+                "candidates": detector.best_frames.candidates(),
                 "message": "Best frame retrieved successfully"
             })
             
         except Exception as e:
-            print(f"Error getting best frame: {str(e)}")
+            logger.error("Error getting best frame: %s", e)
             return jsonify({
                 "success": False,
                 "error": f"Failed to get best frame: {str(e)}"
             }), 500
     
+    def best_frame_from_store(session_id):
+        """Answer /api/best-frame for a session this node doesn't hold"""
+        stored = session_store.get_best_frame(session_id)
+        if stored is None:
+            return jsonify({
+                "success": False,
+                "error": "Unknown or expired streaming session"
+            }), 404
+        
+        frame_bytes, meta = stored
+        if request.args.get('format') == 'jpeg':
+            return Response(frame_bytes, mimetype='image/jpeg')
+        
+        frame_b64 = base64.b64encode(frame_bytes).decode('utf-8')
+        return jsonify({
+            "success": True,
+            "best_frame": f"data:image/jpeg;base64,{frame_b64}",
+            "confidence": meta["confidence"],
+            "is_valid": meta["is_valid"],
+            "score": meta["score"],
+            "stats": session_store.get_stats(session_id),
+            "message": "Best frame retrieved successfully"
+        })
+    
     return app, socketio
 
-# Create the app instance
-app, socketio = create_app()
-
 if __name__ == '__main__':
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+    # Built here rather than at import time, so tests can import create_app without
+    # starting the warm-up threads of a second, module-level app
+    app, socketio = create_app()
+    socketio.run(app, debug=Config.DEBUG, host='0.0.0.0', port=5000)
@@ -0,0 +1,110 @@
+"""
+Async server runtime: cooperative I/O with CPU work offloaded to real threads
+
+In "threading" mode (the development default) nothing is patched and offload()
+simply calls the function. In "eventlet" or "gevent" mode the standard library
+is monkey-patched so sockets - Socket.IO clients, outbound HTTP to Segmind,
+Vellum and Ribbon, and MongoDB/GridFS - yield to the event loop instead of
+holding a thread, and offload() runs CPU-bound calls on a bounded pool of
+native OS threads so they never stall the loop.
+
+patch() must run before anything else imports socket, ssl or threading, so
+app.py calls it first thing, before config (python-dotenv imports logging,
+which imports threading). This module itself only imports threading once
+the standard library has been patched.
+"""
+import os
+
+ASYNC_MODES = ("threading", "eventlet", "gevent")
+
+# Bounded native-thread pools: name -> max concurrent calls
+DEFAULT_POOL_SIZES = {
+    "cpu": os.cpu_count() or 4,  # Frame processing, image decoding, PIL work
+    "video": max(1, (os.cpu_count() or 4) // 2),  # Whole-video scans, which run for seconds
+}
+
+_mode = "threading"
+_limits = {}
+
+
+def patch(mode: str = None):
+    """
+    Select the async mode and monkey-patch the standard library for it
+
+    Call once, before importing config, Flask, requests, pymongo or threading
+    users. The mode defaults to the ASYNC_MODE environment variable; .env is
+    only read by config, after patching, so it can't select the mode.
+    """
+    global _mode
+    mode = mode or os.getenv("ASYNC_MODE", "threading")
+    if mode not in ASYNC_MODES:
+        raise ValueError(f"Unsupported ASYNC_MODE '{mode}', expected one of {ASYNC_MODES}")
+
+    if mode == "eventlet":
+        import eventlet
+        eventlet.monkey_patch()
+    elif mode == "gevent":
+        from gevent import monkey
+        monkey.patch_all()
+    _mode = mode
+
+
+def configure_pools(pool_sizes: dict = None):
+    """Size the bounded offload pools; call after patch()"""
+    sizes = dict(DEFAULT_POOL_SIZES, **(pool_sizes or {}))
+    if _mode == "eventlet":
+        # tpool reads its size on first use; leave room for every pool at once
+        os.environ.setdefault("EVENTLET_THREADPOOL_SIZE", str(sum(sizes.values())))
+    elif _mode == "gevent":
+        import gevent
+        gevent.get_hub().threadpool.maxsize = sum(sizes.values())
+
+    # Imported after patching so waiting callers yield to the event loop
+    import threading
+    for name, size in sizes.items():
+        _limits[name] = threading.BoundedSemaphore(size)
+
+
+def async_mode() -> str:
+    return _mode
+
+
+def native_lock():
+    """
+    A lock that is safe to share between offloaded calls and the event loop
+
+    Under eventlet and gevent threading.Lock is patched into a green lock,
+    which only works between greenlets; state that offload() callers touch on
+    native threads needs the original OS lock. Hold it briefly: a greenlet
+    waiting for it blocks the whole loop.
+    """
+    if _mode == "eventlet":
+        from eventlet import patcher
+        return patcher.original("threading").Lock()
+    if _mode == "gevent":
+        from gevent.monkey import get_original
+        return get_original("threading", "Lock")()
+    import threading
+    return threading.Lock()
+
+
+def offload(fn, *args, pool: str = "cpu", **kwargs):
+    """
+    Run a blocking, CPU-bound call without stalling the event loop
+
+    The call runs on a native OS thread and the caller waits cooperatively;
+    at most the pool's size run at once, extra callers queue. In threading mode
+    the call runs inline (still bounded by the pool).
+    """
+    limit = _limits.get(pool)
+    if limit is None:
+        import threading
+        limit = _limits.setdefault(pool, threading.BoundedSemaphore(DEFAULT_POOL_SIZES.get(pool, 1)))
+    with limit:
+        if _mode == "eventlet":
+            from eventlet import tpool
+            return tpool.execute(fn, *args, **kwargs)
+        if _mode == "gevent":
+            import gevent
+            return gevent.get_hub().threadpool.apply(fn, args, kwargs)
+        return fn(*args, **kwargs)
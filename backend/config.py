@@ -18,6 +18,60 @@ class Config:
     # MongoDB settings
     MONGODB_URI = os.getenv('MONGODB_URI')
     
+    # Server runtime
+    DEBUG = os.getenv('FLASK_DEBUG', 'true').lower() in ('1', 'true', 'yes')
+    ASYNC_MODE = os.getenv('ASYNC_MODE', 'threading')  # "eventlet" or "gevent" for production (cooperative I/O)
+    CPU_EXECUTOR_WORKERS = int(os.getenv('CPU_EXECUTOR_WORKERS', str(os.cpu_count() or 4)))  # Concurrent CPU-bound calls (frames, PIL)
+    VIDEO_EXECUTOR_WORKERS = int(os.getenv('VIDEO_EXECUTOR_WORKERS', str(max(1, (os.cpu_count() or 4) // 2))))  # Concurrent video scans
+    VIDEO_SCAN_WORKERS = int(os.getenv('VIDEO_SCAN_WORKERS', str(os.cpu_count() or 4)))  # Processes each video scan is split across (1 = in-process)
+    VIDEO_SCAN_MIN_CHUNK_FRAMES = int(os.getenv('VIDEO_SCAN_MIN_CHUNK_FRAMES', '60'))  # Shortest frame range handed to one scan process
+    VIDEO_SCAN_SAMPLES = int(os.getenv('VIDEO_SCAN_SAMPLES', '90'))  # Frames analyzed per uploaded video, whatever its length
+    VIDEO_SCAN_TIME_BUDGET = float(os.getenv('VIDEO_SCAN_TIME_BUDGET', '30'))  # Seconds before a scan returns its best so far (0 = none)
+    VIDEO_SCAN_SEEK_SECONDS = float(os.getenv('VIDEO_SCAN_SEEK_SECONDS', '2'))  # Longer gaps between samples are seeked over, not decoded (0 = never seek)
+    VIDEO_SCAN_WORK_SIZE = int(os.getenv('VIDEO_SCAN_WORK_SIZE', '1280'))  # Longer side the STRICT cascades run at; boxes map back to full size (0 = full resolution)
+    VIDEO_SCAN_COARSE_SIZE = int(os.getenv('VIDEO_SCAN_COARSE_SIZE', '640'))  # Longer side samples are first scored at cheaply (0 = STRICT on every sample)
+    VIDEO_SCAN_CANDIDATES = int(os.getenv('VIDEO_SCAN_CANDIDATES', '5'))  # Best coarse samples re-scanned with the STRICT cascades
+    VIDEO_SCAN_REFINE_RADIUS = int(os.getenv('VIDEO_SCAN_REFINE_RADIUS', '2'))  # Frames re-scanned either side of each candidate
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))  # Pooled connections kept per external API host
+    
+    # Warm-up and readiness (/ready reports ready once these are done)
+    WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    WARMUP_DETECTORS = int(os.getenv('WARMUP_DETECTORS', '1'))  # Idle detectors built and warmed at startup
+    WARMUP_HTTP_URLS = [url for url in os.getenv('WARMUP_HTTP_URLS', 'https://api.segmind.com').split(',') if url]
+    WARMUP_RETRY_INTERVAL = float(os.getenv('WARMUP_RETRY_INTERVAL', '5'))  # Seconds between retries of a failed warm-up step
+    
+    # Multi-node deployments: Socket.IO message queue and shared session store (e.g. redis://redis:6379/0)
+    NODE_ID = os.getenv('NODE_ID', os.getenv('HOSTNAME', 'local'))
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')  # Unset = single node
+    SESSION_STORE_URL = os.getenv('SESSION_STORE_URL', 'memory')  # "memory" = process-local
+    SESSION_STORE_TTL = float(os.getenv('SESSION_STORE_TTL', '600'))  # Seconds a session's best frame outlives its last update
+    SESSION_STATS_INTERVAL = int(os.getenv('SESSION_STATS_INTERVAL', '30'))  # Frames between shared stats writes
+    
+    # Logging
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))  # Records buffered for the log writer thread; extras are dropped and counted in /metrics (realtime_log_records_dropped_total)
+    
+    # Real-time streaming settings
+    DETECTOR_POOL_MAX_SIZE = int(os.getenv('DETECTOR_POOL_MAX_SIZE', '32'))  # Max concurrent streaming sessions
+    DETECTOR_IDLE_TIMEOUT = float(os.getenv('DETECTOR_IDLE_TIMEOUT', '300'))  # Seconds before an idle session is evicted
+    FRAME_WORKERS = int(os.getenv('FRAME_WORKERS', str(os.cpu_count() or 4)))  # Threads draining the frame queue
+    FRAME_MAX_AGE = float(os.getenv('FRAME_MAX_AGE', '1.0'))  # Seconds before a queued frame is dropped as stale
+    FRAME_DRAIN_TIMEOUT = float(os.getenv('FRAME_DRAIN_TIMEOUT', '5.0'))  # Seconds start_stream/disconnect wait for a session's running frame
+    INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', '0'))  # Pose inference processes (0 = in-process)
+    INFERENCE_MAX_WIDTH = int(os.getenv('INFERENCE_MAX_WIDTH', '1920'))  # Shared-memory slot size; larger frames are downscaled
+    INFERENCE_MAX_HEIGHT = int(os.getenv('INFERENCE_MAX_HEIGHT', '1080'))
+    MOTION_THRESHOLD = float(os.getenv('MOTION_THRESHOLD', '2.0'))  # Frame difference below which pose results are reused (0 = off)
+    MAX_MOTION_SKIPS = int(os.getenv('MAX_MOTION_SKIPS', '15'))  # Consecutive static frames before inference is forced
+    BEST_FRAME_CANDIDATES = int(os.getenv('BEST_FRAME_CANDIDATES', '5'))  # Top-K clean frames kept per session for try-on
+    DECODE_MIN_SIZE = int(os.getenv('DECODE_MIN_SIZE', '960'))  # Frames decode at 1/2-1/8 scale down to this longer side (0 = full)
+    METRICS_SESSION_WINDOW = int(os.getenv('METRICS_SESSION_WINDOW', '120'))  # Recent frames in each session's /metrics summary
+    CAPTURE_STABLE_FRAMES = int(os.getenv('CAPTURE_STABLE_FRAMES', '10'))  # Valid frames an auto_capture stream needs before it completes
+    CAPTURE_WINDOW = int(os.getenv('CAPTURE_WINDOW', '15'))  # ...counted over this many most recent frames
+    CAPTURE_MAX_JITTER = float(os.getenv('CAPTURE_MAX_JITTER', '0.01'))  # Max landmark std dev (fraction of frame) across those frames
+    RATE_HINT_MIN_FPS = float(os.getenv('RATE_HINT_MIN_FPS', '2'))  # Lowest capture rate a rate_hint asks clients for
+    RATE_HINT_HEADROOM = float(os.getenv('RATE_HINT_HEADROOM', '0.8'))  # Fraction of measured capacity rate hints plan for
+    RATE_HINT_INTERVAL = float(os.getenv('RATE_HINT_INTERVAL', '1.0'))  # Minimum seconds between rate_hint events per session
+    
     # Test video URL for body detection testing
     TEST_VIDEO_URL = "https://videos.pexels.com/video-files/5058382/5058382-uhd_2560_1440_25fps.mp4"
     
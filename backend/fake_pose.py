@@ -0,0 +1,34 @@
+"""
+Pose inference stand-in shared by the realtime tests
+
+Passed to RealtimeBodyDetector as its inference_pool, so tests don't build
+MediaPipe graphs or need their models installed.
+"""
+
+from types import SimpleNamespace
+
+
+class ScriptedPosePool:
+    """Stands in for InferencePool; answers every frame with the same landmarks and counts the calls"""
+
+    def __init__(self, landmarks=None):
+        """
+        Args:
+            landmarks: NormalizedLandmarkList returned for every frame, or None
+                for frames with nobody in them
+        """
+        self.landmarks = landmarks
+        self.calls = 0
+
+    def pose_client(self, **pose_options):
+        return self
+
+    def process(self, frame_rgb):
+        self.calls += 1
+        return SimpleNamespace(pose_landmarks=self.landmarks)
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,41 @@
+"""
+Shared outbound HTTP session
+
+One requests.Session per process keeps TCP/TLS connections to the external
+APIs (Segmind, plus anything fetched by URL) open between requests instead of
+reconnecting on every call. warm() opens those connections before the first
+real request needs them.
+"""
+from typing import Dict, Iterable
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=Config.HTTP_POOL_SIZE)
+session.mount('https://', _adapter)
+session.mount('http://', _adapter)
+
+
+def warm(urls: Iterable[str], timeout: float = 5.0) -> Dict[str, str]:
+    """
+    Open a pooled connection to each URL's host
+
+    Any HTTP response counts - only the connection matters. Returns
+    origin -> "ok" or the connection error.
+    """
+    results = {}
+    for url in urls:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if origin in results:
+            continue
+        try:
+            session.head(origin, timeout=timeout, allow_redirects=False)
+            results[origin] = "ok"
+        except requests.RequestException as e:
+            results[origin] = str(e)
+    return results
@@ -0,0 +1,128 @@
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+
+# Per-event sampling and rate limits for hot-path log lines. Records tagged
+# with extra={"event": name} are checked against these rules before they are
+# formatted or queued; untagged records always pass.
+#   sample: keep 1 of every N records
+#   per_second / burst: token bucket applied to the records that were sampled
+EVENT_RULES = {
+    "frame_received": {"sample": 30},
+    "frame_processed": {"sample": 30},
+    "frame_error": {"per_second": 5, "burst": 20},
+    "stream_lifecycle": {"per_second": 20, "burst": 50},
+    "video_best_frame": {"per_second": 2, "burst": 5},
+}
+
+
+class EventSamplingFilter(logging.Filter):
+    """
+    Drop hot-path records by per-event sampling and token-bucket rate limits
+
+    When a record gets through after others of its event were dropped, the
+    number suppressed is appended so the log still shows the volume.
+    """
+
+    def __init__(self, rules: Dict[str, Dict]):
+        super().__init__()
+        self.rules = rules
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        rule = self.rules.get(event) if event else None
+        if rule is None:
+            return True
+
+        with self._lock:
+            state = self._state.get(event)
+            if state is None:
+                state = self._state[event] = {
+                    "seen": 0, "suppressed": 0,
+                    "tokens": float(rule.get("burst", 1)), "updated": time.monotonic()
+                }
+            state["seen"] += 1
+
+            keep = (state["seen"] - 1) % rule.get("sample", 1) == 0
+            if keep and "per_second" in rule:
+                now = time.monotonic()
+                state["tokens"] = min(
+                    float(rule.get("burst", 1)),
+                    state["tokens"] + (now - state["updated"]) * rule["per_second"]
+                )
+                state["updated"] = now
+                keep = state["tokens"] >= 1.0
+                if keep:
+                    state["tokens"] -= 1.0
+
+            if not keep:
+                state["suppressed"] += 1
+                return False
+            suppressed, state["suppressed"] = state["suppressed"], 0
+
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar suppressed)"
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or erroring"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        # Called from handle(), which holds the handler lock, so the count is exact
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def dropped_records() -> int:
+    """Records dropped because the log queue was full, exported on /metrics"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def configure_logging(level: str = "INFO", queue_size: int = 10000,
+                      rules: Optional[Dict[str, Dict]] = None) -> QueueListener:
+    """
+    Route all logging through a bounded queue drained by a background thread
+
+    Request and frame-processing threads only filter and enqueue; the stdout
+    write happens on the listener thread, so the hot path never blocks on I/O.
+    Safe to call more than once - later calls return the running listener.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _queue_handler.addFilter(EventSamplingFilter(EVENT_RULES if rules is None else rules))
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)  # Flush queued records on shutdown
+    return _listener
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Offline replay benchmark for RealtimeBodyDetector.process_frame
+
+Runs frame sequences straight through the detector - no Socket.IO, no
+server - for every detection_mode and render mode, and reports per-stage
+throughput (from the detector's own "timings") and Python/NumPy allocations
+per frame (tracemalloc, measured in a separate pass so it doesn't skew the
+timings). Frame sources:
+
+    recorded   a directory of JPEGs (--frames-dir, the catalog images by default)
+    synthetic  the stick-figure frames the load generator sends
+    video      frames extracted with OpenCV from --video, or from a short clip
+               rendered into a temp dir from the frontend's marketing photos
+
+Per-frame confidence and validation results are compared against
+benchmark_golden.json so an optimization can't silently change what the
+detector reports. Everything runs on the CPU with no network. By default,
+detection modes whose MediaPipe model isn't installed are skipped with a
+warning naming the model; asking for one with --modes is an error.
+
+Usage:
+    python replay_benchmark.py
+    python replay_benchmark.py --modes strict --renders vector --output results.json
+    python replay_benchmark.py --update-golden
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from services.realtime_detection import (
+    DETECTION_PROFILES, RENDER_MODES, TRANSPORT_BINARY, RealtimeBodyDetector
+)
+from stream_load_test import load_frames, synthetic_frames
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FRAMES_DIR = os.path.join(BACKEND_DIR, '..', 'frontend', 'public', 'catalog')
+# Photos of people, so the rendered clip has poses in it
+DEFAULT_VIDEO_IMAGES_DIR = os.path.join(BACKEND_DIR, '..', 'frontend', 'src', 'assets')
+GOLDEN_PATH = os.path.join(BACKEND_DIR, 'benchmark_golden.json')
+GOLDEN_TOLERANCE = 1e-3
+
+SYNTHETIC_FRAME_COUNT = 30
+VIDEO_FRAME_SIZE = (1920, 1080)  # A high-resolution webcam
+VIDEO_FRAMES_PER_IMAGE = 6  # Pairs of identical frames, so the motion gate is exercised too
+
+# MediaPipe's Pose graph picks its landmark model by model_complexity
+POSE_MODEL_FILES = {0: 'pose_landmark_lite.tflite', 1: 'pose_landmark_full.tflite', 2: 'pose_landmark_heavy.tflite'}
+
+
+def model_available(model_complexity: int) -> bool:
+    """Whether the Pose landmark model is installed (it is downloaded on first use otherwise)"""
+    import mediapipe
+    path = os.path.join(os.path.dirname(mediapipe.__file__), 'modules', 'pose_landmark',
+                        POSE_MODEL_FILES[model_complexity])
+    return os.path.exists(path)
+
+
+def render_video(frames: List[bytes], path: str, fps: int = 15) -> str:
+    """Write a short MJPG clip that drifts each frame slowly across a gray canvas"""
+    width, height = VIDEO_FRAME_SIZE
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"OpenCV can't write {path}")
+    try:
+        for frame_bytes in frames:
+            image = cv2.imdecode(np.frombuffer(frame_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+            # Fit inside 90% of the canvas so the image has room to move
+            scale = 0.9 * min(width / image.shape[1], height / image.shape[0])
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            for i in range(VIDEO_FRAMES_PER_IMAGE):
+                offset = (i // 2) * 8
+                canvas = np.full((height, width, 3), 128, dtype=np.uint8)
+                canvas[offset:offset + image.shape[0], offset:offset + image.shape[1]] = image
+                writer.write(canvas)
+    finally:
+        writer.release()
+    return path
+
+
+def extract_video_frames(path: str, max_frames: Optional[int] = None, quality: int = 90) -> List[bytes]:
+    """Decode a video with OpenCV and re-encode each frame as the JPEG a client would send"""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise SystemExit(f"Could not open video {path}")
+    frames = []
+    try:
+        while max_frames is None or len(frames) < max_frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            frames.append(buffer.tobytes())
+    finally:
+        capture.release()
+    return frames
+
+
+def fingerprint(frames: List[bytes]) -> str:
+    """Identify a frame sequence, so golden values are only compared against the same input"""
+    digest = hashlib.sha1()
+    for frame_bytes in frames:
+        digest.update(hashlib.sha1(frame_bytes).digest())
+    return digest.hexdigest()
+
+
+def build_sources(frames_dir: Optional[str] = None, video: Optional[str] = None,
+                  max_video_frames: Optional[int] = None) -> Dict[str, List[bytes]]:
+    """Load the recorded, synthetic and video frame sequences"""
+    recorded = load_frames(frames_dir or DEFAULT_FRAMES_DIR)
+    sources = {
+        "recorded": recorded,
+        "synthetic": synthetic_frames(SYNTHETIC_FRAME_COUNT, 640, 480),
+    }
+    if video:
+        sources["video"] = extract_video_frames(video, max_video_frames)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            clip = render_video(load_frames(DEFAULT_VIDEO_IMAGES_DIR), os.path.join(tmp, 'replay.avi'))
+            sources["video"] = extract_video_frames(clip, max_video_frames)
+    return sources
+
+
+def new_detector(detection_mode: str, render_mode: str, detector_options: Optional[Dict] = None) -> RealtimeBodyDetector:
+    detector = RealtimeBodyDetector(detection_mode=detection_mode, **(detector_options or {}))
+    detector.configure(transport=TRANSPORT_BINARY, render_mode=render_mode, detection_mode=detection_mode)
+    return detector
+
+
+def summarize_result(result: Dict) -> Dict:
+    """The parts of a frame result that golden values pin down"""
+    validation = result.get("full_body_validation") or {}
+    return {
+        "confidence": round(float(result.get("confidence", 0.0)), 6),
+        "is_valid": bool(validation.get("is_valid", False)),
+        "validation_confidence": round(float(validation.get("confidence", 0.0)), 6),
+        "motion_skipped": bool(result.get("motion_skipped", False)),
+    }
+
+
+def replay(frames: List[bytes], detection_mode: str, render_mode: str, detector_options: Optional[Dict] = None) -> Dict:
+    """Time every frame through a fresh detector; returns per-stage stats and per-frame results"""
+    detector = new_detector(detection_mode, render_mode, detector_options)
+    stage_ms: Dict[str, List[float]] = {}
+    results, errors = [], 0
+    try:
+        started = time.perf_counter()
+        for frame_bytes in frames:
+            result = detector.process_frame(frame_bytes)
+            if "error" in result:
+                errors += 1
+                results.append(None)
+                continue
+            for stage, ms in result["timings"].items():
+                stage_ms.setdefault(stage, []).append(ms)
+            results.append(summarize_result(result))
+        wall_s = time.perf_counter() - started
+    finally:
+        detector.close()
+
+    stages = {}
+    for stage, samples in stage_ms.items():
+        mean_ms = sum(samples) / len(samples)
+        stages[stage] = {
+            "mean_ms": round(mean_ms, 3),
+            "max_ms": round(max(samples), 3),
+            "fps": round(1000 / mean_ms, 1) if mean_ms > 0 else None,
+        }
+    return {
+        "frames": len(frames),
+        "errors": errors,
+        "wall_fps": round(len(frames) / wall_s, 1) if wall_s > 0 else None,
+        "stages": stages,
+        "results": results,
+    }
+
+
+def measure_allocations(frames: List[bytes], detection_mode: str, render_mode: str,
+                        detector_options: Optional[Dict] = None) -> Dict:
+    """Per-frame peak allocation and net growth over the run, via tracemalloc"""
+    detector = new_detector(detection_mode, render_mode, detector_options)
+    detector.process_frame(frames[0])  # MediaPipe allocates its graph on the first frame
+    peaks = []
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for frame_bytes in frames:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            detector.process_frame(frame_bytes)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+        detector.close()
+    return {
+        "peak_kib_mean": round(sum(peaks) / len(peaks) / 1024, 1),
+        "peak_kib_max": round(max(peaks) / 1024, 1),
+        "retained_kib": round(retained / 1024, 1),
+    }
+
+
+def compare_to_golden(source: str, detection_mode: str, results: List[Optional[Dict]],
+                      golden: Dict, tolerance: float = GOLDEN_TOLERANCE) -> List[str]:
+    """List every frame whose confidence or validation drifted from the golden values"""
+    expected = golden["results"][f"{source}/{detection_mode}"]
+    if len(expected) != len(results):
+        return [f"{source}/{detection_mode}: {len(results)} frames, golden has {len(expected)}"]
+    mismatches = []
+    for index, (want, got) in enumerate(zip(expected, results)):
+        if got is None:
+            mismatches.append(f"{source}/{detection_mode} frame {index}: processing error")
+            continue
+        for key in ("confidence", "validation_confidence"):
+            if abs(want[key] - got[key]) > tolerance:
+                mismatches.append(f"{source}/{detection_mode} frame {index}: {key} {got[key]} != {want[key]}")
+        for key in ("is_valid", "motion_skipped"):
+            if want[key] != got[key]:
+                mismatches.append(f"{source}/{detection_mode} frame {index}: {key} {got[key]} != {want[key]}")
+    return mismatches
+
+
+def load_golden(path: str = GOLDEN_PATH) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def golden_applies(golden: Optional[Dict], source: str, detection_mode: str, frames: List[bytes]) -> bool:
+    """Golden values only hold for the exact frames they were recorded from"""
+    return (golden is not None
+            and golden["fingerprints"].get(source) == fingerprint(frames)
+            and f"{source}/{detection_mode}" in golden["results"])
+
+
+def missing_models(modes: List[str]) -> Dict[str, str]:
+    """Detection modes whose Pose model isn't installed, mapped to the missing model file"""
+    missing = {}
+    for mode in modes:
+        complexity = DETECTION_PROFILES[mode]["model_complexity"]
+        if not model_available(complexity):
+            missing[mode] = POSE_MODEL_FILES[complexity]
+    return missing
+
+
+def run_benchmark(sources: Dict[str, List[bytes]], modes: List[str], renders: List[str],
+                  golden: Optional[Dict], allocations: bool = True, detector_options: Optional[Dict] = None) -> Dict:
+    report = {"started_at": datetime.now().isoformat(timespec='seconds'), "runs": [], "mismatches": []}
+    for source, frames in sources.items():
+        for mode in modes:
+            for render in renders:
+                print(f"▶️ {source} ({len(frames)} frames) mode={mode} render={render}")
+                run = replay(frames, mode, render, detector_options)
+                if allocations:
+                    run["allocations"] = measure_allocations(frames, mode, render, detector_options)
+                if golden_applies(golden, source, mode, frames):
+                    mismatches = compare_to_golden(source, mode, run["results"], golden)
+                    run["golden"] = "match" if not mismatches else "mismatch"
+                    report["mismatches"].extend(f"[{render}] {m}" for m in mismatches)
+                else:
+                    run["golden"] = "none"
+                run.update(source=source, detection_mode=mode, render_mode=render)
+                report["runs"].append(run)
+    return report
+
+
+def golden_from_report(report: Dict, sources: Dict[str, List[bytes]]) -> Dict:
+    """Golden values from a run; render mode doesn't change detection, so the first render is kept"""
+    results = {}
+    for run in report["runs"]:
+        results.setdefault(f"{run['source']}/{run['detection_mode']}", run["results"])
+    return {
+        "tolerance": GOLDEN_TOLERANCE,
+        "fingerprints": {source: fingerprint(frames) for source, frames in sources.items()},
+        "results": results,
+    }
+
+
+def print_summary(report: Dict):
+    print("\n" + "=" * 90)
+    print(f"{'source':<10} {'mode':<12} {'render':<7} {'fps':>6} {'total ms':>9} {'pose ms':>8} "
+          f"{'peak KiB':>9} {'golden':>9}")
+    for run in report["runs"]:
+        stages = run["stages"]
+        total = stages.get("total", {}).get("mean_ms")
+        pose = stages.get("pose", {}).get("mean_ms")
+        peak = run.get("allocations", {}).get("peak_kib_mean")
+        print(f"{run['source']:<10} {run['detection_mode']:<12} {run['render_mode']:<7} "
+              f"{run['wall_fps'] or 0:>6} {total or 0:>9} {pose or 0:>8} {peak or 0:>9} {run['golden']:>9}")
+    print("=" * 90)
+    for mismatch in report["mismatches"][:20]:
+        print(f"❌ {mismatch}")
+    if len(report["mismatches"]) > 20:
+        print(f"❌ ... and {len(report['mismatches']) - 20} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay frames through RealtimeBodyDetector offline")
+    parser.add_argument('--frames-dir', help="Recorded JPEG frames (default: the catalog images)")
+    parser.add_argument('--video', help="Extract frames from this video instead of a rendered clip")
+    parser.add_argument('--max-video-frames', type=int, default=None)
+    parser.add_argument('--modes', nargs='+', choices=list(DETECTION_PROFILES),
+                        help="Detection modes to run (default: every mode whose Pose model is installed)")
+    parser.add_argument('--renders', nargs='+', default=list(RENDER_MODES), choices=list(RENDER_MODES))
+    parser.add_argument('--no-allocations', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--decode-min-size', type=int, default=None,
+                        help="Override the detector's reduced-decode floor (0 = full-resolution decode)")
+    parser.add_argument('--golden', default=GOLDEN_PATH)
+    parser.add_argument('--update-golden', action='store_true',
+                        help="Record this run's results as the new golden values")
+    parser.add_argument('--output', help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    missing = missing_models(args.modes or list(DETECTION_PROFILES))
+    if missing and args.modes:
+        raise SystemExit("Pose model not installed for " +
+                         ", ".join(f"{mode} ({model})" for mode, model in missing.items()) +
+                         ": run once with network access so MediaPipe downloads it, or pass --modes without it")
+    for mode, model in missing.items():
+        print(f"⚠️ Skipping {mode}: {model} is not installed")
+    modes = [mode for mode in DETECTION_PROFILES if mode not in missing] if not args.modes else args.modes
+    if not modes:
+        raise SystemExit("No detection mode has its Pose model installed")
+    sources = build_sources(args.frames_dir, args.video, args.max_video_frames)
+    golden = None if args.update_golden else load_golden(args.golden)
+    detector_options = {}
+    if args.decode_min_size is not None:
+        detector_options["decode_min_size"] = args.decode_min_size
+    report = run_benchmark(sources, modes, args.renders, golden, allocations=not args.no_allocations,
+                           detector_options=detector_options)
+    print_summary(report)
+
+    if args.update_golden:
+        updated = golden_from_report(report, sources)
+        previous = load_golden(args.golden)
+        if previous and previous["fingerprints"] == updated["fingerprints"]:
+            # Keep golden values for modes left out with --modes
+            updated["results"] = dict(previous["results"], **updated["results"])
+        with open(args.golden, 'w') as f:
+            json.dump(updated, f, indent=1)
+        print(f"💾 Golden values written to {args.golden}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    if report["mismatches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
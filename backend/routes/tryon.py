@@ -1,16 +1,20 @@
 from flask import Blueprint, request, jsonify
 import os
 import uuid
+import logging
 import requests
 import base64
 from PIL import Image
 from io import BytesIO
 from werkzeug.utils import secure_filename
+from async_runtime import offload
+from http_client import session as http_session
 from utils import ensure_upload_folder, allowed_file
 from config import Config
 from datetime import datetime
 
 tryon_bp = Blueprint('tryon', __name__)
+logger = logging.getLogger(__name__)
 
 # Segmind API configuration
 SEGMIND_API_KEY = os.getenv('SEGMIND_API_KEY', 'SG_dfe39d0677343e9f')
@@ -24,11 +28,16 @@ def image_file_to_base64(image_path):
 
 def image_url_to_base64(image_url):
     """Fetch an image from a URL and convert it to base64"""
-    response = requests.get(image_url)
+    response = http_session.get(image_url)
     response.raise_for_status()
     image_data = response.content
     return base64.b64encode(image_data).decode('utf-8')
 
+def save_image_as_png(image_data, output_path):
+    """Decode image bytes with PIL and save them as a PNG"""
+    image = Image.open(BytesIO(image_data))
+    image.save(output_path, 'PNG')
+
 def determine_category_from_url(garment_url, garment_description=""):
     """Determine the category of the garment from URL and description"""
     # Default category mapping based on URL path and description
@@ -66,11 +75,11 @@ def virtual_tryon():
         garment_description = request.form.get('garment_description', 'Clothing item')
         user_id = request.form.get('user_id', 'anonymous')
 
-        # print info received
-        print("garment_url", garment_url)
-        print("garment_description", garment_description)
-        print("user_id", user_id)   
-        print("person_image_file", person_image_file.filename)
+        # Log info received
+        logger.debug(
+            "Try-on request - garment_url: %s, garment_description: %s, user_id: %s, person_image_file: %s",
+            garment_url, garment_description, user_id, person_image_file.filename
+        )
         
         if not garment_url:
             return jsonify({"error": "garment_url is required"}), 400
@@ -98,7 +107,7 @@ def virtual_tryon():
             person_b64 = image_file_to_base64(filepath)
             
             # Always treat garment_url as a URL (since it comes from frontend)
-            print(f"🔄 Fetching garment image from URL: {garment_url}")
+            logger.info("🔄 Fetching garment image from URL: %s", garment_url)
             garment_b64 = image_url_to_base64(garment_url)
             
             # Prepare API request data
@@ -116,10 +125,10 @@ def virtual_tryon():
             
             headers = {'x-api-key': SEGMIND_API_KEY}
             
-            print(f"🔄 Making Segmind API request for category: {category}")
+            logger.info("🔄 Making Segmind API request for category: %s", category)
             
             # Make the API request
-            response = requests.post(SEGMIND_API_URL, json=data, headers=headers)
+            response = http_session.post(SEGMIND_API_URL, json=data, headers=headers)
             
             if response.status_code != 200:
                 return jsonify({
@@ -131,10 +140,8 @@ def virtual_tryon():
             output_path = f"uploads/tryon_result_{result_id}.png"
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            # Convert response to PIL Image and save
-            image_data = response.content
-            image = Image.open(BytesIO(image_data))
-            image.save(output_path, 'PNG')
+            # Convert response to PIL Image and save (CPU-bound, kept off the event loop)
+            offload(save_image_as_png, response.content, output_path)
             
             # Create result data (no database save since we're not using MongoDB)
             result_data = {
@@ -150,7 +157,7 @@ def virtual_tryon():
                 "category": category
             }
             
-            print(f"✅ Virtual try-on completed successfully using Segmind API")
+            logger.info("✅ Virtual try-on completed successfully using Segmind API")
             
             # Return success response
             return jsonify({
@@ -184,7 +191,7 @@ def virtual_tryon():
             try:
                 os.remove(filepath)
             except Exception as e:
-                print(f"Warning: Could not clean up temporary file {filepath}: {e}")
+                logger.warning("Could not clean up temporary file %s: %s", filepath, e)
         
     except Exception as e:
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500 
\ No newline at end of file
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 import os
 import uuid
+import logging
 import requests
 from datetime import datetime, timedelta
 from bson import ObjectId
@@ -11,10 +12,12 @@ from models import (
     delete_video_from_gridfs,
     cleanup_expired_videos
 )
+from async_runtime import offload
 from services.body_detection import detect_body_pose_in_video, get_video_info
 from utils import allowed_file, ensure_upload_folder, get_file_extension
 
 videos_bp = Blueprint('videos', __name__)
+logger = logging.getLogger(__name__)
 
 @videos_bp.route('/upload-video', methods=['POST'])
 def upload_video():
@@ -59,9 +62,7 @@ def upload_video():
         })
         
     except Exception as e:
-        print(f"Error in upload_video: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in upload_video: %s", e)
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
 @videos_bp.route('/download-video/<video_id>', methods=['GET'])
@@ -86,7 +87,7 @@ def download_video(video_id):
         }
         
     except Exception as e:
-        print(f"Error downloading video {video_id}: {str(e)}")
+        logger.error("Error downloading video %s: %s", video_id, e)
         return jsonify({"error": "Video not found"}), 404
 
 @videos_bp.route('/cleanup-videos', methods=['POST'])
@@ -132,31 +133,29 @@ def detect_body():
         video_path = os.path.join(Config.UPLOAD_FOLDER, video_filename)
         video_file.save(video_path)
         
-        print(f"Video saved for body detection: {video_path}")
+        logger.info("Video saved for body detection: %s", video_path)
         
         # Get video info for debugging
         try:
             video_info = get_video_info(video_path)
-            print(f"Video info: {video_info}")
+            logger.info("Video info: %s", video_info)
         except Exception as e:
-            print(f"Could not get video info: {e}")
+            logger.warning("Could not get video info: %s", e)
         
         # Detect body pose in video
-        result = detect_body_pose_in_video(video_path)
+        result = offload(detect_body_pose_in_video, video_path, pool="video")
         
         # Clean up video file
         try:
             os.remove(video_path)
-            print(f"Cleaned up video file: {video_path}")
+            logger.info("Cleaned up video file: %s", video_path)
         except Exception as e:
-            print(f"Warning: Could not clean up video file: {e}")
+            logger.warning("Could not clean up video file: %s", e)
         
         return jsonify(result)
         
     except Exception as e:
-        print(f"Error in detect_body: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in detect_body: %s", e)
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
 @videos_bp.route('/test-body-detection', methods=['GET', 'POST'])
@@ -169,7 +168,7 @@ def test_body_detection():
         
         # For POST requests, test full body detection
         # Download the test video
-        print(f"Downloading test video from: {Config.TEST_VIDEO_URL}")
+        logger.info("Downloading test video from: %s", Config.TEST_VIDEO_URL)
         video_response = requests.get(Config.TEST_VIDEO_URL, stream=True)
         
         if video_response.status_code != 200:
@@ -186,17 +185,17 @@ def test_body_detection():
             for chunk in video_response.iter_content(chunk_size=8192):
                 f.write(chunk)
         
-        print(f"Video saved to: {video_path}")
+        logger.info("Video saved to: %s", video_path)
         
         # Test body detection
-        print("Testing body detection...")
-        result = detect_body_pose_in_video(video_path)
+        logger.info("Testing body detection...")
+        result = offload(detect_body_pose_in_video, video_path, pool="video")
         
         # Clean up video file
         try:
             os.remove(video_path)
         except Exception as e:
-            print(f"Warning: Could not clean up test video: {e}")
+            logger.warning("Could not clean up test video: %s", e)
         
         return jsonify(result)
         
@@ -206,7 +205,7 @@ def test_body_detection():
 def test_video_download():
     """Test downloading the video from the provided URL"""
     try:
-        print(f"Testing video download from: {Config.TEST_VIDEO_URL}")
+        logger.info("Testing video download from: %s", Config.TEST_VIDEO_URL)
         video_response = requests.get(Config.TEST_VIDEO_URL, stream=True)
         
         if video_response.status_code != 200:
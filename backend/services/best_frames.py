@@ -0,0 +1,131 @@
+import base64
+import itertools
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from async_runtime import native_lock
+
+# Ranking weights - sharpness only breaks near-ties between similar poses
+CONFIDENCE_WEIGHT = 0.4
+VALIDATION_WEIGHT = 0.4
+SHARPNESS_WEIGHT = 0.2
+
+SHARPNESS_WIDTH = 256  # Frames are downscaled to this width before measuring sharpness
+SHARPNESS_SCALE = 100.0  # Laplacian variance that maps to a sharpness of 0.5
+
+
+def frame_sharpness(frame_rgb: np.ndarray) -> float:
+    """Cheap 0-1 sharpness measure: variance of the Laplacian on a small grayscale copy"""
+    height, width = frame_rgb.shape[:2]
+    if width > SHARPNESS_WIDTH:
+        frame_rgb = cv2.resize(frame_rgb, (SHARPNESS_WIDTH, max(1, int(height * SHARPNESS_WIDTH / width))),
+                               interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2GRAY)
+    variance = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    return variance / (variance + SHARPNESS_SCALE)
+
+
+class BestFrameStore:
+    """
+    Bounded per-session top-K store of best-frame candidates for try-on
+
+    Candidates keep the client's compressed JPEG bytes and are ranked by a
+    validated full body first, then by a blend of essential-part confidence,
+    full body validation score and sharpness. The data URL for the winner is
+    encoded once and cached until a different frame takes first place.
+    """
+
+    def __init__(self, capacity: int = 5):
+        self.capacity = max(1, capacity)
+        # offer() runs inside offloaded process_frame calls, on native threads
+        self._lock = native_lock()
+        self._candidates: List[Dict] = []  # Best first
+        self._ids = itertools.count()
+        self._cached_winner_id = None
+        self._cached_data_url = None
+
+    @staticmethod
+    def score(confidence: float, validation: Optional[Dict], sharpness: float = 1.0) -> float:
+        validation_score = validation["confidence"] if validation else 0.0
+        return (
+            confidence * CONFIDENCE_WEIGHT +
+            validation_score * VALIDATION_WEIGHT +
+            sharpness * SHARPNESS_WEIGHT
+        )
+
+    @staticmethod
+    def _rank(candidate: Dict):
+        return (candidate["is_valid"], candidate["score"])
+
+    def would_accept(self, confidence: float, validation: Optional[Dict]) -> bool:
+        """
+        Check whether a frame could enter the store, before paying for sharpness
+
+        Uses the best possible sharpness, so a False here is final.
+        """
+        if confidence <= 0:
+            return False
+        with self._lock:
+            if len(self._candidates) < self.capacity:
+                return True
+            is_valid = bool(validation and validation["is_valid"])
+            return (is_valid, self.score(confidence, validation)) > self._rank(self._candidates[-1])
+
+    def offer(self, frame_bytes: bytes, confidence: float, validation: Optional[Dict],
+              sharpness: float) -> bool:
+        """Add a candidate frame; returns True if it was kept"""
+        candidate = {
+            "id": next(self._ids),
+            "frame": frame_bytes,
+            "confidence": confidence,
+            "is_valid": bool(validation and validation["is_valid"]),
+            "validation_score": validation["confidence"] if validation else 0.0,
+            "sharpness": sharpness,
+            "score": self.score(confidence, validation, sharpness)
+        }
+        with self._lock:
+            if len(self._candidates) >= self.capacity:
+                if self._rank(candidate) <= self._rank(self._candidates[-1]):
+                    return False
+                self._candidates.pop()
+            # K is small, so an insertion scan beats keeping a heap
+            position = len(self._candidates)
+            while position > 0 and self._rank(candidate) > self._rank(self._candidates[position - 1]):
+                position -= 1
+            self._candidates.insert(position, candidate)
+            return True
+
+    def best(self) -> Optional[Dict]:
+        """The current winning candidate, or None if nothing has been kept"""
+        with self._lock:
+            return self._candidates[0] if self._candidates else None
+
+    def best_data_url(self) -> Optional[str]:
+        """The winner as a base64 data URL, encoded once per winner"""
+        with self._lock:
+            if not self._candidates:
+                return None
+            winner = self._candidates[0]
+            if self._cached_winner_id != winner["id"]:
+                frame_b64 = base64.b64encode(winner["frame"]).decode('utf-8')
+                self._cached_data_url = f"data:image/jpeg;base64,{frame_b64}"
+                self._cached_winner_id = winner["id"]
+            return self._cached_data_url
+
+    def candidates(self) -> List[Dict]:
+        """Ranking metadata for every candidate, best first (no frame bytes)"""
+        with self._lock:
+            return [{key: value for key, value in candidate.items() if key not in ("id", "frame")}
+                    for candidate in self._candidates]
+
+    def clear(self):
+        with self._lock:
+            self._candidates = []
+            self._cached_winner_id = None
+            self._cached_data_url = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._candidates)
@@ -1,8 +1,65 @@
+import atexit
 import cv2
+import itertools
 import numpy as np
 import base64
+import logging
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from config import Config
+from services.boxes import (
+    BH, BW, area_ratios, as_boxes, centered_mask, dedupe_boxes, expand_boxes, in_band, largest_box, merge_boxes,
+    scale_boxes
+)
+
+logger = logging.getLogger(__name__)
+
+# Haar cascades behind the STRICT video scan
+CASCADE_FILES = {
+    "face": 'haarcascade_frontalface_default.xml',
+    "face_alt": 'haarcascade_frontalface_alt.xml',
+    "body": 'haarcascade_fullbody.xml',
+    "upper_body": 'haarcascade_upperbody.xml',
+}
+_cascade_cache = threading.local()
+
+# Cascade passes per scoring profile: (cascade, scale factor, min neighbors, min size at full resolution)
+SCAN_PROFILES = {
+    # The STRICT criteria every returned frame is judged by
+    "strict": {
+        "faces": [("face", 1.05, 6, (30, 30)), ("face_alt", 1.05, 6, (30, 30))],
+        "bodies": [("body", 1.05, 6, (50, 100)), ("upper_body", 1.05, 6, (50, 50))],
+    },
+    # Cheap first pass over downscaled frames: one face cascade, coarser scale steps
+    "coarse": {
+        "faces": [("face", 1.1, 4, (30, 30))],
+        "bodies": [("body", 1.1, 4, (50, 100)), ("upper_body", 1.1, 4, (50, 50))],
+    },
+}
+
+# Faces are searched in each body box widened by this fraction of its width a side...
+FACE_ROI_MARGIN_X = 0.25
+# ...and extended up by this fraction of its height (a head above an upper-body box)
+FACE_ROI_MARGIN_TOP = 0.5
+
+# Video scan defaults, set from Config by configure_video_scan
+_scan_settings = {
+    "workers": 1,  # Processes a scan is split across (1 = the calling thread)
+    "min_chunk_frames": 60,  # Shortest frame range handed to one process
+    "samples": 90,  # Frames analyzed per video, whatever its length
+    "time_budget": 0.0,  # Wall-clock seconds before a scan settles for its best so far (0 = none)
+    "seek_seconds": 2.0,  # Gaps between samples longer than this are seeked over rather than grabbed
+    "work_size": 1280,  # Longer side the STRICT cascades run at (0 = full resolution)
+    "coarse_size": 640,  # Longer side samples are first scored at, cheaply (0 = STRICT on every sample)
+    "candidates": 5,  # Best coarse samples whose neighborhoods get the STRICT pass
+    "refine_radius": 2,  # Frames re-scanned either side of each candidate
+}
+DEFAULT_FRAME_STRIDE = 3  # Sampling stride for videos that don't report a frame count
+_scan_executor = None
+_scan_executor_lock = threading.Lock()
 
 def get_video_info(video_path):
     """Get basic video information using OpenCV"""
@@ -31,58 +88,31 @@ def get_video_info(video_path):
 def calculate_detection_quality(frame, faces, bodies):
     """Calculate additional quality metrics for stricter detection"""
     height, width = frame.shape[:2]
+    faces, bodies = as_boxes(faces), as_boxes(bodies)
     
     # Check if detections are reasonably sized (not too small or too large)
-    quality_score = 0.0
+    # Face should be between 0.5% and 15% of frame area
+    face_ratio = area_ratios(faces, width, height)
+    face_size = np.where(in_band(face_ratio, 0.005, 0.15), 0.2, np.where(in_band(face_ratio, 0.001, 0.25), 0.1, 0.0))
+    # Check face aspect ratio (should be roughly square-ish)
+    face_shape = np.where(in_band(faces[:, BW] / faces[:, BH], 0.7, 1.3), 0.1, 0.0)
     
-    # Face quality checks
-    for (x, y, w, h) in faces:
-        face_area = w * h
-        frame_area = width * height
-        face_ratio = face_area / frame_area
-        
-        # Face should be between 0.5% and 15% of frame area
-        if 0.005 <= face_ratio <= 0.15:
-            quality_score += 0.2
-        elif 0.001 <= face_ratio <= 0.25:
-            quality_score += 0.1
-        
-        # Check face aspect ratio (should be roughly square-ish)
-        aspect_ratio = w / h
-        if 0.7 <= aspect_ratio <= 1.3:
-            quality_score += 0.1
-    
-    # Body quality checks
-    for (x, y, w, h) in bodies:
-        body_area = w * h
-        frame_area = width * height
-        body_ratio = body_area / frame_area
-        
-        # Body should be between 5% and 50% of frame area
-        if 0.05 <= body_ratio <= 0.5:
-            quality_score += 0.3
-        elif 0.02 <= body_ratio <= 0.7:
-            quality_score += 0.15
-        
-        # Check body aspect ratio (should be taller than wide)
-        aspect_ratio = h / w
-        if 1.5 <= aspect_ratio <= 4.0:
-            quality_score += 0.2
+    # Body should be between 5% and 50% of frame area
+    body_ratio = area_ratios(bodies, width, height)
+    body_size = np.where(in_band(body_ratio, 0.05, 0.5), 0.3, np.where(in_band(body_ratio, 0.02, 0.7), 0.15, 0.0))
+    # Check body aspect ratio (should be taller than wide)
+    body_shape = np.where(in_band(bodies[:, BH] / bodies[:, BW], 1.5, 4.0), 0.2, 0.0)
     
     # Check for reasonable positioning (not at edges)
-    for (x, y, w, h) in faces + bodies:
-        center_x = x + w/2
-        center_y = y + h/2
-        
-        # Should be in central area (not too close to edges)
-        if 0.1 <= center_x/width <= 0.9 and 0.1 <= center_y/height <= 0.9:
-            quality_score += 0.1
+    positioning = np.where(centered_mask(merge_boxes(faces, bodies), width, height, 0.1), 0.1, 0.0)
     
-    return min(quality_score, 1.0)
+    quality_score = face_size.sum() + face_shape.sum() + body_size.sum() + body_shape.sum() + positioning.sum()
+    return min(float(quality_score), 1.0)
 
 def validate_full_body_visibility_opencv(frame, faces, bodies):
     """Validate that the entire body is visible using OpenCV detections"""
     height, width = frame.shape[:2]
+    faces, bodies = as_boxes(faces), as_boxes(bodies)
     
     # Check if we have both face and body detections
     has_face = len(faces) > 0
@@ -100,10 +130,10 @@ def validate_full_body_visibility_opencv(frame, faces, bodies):
         }
     
     # Get the largest face and body detections
-    largest_face = max(faces, key=lambda f: f[2] * f[3]) if faces else None
-    largest_body = max(bodies, key=lambda b: b[2] * b[3]) if bodies else None
+    largest_face = largest_box(faces)
+    largest_body = largest_box(bodies)
     
-    if not largest_face or not largest_body:
+    if largest_face is None or largest_body is None:
         return {
             "is_valid": False,
             "confidence": 0.0,
@@ -114,8 +144,8 @@ def validate_full_body_visibility_opencv(frame, faces, bodies):
             "positioning_score": 0.0
         }
     
-    fx, fy, fw, fh = largest_face
-    bx, by, bw, bh = largest_body
+    fx, fy, fw, fh = largest_face.tolist()
+    bx, by, bw, bh = largest_body.tolist()
     
     # Calculate body coverage (how much of the frame the body occupies)
     body_area = bw * bh
@@ -209,13 +239,422 @@ def validate_full_body_visibility_opencv(frame, faces, bodies):
         "positioning_score": positioning_score
     }
 
-def detect_body_pose_in_video(video_path: str) -> dict:
+def load_cascades():
+    """This thread's Haar cascades, loaded on first use and kept for later scans"""
+    cascades = getattr(_cascade_cache, "cascades", None)
+    if cascades is None:
+        cascades = {}
+        for name, filename in CASCADE_FILES.items():
+            cascade = cv2.CascadeClassifier(cv2.data.haarcascades + filename)
+            if cascade.empty():
+                raise RuntimeError(f"Haar cascade {filename} not found in {cv2.data.haarcascades}")
+            cascades[name] = cascade
+        _cascade_cache.cascades = cascades
+    return cascades
+
+def cascades_available() -> bool:
+    try:
+        load_cascades()
+        return True
+    except RuntimeError:
+        return False
+
+def face_search_regions(bodies, width: int, height: int):
+    """
+    Regions (x0, y0, x1, y1) the face cascades search: each body box widened
+    by FACE_ROI_MARGIN_X a side and extended up by FACE_ROI_MARGIN_TOP of its
+    height, where the head above an upper-body box would be. Regions that
+    overlap so much that searching each would cost more than their bounding
+    box are searched as that one box.
+    """
+    regions = expand_boxes(as_boxes(bodies), FACE_ROI_MARGIN_X, FACE_ROI_MARGIN_TOP, width, height)
+    if len(regions) > 1:
+        union = np.concatenate([regions[:, :2].min(axis=0), regions[:, 2:].max(axis=0)])
+        areas = (regions[:, 2] - regions[:, 0]) * (regions[:, 3] - regions[:, 1])
+        if areas.sum() >= (union[2] - union[0]) * (union[3] - union[1]):
+            return [tuple(union.tolist())]
+    return [tuple(region) for region in regions.tolist()]
+
+def _detect(gray, cascades, passes, scale, regions=None) -> np.ndarray:
+    """Run each cascade pass over gray, or only inside regions; (N, 4) boxes in gray's pixels"""
+    if regions is None:
+        regions = [(0, 0, gray.shape[1], gray.shape[0])]
+    found = []
+    for name, scale_factor, min_neighbors, (min_w, min_h) in passes:
+        min_size = (max(1, int(min_w * scale)), max(1, int(min_h * scale)))
+        for x0, y0, x1, y1 in regions:
+            if x1 - x0 < min_size[0] or y1 - y0 < min_size[1]:
+                continue
+            boxes = as_boxes(cascades[name].detectMultiScale(
+                gray[y0:y1, x0:x1], scale_factor, min_neighbors, minSize=min_size
+            ))
+            found.append(boxes + (x0, y0, 0, 0))
+    return merge_boxes(*found)
+
+def score_frame(frame, cascades, profile: str = "strict", max_side: int = None) -> dict:
+    """
+    Score one video frame: face and body cascades, detection quality, full
+    body validation and exposure
+
+    The cascades run on a copy downscaled so its longer side is at most
+    max_side, and faces are only searched around detected bodies (see
+    face_search_regions); boxes are mapped back to the frame's own pixels.
+    Every measure is relative to the frame size, so confidences from
+    different working sizes are comparable.
+
+    Faces outside every body region are never found, so they add nothing to
+    face_confidence or quality_score: frames with stray faces (a poster, a
+    bystander) score lower than a full-frame face search would score them.
+    """
+    passes = SCAN_PROFILES[profile]
+    height, width = frame.shape[:2]
+    scale = 1.0
+    work = frame
+    if max_side and max(height, width) > max_side:
+        scale = max_side / max(height, width)
+        work = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
+    # Convert to grayscale for detection
+    gray = cv2.cvtColor(work, cv2.COLOR_BGR2GRAY)
+    
+    # Apply histogram equalization for better detection
+    gray = cv2.equalizeHist(gray)
+    
+    # Body detection with multiple cascades, combined and deduplicated
+    bodies = dedupe_boxes(_detect(gray, cascades, passes["bodies"], scale), 0.7)
+    
+    # Face detection with multiple cascades in and above the bodies, combined and deduplicated.
+    # No bodies means no face search, and no face confidence.
+    regions = face_search_regions(bodies, gray.shape[1], gray.shape[0])
+    faces = dedupe_boxes(_detect(gray, cascades, passes["faces"], scale, regions), 0.5)
+    
+    # Back to the frame's own pixels
+    if scale != 1.0:
+        faces = scale_boxes(faces, scale)
+        bodies = scale_boxes(bodies, scale)
+    
+    # STRICT confidence calculation
+    face_confidence = len(faces) * 0.25  # Reduced from 0.3 - each face adds 25% confidence
+    body_confidence = len(bodies) * 0.5   # Reduced from 0.7 - each body adds 50% confidence
+    
+    # Require BOTH face AND body for high confidence
+    if len(faces) == 0 or len(bodies) == 0:
+        total_confidence = min(face_confidence + body_confidence, 0.3)  # Cap at 30% if missing either
+    else:
+        total_confidence = min(face_confidence + body_confidence, 1.0)
+    
+    # Additional quality checks
+    quality_score = calculate_detection_quality(frame, faces, bodies)
+    
+    # Full body validation
+    full_body_validation = validate_full_body_visibility_opencv(frame, faces, bodies)
+    
+    # Calculate frame quality metrics
+    brightness = np.mean(gray)
+    contrast = np.std(gray)
+    
+    # Stricter brightness requirements (not too dark, not too bright)
+    if 40 <= brightness <= 200:
+        brightness_confidence = 0.15
+    elif 20 <= brightness <= 220:
+        brightness_confidence = 0.08
+    else:
+        brightness_confidence = 0.0
+    
+    # Stricter contrast requirements
+    if contrast >= 30:
+        contrast_confidence = 0.1
+    elif contrast >= 20:
+        contrast_confidence = 0.05
+    else:
+        contrast_confidence = 0.0
+    
+    # Calculate final confidence with stricter requirements
+    final_confidence = (
+        total_confidence * 0.6 +  # Detection confidence (60% weight)
+        quality_score * 0.25 +    # Quality score (25% weight)
+        brightness_confidence +   # Brightness (15% weight)
+        contrast_confidence       # Contrast (10% weight)
+    )
+    
+    return {
+        "faces": faces,
+        "bodies": bodies,
+        "face_confidence": face_confidence,
+        "body_confidence": body_confidence,
+        "quality_score": quality_score,
+        "brightness_confidence": brightness_confidence,
+        "contrast_confidence": contrast_confidence,
+        "total_confidence": final_confidence,
+        "brightness": brightness,
+        "contrast": contrast,
+        "full_body_validation": full_body_validation
+    }
+
+def passes_strict_criteria(score: dict) -> bool:
+    """MUCH STRICTER threshold - require 70% confidence minimum AND full body validation"""
+    return score["total_confidence"] >= 0.7 and score["full_body_validation"]["is_valid"]
+
+def annotate_frame(frame, score: dict, frame_number: int, frame_count: int):
+    """Draw the detections and confidence onto a copy of the frame; returns (image, annotations)"""
+    faces, bodies = as_boxes(score["faces"]), as_boxes(score["bodies"])
+    height, width = frame.shape[:2]
+    annotated_frame = frame.copy()
+    annotations = {
+        "faces": [],
+        "bodies": [],
+        "detection_quality": {
+            key: score[key] for key in (
+                "face_confidence", "body_confidence", "quality_score", "brightness_confidence",
+                "contrast_confidence", "total_confidence", "brightness", "contrast"
+            )
+        },
+        "full_body_validation": score["full_body_validation"]
+    }
+    
+    # Draw face annotations with confidence
+    for i, ((x, y, w, h), area_ratio) in enumerate(zip(faces.tolist(), area_ratios(faces, width, height).tolist())):
+        cv2.rectangle(annotated_frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+        cv2.putText(annotated_frame, f'Face {i+1}', (x, y-10), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        annotations["faces"].append({
+            "x": x, "y": y, "width": w, "height": h,
+            "area_ratio": area_ratio
+        })
+    
+    # Draw body annotations with confidence
+    for i, ((x, y, w, h), area_ratio) in enumerate(zip(bodies.tolist(), area_ratios(bodies, width, height).tolist())):
+        cv2.rectangle(annotated_frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+        cv2.putText(annotated_frame, f'Body {i+1}', (x, y-10), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+        annotations["bodies"].append({
+            "x": x, "y": y, "width": w, "height": h,
+            "area_ratio": area_ratio
+        })
+    
+    # Add detailed confidence information
+    cv2.putText(annotated_frame, f'STRICT Confidence: {score["total_confidence"]:.1%}', 
+               (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    cv2.putText(annotated_frame, f'Faces: {len(faces)}, Bodies: {len(bodies)}', 
+               (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    cv2.putText(annotated_frame, f'Quality: {score["quality_score"]:.2f}, Bright: {score["brightness"]:.0f}', 
+               (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    cv2.putText(annotated_frame, f'Frame: {frame_number}/{frame_count}', 
+               (10, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    
+    return annotated_frame, annotations
+
+def split_frame_ranges(frame_count: int, chunks: int, min_chunk_frames: int = 1):
+    """
+    Split a video into contiguous [start, end) frame ranges for parallel scanning
+
+    At most `chunks` ranges of at least min_chunk_frames each. The last range
+    ends at None (read to the end of the file), since container frame counts
+    are only estimates.
+    """
+    if frame_count <= 0:
+        return [(0, None)]
+    chunks = max(1, min(chunks, frame_count // max(1, min_chunk_frames)))
+    bounds = [frame_count * i // chunks for i in range(chunks)] + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def sample_stride(frame_count: int, samples: int) -> int:
+    """
+    Frames between analyzed samples, so a video of any length gets about `samples` of them
+
+    Videos with unknown length fall back to the old every-3rd-frame stride
+    (the time budget still bounds them).
+    """
+    if frame_count <= 0 or samples <= 0:
+        return DEFAULT_FRAME_STRIDE
+    return max(1, -(-frame_count // samples))
+
+def _seek(cap, frame_index: int) -> bool:
+    """
+    Position cap on frame_index
+
+    False when the container can't seek exactly; the frames are then read
+    forward from the start instead.
+    """
+    if frame_index <= 0:
+        return True
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame_index:
+        return True
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    for _ in range(frame_index):
+        if not cap.grab():
+            break
+    return False
+
+def _read_frames(cap, frame_numbers, frame_count: int, seek_frames: int, deadline, stats: dict):
+    """
+    Yield (frame_number, frame) for ascending 1-based frame numbers
+
+    Frames in between are only grabbed (decoded, never converted), and gaps
+    of at least seek_frames are seeked over instead. Once the wall-clock
+    deadline (time.time()) passes, reading stops early - but never before
+    one frame has been read, however late the scan started.
+    """
+    position = 0  # Index of the next frame cap returns
+    for frame_number in frame_numbers:
+        if deadline is not None and stats["frames_analyzed"] and time.time() > deadline:
+            stats["budget_exhausted"] = True
+            return
+        
+        gap = frame_number - 1 - position
+        # Past the reported length a seek would miss and fall back to reading from the start
+        if (position == 0 and gap > 0) or (seek_frames and gap >= seek_frames and frame_number <= frame_count):
+            if not _seek(cap, frame_number - 1):
+                seek_frames = 0
+        else:
+            for _ in range(gap):
+                if not cap.grab():
+                    break
+        ret, frame = cap.read()
+        if not ret:
+            return
+        position = frame_number
+        stats["frames_analyzed"] += 1
+        yield frame_number, frame
+
+def _scan(video_path: str, frame_numbers, frame_count: int, seek_frames: int, deadline,
+          profile: str, max_side) -> dict:
+    """
+    Score the given frames; returns every (frame_number, confidence, is_valid)
+    and, for the strict profile, the best frame passing the STRICT criteria
+    with its annotated JPEG
+    """
+    cascades = load_cascades()
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise Exception("Could not open video file")
+    
+    stats = {"frames_analyzed": 0, "budget_exhausted": False}
+    scores = []
+    best = None
+    best_frame = None
+    best_score = None
+    try:
+        for frame_number, frame in _read_frames(cap, frame_numbers, frame_count, seek_frames, deadline, stats):
+            score = score_frame(frame, cascades, profile, max_side)
+            is_valid = score["full_body_validation"]["is_valid"]
+            scores.append((frame_number, score["total_confidence"], is_valid))
+            if (profile == "strict" and passes_strict_criteria(score) and
+                    (best is None or score["total_confidence"] > best["confidence"])):
+                best = {"confidence": score["total_confidence"], "frame_number": frame_number}
+                best_frame = frame.copy()
+                best_score = score
+                logger.debug(
+                    "STRICT: New best frame found: frame %d, confidence: %.1f%% - "
+                    "Faces: %d, Bodies: %d, Quality: %.2f, Brightness: %.0f, Contrast: %.0f",
+                    frame_number, score["total_confidence"] * 100, len(score["faces"]), len(score["bodies"]),
+                    score["quality_score"], score["brightness"], score["contrast"],
+                    extra={"event": "video_best_frame"}
+                )
+    finally:
+        cap.release()
+    
+    if best is not None:
+        annotated_frame, best["annotations"] = annotate_frame(best_frame, best_score, best["frame_number"], frame_count)
+        _, buffer = cv2.imencode('.jpg', annotated_frame)
+        best["image"] = buffer.tobytes()
+    return dict(stats, scores=scores, best=best)
+
+def scan_frame_range(video_path: str, start: int, end, stride: int, frame_count: int,
+                     seek_frames: int = 0, deadline: float = None, profile: str = "strict",
+                     max_side: int = None) -> dict:
+    """
+    Score every stride-th frame in [start, end) of a video
+
+    Runs in a scan worker process. Frame numbers are 1-based positions in the
+    whole video, so a video split into ranges samples exactly the frames a
+    single pass would. Only the best frame's annotated JPEG travels back.
+    """
+    first = -(-(start + 1) // stride) * stride
+    frame_numbers = itertools.count(first, stride) if end is None else range(first, end + 1, stride)
+    return _scan(video_path, frame_numbers, frame_count, seek_frames, deadline, profile, max_side)
+
+def scan_frame_list(video_path: str, frame_numbers, frame_count: int, seek_frames: int = 0,
+                    deadline: float = None, max_side: int = None) -> dict:
+    """Score the given ascending frame numbers with the STRICT criteria (a scan worker's refine pass)"""
+    return _scan(video_path, frame_numbers, frame_count, seek_frames, deadline, "strict", max_side)
+
+def refine_frame_numbers(scores, stride: int, candidates: int, radius: int, frame_count: int):
+    """
+    Frames the STRICT pass re-scans around the top coarse candidates
+
+    Candidates rank by coarse validation, then confidence (earlier frames win
+    ties). Each one's neighborhood is radius frames either side, spread over
+    the half-gap to the neighboring samples. Returns sorted frame numbers.
+    """
+    ranked = sorted(scores, key=lambda s: (s[2], s[1], -s[0]), reverse=True)[:candidates]
+    step = max(1, stride // (2 * radius)) if radius > 0 else 1
+    frames = set()
+    for frame_number, _, _ in ranked:
+        for k in range(-radius, radius + 1):
+            neighbor = frame_number + k * step
+            if neighbor >= 1 and (frame_count <= 0 or neighbor <= frame_count):
+                frames.add(neighbor)
+    return sorted(frames)
+
+def configure_video_scan(**settings):
+    """
+    Set video scan defaults (see _scan_settings); None values are left unchanged
+
+    The process pool is created on the first scan that needs it, sized by
+    the workers setting at that point.
+    """
+    for key, value in settings.items():
+        if key not in _scan_settings:
+            raise ValueError(f"Unknown video scan setting '{key}'")
+        if value is not None:
+            _scan_settings[key] = value
+
+def _get_scan_executor() -> ProcessPoolExecutor:
+    global _scan_executor
+    with _scan_executor_lock:
+        if _scan_executor is None:
+            # Spawned like the inference pool's workers; each loads its own cascades
+            _scan_executor = ProcessPoolExecutor(max_workers=max(1, _scan_settings["workers"]),
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_scan_executor.shutdown, wait=False, cancel_futures=True)
+        return _scan_executor
+
+def _run_scans(fn, scan_args):
+    """Run one scan per argument tuple - in the calling thread if there's only one"""
+    if len(scan_args) <= 1:
+        return [fn(*args) for args in scan_args]
+    executor = _get_scan_executor()
+    futures = [executor.submit(fn, *args) for args in scan_args]
+    return [future.result() for future in futures]
+
+def detect_body_pose_in_video(video_path: str, workers: int = None, samples: int = None,
+                              time_budget: float = None, coarse_size: int = None) -> dict:
     """
     Detect body pose in video using OpenCV with STRICT detection criteria
     where a person is clearly visible with annotations
+
+    About `samples` evenly spaced frames are scored whatever the video's
+    length, in frame ranges scanned in parallel by the scan worker processes.
+    With a coarse_size the search is coarse-to-fine: the samples are scored
+    cheaply at that size, and only the neighborhoods of the best few are
+    re-scanned with the STRICT criteria (at the work_size setting). Without one, or
+    when those neighborhoods would cover as many frames as there are
+    samples, every sample gets the STRICT treatment. After time_budget
+    seconds the scan stops early (the coarse pass gets the first half) and
+    the best frame found so far is returned. Unset arguments use
+    configure_video_scan's settings.
     """
     try:
-        print(f"Processing video for STRICT body detection: {video_path}")
+        logger.info("Processing video for STRICT body detection: %s", video_path)
+        started = time.perf_counter()
+        workers = max(1, _scan_settings["workers"] if workers is None else workers)
+        samples = _scan_settings["samples"] if samples is None else samples
+        time_budget = _scan_settings["time_budget"] if time_budget is None else time_budget
+        coarse_size = _scan_settings["coarse_size"] if coarse_size is None else coarse_size
+        work_size = _scan_settings["work_size"] or None
+        deadline = time.time() + time_budget if time_budget and time_budget > 0 else None
         
         # Open video file
         cap = cv2.VideoCapture(video_path)
@@ -225,220 +664,89 @@ def detect_body_pose_in_video(video_path: str) -> dict:
         frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         fps = cap.get(cv2.CAP_PROP_FPS)
         duration = frame_count / fps if fps > 0 else 0
+        cap.release()
         
-        print(f"Video info: {frame_count} frames, {fps} fps, {duration:.2f}s duration")
-        
-        best_frame = None
-        best_confidence = 0
-        best_frame_number = 0
-        best_annotations = None
-        
-        # Load multiple pre-trained models for stricter detection
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        face_alt_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_alt.xml')
-        body_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_fullbody.xml')
-        upper_body_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_upperbody.xml')
+        logger.info("Video info: %d frames, %s fps, %.2fs duration", frame_count, fps, duration)
         
-        # Process every 3rd frame for more thorough analysis
-        frame_skip = 3
-        processed_frames = 0
-        total_frames_analyzed = 0
+        stride = sample_stride(frame_count, samples)
+        # Seeking re-decodes from the previous keyframe, so it only beats grabbing over long gaps
+        seek_seconds = _scan_settings["seek_seconds"]
+        seek_frames = max(2, int(seek_seconds * fps)) if seek_seconds > 0 and fps > 0 and frame_count > 0 else 0
+        ranges = split_frame_ranges(frame_count, workers, max(_scan_settings["min_chunk_frames"], stride))
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            processed_frames += 1
-            
-            # Skip frames to speed up processing
-            if processed_frames % frame_skip != 0:
-                continue
-            
-            total_frames_analyzed += 1
-            
-            # Convert to grayscale for detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Apply histogram equalization for better detection
-            gray = cv2.equalizeHist(gray)
-            
-            # STRICT detection with multiple cascades and parameters
-            # Face detection with multiple cascades
-            faces1 = face_cascade.detectMultiScale(gray, 1.05, 6, minSize=(30, 30))
-            faces2 = face_alt_cascade.detectMultiScale(gray, 1.05, 6, minSize=(30, 30))
-            
-            # Combine and deduplicate face detections
-            all_faces = list(faces1) + list(faces2)
-            faces = []
-            for face in all_faces:
-                # Remove duplicates (faces that are too close to each other)
-                is_duplicate = False
-                for existing_face in faces:
-                    x1, y1, w1, h1 = face
-                    x2, y2, w2, h2 = existing_face
-                    center_dist = np.sqrt((x1-x2)**2 + (y1-y2)**2)
-                    if center_dist < min(w1, w2) * 0.5:
-                        is_duplicate = True
-                        break
-                if not is_duplicate:
-                    faces.append(face)
-            
-            # Body detection with multiple cascades
-            bodies = body_cascade.detectMultiScale(gray, 1.05, 6, minSize=(50, 100))
-            upper_bodies = upper_body_cascade.detectMultiScale(gray, 1.05, 6, minSize=(50, 50))
+        # Short videos have too few samples for the coarse pass to save any STRICT work
+        refine_frames = _scan_settings["candidates"] * (2 * _scan_settings["refine_radius"] + 1)
+        coarse = coarse_size and coarse_size > 0 and (frame_count <= 0 or frame_count // stride > refine_frames)
+        if coarse:
+            # Pass one: cheap scores for every sample
+            coarse_deadline = time.time() + time_budget / 2 if deadline is not None else None
+            coarse_results = _run_scans(scan_frame_range, [
+                (video_path, start, end, stride, frame_count, seek_frames, coarse_deadline, "coarse", coarse_size)
+                for start, end in ranges
+            ])
+            coarse_scores = [score for chunk in coarse_results for score in chunk["scores"]]
             
-            # Combine body detections
-            all_bodies = list(bodies) + list(upper_bodies)
-            bodies = []
-            for body in all_bodies:
-                # Remove duplicates
-                is_duplicate = False
-                for existing_body in bodies:
-                    x1, y1, w1, h1 = body
-                    x2, y2, w2, h2 = existing_body
-                    center_dist = np.sqrt((x1-x2)**2 + (y1-y2)**2)
-                    if center_dist < min(w1, w2) * 0.7:
-                        is_duplicate = True
-                        break
-                if not is_duplicate:
-                    bodies.append(body)
-            
-            # STRICT confidence calculation
-            face_confidence = len(faces) * 0.25  # Reduced from 0.3 - each face adds 25% confidence
-            body_confidence = len(bodies) * 0.5   # Reduced from 0.7 - each body adds 50% confidence
-            
-            # Require BOTH face AND body for high confidence
-            if len(faces) == 0 or len(bodies) == 0:
-                total_confidence = min(face_confidence + body_confidence, 0.3)  # Cap at 30% if missing either
-            else:
-                total_confidence = min(face_confidence + body_confidence, 1.0)
-            
-            # Additional quality checks
-            quality_score = calculate_detection_quality(frame, faces, bodies)
-            
-            # Full body validation
-            full_body_validation = validate_full_body_visibility_opencv(frame, faces, bodies)
-            
-            # Calculate frame quality metrics
-            brightness = np.mean(gray)
-            contrast = np.std(gray)
-            
-            # Stricter brightness requirements (not too dark, not too bright)
-            if 40 <= brightness <= 200:
-                brightness_confidence = 0.15
-            elif 20 <= brightness <= 220:
-                brightness_confidence = 0.08
-            else:
-                brightness_confidence = 0.0
-            
-            # Stricter contrast requirements
-            if contrast >= 30:
-                contrast_confidence = 0.1
-            elif contrast >= 20:
-                contrast_confidence = 0.05
-            else:
-                contrast_confidence = 0.0
-            
-            # Calculate final confidence with stricter requirements
-            final_confidence = (
-                total_confidence * 0.6 +  # Detection confidence (60% weight)
-                quality_score * 0.25 +    # Quality score (25% weight)
-                brightness_confidence +   # Brightness (15% weight)
-                contrast_confidence       # Contrast (10% weight)
-            )
-            
-            # MUCH STRICTER threshold - require 70% confidence minimum AND full body validation
-            if (final_confidence > best_confidence and 
-                final_confidence >= 0.7 and 
-                full_body_validation["is_valid"]):
-                best_confidence = final_confidence
-                best_frame = frame.copy()
-                best_frame_number = processed_frames
-                
-                # Create detailed annotations for the best frame
-                annotated_frame = frame.copy()
-                annotations = {
-                    "faces": [],
-                    "bodies": [],
-                    "detection_quality": {
-                        "face_confidence": face_confidence,
-                        "body_confidence": body_confidence,
-                        "quality_score": quality_score,
-                        "brightness_confidence": brightness_confidence,
-                        "contrast_confidence": contrast_confidence,
-                        "total_confidence": final_confidence,
-                        "brightness": brightness,
-                        "contrast": contrast
-                    },
-                    "full_body_validation": full_body_validation
-                }
-                
-                # Draw face annotations with confidence
-                for i, (x, y, w, h) in enumerate(faces):
-                    cv2.rectangle(annotated_frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-                    cv2.putText(annotated_frame, f'Face {i+1}', (x, y-10), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                    annotations["faces"].append({
-                        "x": int(x), "y": int(y), "width": int(w), "height": int(h),
-                        "area_ratio": (w * h) / (frame.shape[0] * frame.shape[1])
-                    })
-                
-                # Draw body annotations with confidence
-                for i, (x, y, w, h) in enumerate(bodies):
-                    cv2.rectangle(annotated_frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
-                    cv2.putText(annotated_frame, f'Body {i+1}', (x, y-10), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
-                    annotations["bodies"].append({
-                        "x": int(x), "y": int(y), "width": int(w), "height": int(h),
-                        "area_ratio": (w * h) / (frame.shape[0] * frame.shape[1])
-                    })
-                
-                # Add detailed confidence information
-                cv2.putText(annotated_frame, f'STRICT Confidence: {final_confidence:.1%}', 
-                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                cv2.putText(annotated_frame, f'Faces: {len(faces)}, Bodies: {len(bodies)}', 
-                           (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                cv2.putText(annotated_frame, f'Quality: {quality_score:.2f}, Bright: {brightness:.0f}', 
-                           (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                cv2.putText(annotated_frame, f'Frame: {processed_frames}/{frame_count}', 
-                           (10, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                
-                best_annotations = annotations
-                print(f"STRICT: New best frame found: frame {processed_frames}, confidence: {final_confidence:.1%}")
-                print(f"  - Faces: {len(faces)}, Bodies: {len(bodies)}, Quality: {quality_score:.2f}")
-                print(f"  - Brightness: {brightness:.0f}, Contrast: {contrast:.0f}")
+            # Pass two: STRICT scoring around the best candidates, split into contiguous groups
+            refine = refine_frame_numbers(coarse_scores, stride, _scan_settings["candidates"],
+                                          _scan_settings["refine_radius"], frame_count)
+            groups = min(workers, len(refine))
+            chunk_results = _run_scans(scan_frame_list, [
+                (video_path, refine[i * len(refine) // groups:(i + 1) * len(refine) // groups],
+                 frame_count, seek_frames, deadline, work_size)
+                for i in range(groups)
+            ])
+            frames_coarse = sum(chunk["frames_analyzed"] for chunk in coarse_results)
+            budget_exhausted = any(chunk["budget_exhausted"] for chunk in coarse_results + chunk_results)
+        else:
+            chunk_results = _run_scans(scan_frame_range, [
+                (video_path, start, end, stride, frame_count, seek_frames, deadline, "strict", work_size)
+                for start, end in ranges
+            ])
+            frames_coarse = 0
+            budget_exhausted = any(chunk["budget_exhausted"] for chunk in chunk_results)
         
-        cap.release()
+        frames_strict = sum(chunk["frames_analyzed"] for chunk in chunk_results)
+        # Highest confidence wins; ties go to the earliest frame, as in a single pass
+        candidates = [chunk["best"] for chunk in chunk_results if chunk["best"] is not None]
+        best = max(candidates, key=lambda c: (c["confidence"], -c["frame_number"]), default=None)
         
-        print(f"STRICT detection completed. Analyzed {total_frames_analyzed} frames.")
+        logger.info("STRICT detection completed. Analyzed %d frames coarse and %d STRICT (every %d) "
+                    "in %d range(s) in %.0f ms%s.",
+                    frames_coarse, frames_strict, stride, len(ranges), (time.perf_counter() - started) * 1000,
+                    ", time budget exhausted" if budget_exhausted else "")
         
-        if best_frame is not None:
+        scan_stats = {
+            "frames_analyzed": frames_coarse + frames_strict,
+            "frames_strict": frames_strict,
+            "budget_exhausted": budget_exhausted
+        }
+        if best is not None:
             # Convert the annotated frame to base64
-            _, buffer = cv2.imencode('.jpg', annotated_frame)
-            frame_base64 = base64.b64encode(buffer).decode('utf-8')
+            frame_base64 = base64.b64encode(best["image"]).decode('utf-8')
             frame_data_url = f"data:image/jpeg;base64,{frame_base64}"
             
             return {
                 "success": True,
                 "best_frame": frame_data_url,
-                "confidence": best_confidence,
-                "frame_number": best_frame_number,
-                "annotations": best_annotations,
-                "message": f"Person detected with STRICT {best_confidence:.1%} confidence",
+                "confidence": best["confidence"],
+                "frame_number": best["frame_number"],
+                "annotations": best["annotations"],
+                **scan_stats,
+                "message": f"Person detected with STRICT {best['confidence']:.1%} confidence",
                 "detection_mode": "strict"
             }
         else:
             return {
                 "success": False,
+                **scan_stats,
                 "message": "No suitable frame found with STRICT detection criteria (minimum 70% confidence required)",
                 "detection_mode": "strict"
             }
             
     except Exception as e:
-        print(f"Error in STRICT body detection: {str(e)}")
+        logger.error("Error in STRICT body detection: %s", e)
         return {
             "success": False,
             "message": f"Error processing video: {str(e)}",
             "detection_mode": "strict"
-        } 
\ No newline at end of file
+        }
@@ -0,0 +1,86 @@
+import numpy as np
+
+# Box array columns: OpenCV's (x, y, width, height) in pixels
+BX, BY, BW, BH = 0, 1, 2, 3
+
+
+def as_boxes(detections) -> np.ndarray:
+    """
+    Detections as an (N, 4) int64 array
+
+    Accepts a detectMultiScale result (an (N, 4) array, or an empty tuple
+    when nothing was found), a list of boxes, or an existing array.
+    """
+    return np.asarray(detections, dtype=np.int64).reshape(-1, 4)
+
+
+def merge_boxes(*groups) -> np.ndarray:
+    """Concatenate several detection results into one (N, 4) array, in order"""
+    return np.concatenate([as_boxes(group) for group in groups]) if groups else as_boxes(())
+
+
+def box_areas(boxes: np.ndarray) -> np.ndarray:
+    return boxes[:, BW] * boxes[:, BH]
+
+
+def area_ratios(boxes: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Each box's share of the frame area"""
+    return box_areas(boxes) / (width * height)
+
+
+def in_band(values: np.ndarray, low: float, high: float) -> np.ndarray:
+    """low <= values <= high, elementwise"""
+    return (low <= values) & (values <= high)
+
+
+def centered_mask(boxes: np.ndarray, width: int, height: int, margin: float = 0.1) -> np.ndarray:
+    """Boxes whose centers lie at least margin (a fraction of the frame) from every edge"""
+    center_x = boxes[:, BX] + boxes[:, BW] / 2
+    center_y = boxes[:, BY] + boxes[:, BH] / 2
+    return in_band(center_x / width, margin, 1 - margin) & in_band(center_y / height, margin, 1 - margin)
+
+
+def largest_box(boxes: np.ndarray):
+    """The box with the largest area (the first on ties), or None"""
+    return boxes[np.argmax(box_areas(boxes))] if len(boxes) else None
+
+
+def dedupe_boxes(boxes: np.ndarray, overlap: float) -> np.ndarray:
+    """
+    Greedily drop boxes that duplicate an earlier kept one
+
+    A box duplicates another when their top-left corners are closer than
+    overlap times the narrower box's width. Distances are computed for all
+    pairs at once; only the keep decisions walk the boxes in order.
+    """
+    if len(boxes) < 2:
+        return boxes
+    dx = boxes[:, None, BX] - boxes[None, :, BX]
+    dy = boxes[:, None, BY] - boxes[None, :, BY]
+    min_width = np.minimum(boxes[:, None, BW], boxes[None, :, BW])
+    duplicate = np.sqrt(dx ** 2 + dy ** 2) < min_width * overlap
+    keep = np.zeros(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        keep[i] = not (duplicate[i, :i] & keep[:i]).any()
+    return boxes[keep]
+
+
+def scale_boxes(boxes: np.ndarray, factor: float) -> np.ndarray:
+    """Boxes measured in an image resized by factor, back in the original's pixels"""
+    return np.round(boxes / factor).astype(np.int64)
+
+
+def expand_boxes(boxes: np.ndarray, margin_x: float, margin_top: float, width: int, height: int) -> np.ndarray:
+    """
+    Regions (x0, y0, x1, y1) around each box: widened by margin_x of its width
+    a side and extended up by margin_top of its height, clipped to the frame;
+    regions clipped away entirely are dropped
+    """
+    x, y, w, h = boxes[:, BX], boxes[:, BY], boxes[:, BW], boxes[:, BH]
+    regions = np.stack([
+        np.maximum(0, (x - w * margin_x).astype(np.int64)),
+        np.maximum(0, (y - h * margin_top).astype(np.int64)),
+        np.minimum(width, (x + w * (1 + margin_x)).astype(np.int64)),
+        np.minimum(height, y + h),
+    ], axis=1).reshape(-1, 4)
+    return regions[(regions[:, 2] > regions[:, 0]) & (regions[:, 3] > regions[:, 1])]
@@ -0,0 +1,44 @@
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from services.pose_landmarks import FULL_BODY_IDX, X, Y
+
+
+class StabilityDetector:
+    """
+    Decides when a stream has held a steady, fully visible pose long enough to capture
+
+    Each frame is recorded with its full body validation result and landmark
+    positions. The detector fires once at least required_valid of the last
+    window frames passed validation and the head-to-toe landmarks of those
+    valid frames barely moved (mean per-landmark standard deviation, in
+    normalized image units, at most max_jitter).
+    """
+
+    def __init__(self, required_valid: int = 10, window: int = 15, max_jitter: float = 0.01):
+        self.required_valid = max(1, required_valid)
+        self.window = max(window, self.required_valid)
+        self.max_jitter = max_jitter
+        self._frames: deque = deque(maxlen=self.window)  # (is_valid, (N, 2) landmark xy or None)
+        self.jitter: Optional[float] = None  # Of the frames that made the detector fire
+
+    def update(self, is_valid: bool, landmark_array: Optional[np.ndarray]) -> bool:
+        """Record one frame; True when the recent frames are valid and steady"""
+        valid = bool(is_valid) and landmark_array is not None
+        points = landmark_array[FULL_BODY_IDX][:, [X, Y]] if valid else None
+        self._frames.append((valid, points))
+
+        valid_points = [points for valid, points in self._frames if valid]
+        if len(valid_points) < self.required_valid:
+            return False
+        jitter = float(np.stack(valid_points[-self.required_valid:]).std(axis=0).mean())
+        if jitter > self.max_jitter:
+            return False
+        self.jitter = jitter
+        return True
+
+    def reset(self):
+        self._frames.clear()
+        self.jitter = None
@@ -0,0 +1,173 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from async_runtime import native_lock, offload
+from services.realtime_detection import RealtimeBodyDetector
+
+
+class DetectorPoolFullError(Exception):
+    """Raised when every detector slot is held by an active session"""
+
+
+class DetectorPool:
+    """Pool of RealtimeBodyDetector instances keyed by Socket.IO session id
+
+    Each streaming client gets its own detector (and MediaPipe Pose graph) so
+    sessions no longer share best-frame state or serialize on one graph.
+    Released detectors are reset and kept for reuse, since building a Pose
+    graph is far more expensive than resetting one.
+
+    Resetting runs inference on a blank frame, so detectors are taken out of
+    the pool under the lock but reset (or closed) after it is released; a
+    disconnect or eviction never stalls other sessions' get() calls. Building
+    and resetting are offloaded, and the lock is a native one since warm()
+    runs on an offload thread.
+    """
+
+    def __init__(self, max_size: int = 32, idle_timeout: float = 300.0,
+                 factory: Callable[[], RealtimeBodyDetector] = RealtimeBodyDetector,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            on_evict: Called with the sid of each session evicted for being
+                idle, so per-session state held elsewhere can be dropped too
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.on_evict = on_evict
+        self._factory = factory
+        self._lock = native_lock()
+        # sid -> {"detector": RealtimeBodyDetector, "last_used": float}, oldest first
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._free: List[RealtimeBodyDetector] = []
+
+    def acquire(self, sid: str) -> RealtimeBodyDetector:
+        """Get the detector for a session, creating one if needed"""
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is not None:
+                self._touch(sid, session)
+                return session["detector"]
+
+            evicted = []
+            if len(self._sessions) >= self.max_size:
+                evicted = self._pop_idle_locked()
+            if len(self._sessions) >= self.max_size:
+                raise DetectorPoolFullError(
+                    f"Detector pool is full ({self.max_size} active sessions)"
+                )
+
+            detector = self._free.pop() if self._free else None
+
+        # Reset and build outside the lock - both run the Pose graph
+        if detector is None and evicted:
+            # An evicted session's detector is as good as a free one once reset
+            evicted_sid, detector = evicted.pop()
+            offload(detector.reset)
+            self._notify_evicted(evicted_sid)
+        self._finish_eviction(evicted)
+        if detector is None:
+            detector = offload(self._factory)
+
+        with self._lock:
+            existing = self._sessions.get(sid)
+            if existing is None:
+                self._sessions[sid] = {"detector": detector, "last_used": time.monotonic()}
+                return detector
+            # Another thread registered this session while we were building
+            self._touch(sid, existing)
+            winner = existing["detector"]
+        self._recycle(detector)
+        return winner
+
+    def get(self, sid: str) -> Optional[RealtimeBodyDetector]:
+        """Get the detector for an existing session without creating one"""
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return None
+            self._touch(sid, session)
+            return session["detector"]
+
+    def warm(self, count: int) -> int:
+        """
+        Build up to count idle detectors ahead of time and warm their graphs
+
+        Returns how many were added; the pool never grows past max_size.
+        """
+        added = 0
+        for _ in range(count):
+            with self._lock:
+                if len(self._sessions) + len(self._free) >= self.max_size:
+                    break
+            detector = self._factory()
+            detector.warm_up()
+            with self._lock:
+                full = len(self._sessions) + len(self._free) >= self.max_size
+                if not full:
+                    self._free.append(detector)
+            if full:
+                detector.close()
+                break
+            added += 1
+        return added
+
+    def release(self, sid: str) -> bool:
+        """Release a session's detector back to the pool"""
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+        if session is None:
+            return False
+        self._recycle(session["detector"])
+        return True
+
+    def evict_idle(self) -> int:
+        """Release every session idle for longer than idle_timeout"""
+        with self._lock:
+            evicted = self._pop_idle_locked()
+        self._finish_eviction(evicted)
+        return len(evicted)
+
+    def stats(self) -> Dict:
+        """Get pool occupancy for health/metrics reporting"""
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "free_detectors": len(self._free),
+                "max_size": self.max_size,
+                "idle_timeout": self.idle_timeout
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _touch(self, sid: str, session: Dict):
+        session["last_used"] = time.monotonic()
+        self._sessions.move_to_end(sid)
+
+    def _pop_idle_locked(self) -> List[Tuple[str, RealtimeBodyDetector]]:
+        cutoff = time.monotonic() - self.idle_timeout
+        idle_sids = [sid for sid, session in self._sessions.items() if session["last_used"] < cutoff]
+        return [(sid, self._sessions.pop(sid)["detector"]) for sid in idle_sids]
+
+    def _finish_eviction(self, evicted: List[Tuple[str, RealtimeBodyDetector]]):
+        """Recycle evicted sessions' detectors and tell the owner; call without the lock"""
+        for sid, detector in evicted:
+            self._recycle(detector)
+            self._notify_evicted(sid)
+
+    def _notify_evicted(self, sid: str):
+        if self.on_evict is not None:
+            self.on_evict(sid)
+
+    def _recycle(self, detector: RealtimeBodyDetector):
+        """Reset a detector no session holds and keep it for reuse; call without the lock"""
+        offload(detector.reset)
+        with self._lock:
+            keep = len(self._sessions) + len(self._free) < self.max_size
+            if keep:
+                self._free.append(detector)
+        if not keep:
+            detector.close()
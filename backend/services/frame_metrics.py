@@ -0,0 +1,176 @@
+import bisect
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# Histogram bucket upper bounds in milliseconds (exported in seconds)
+STAGE_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+SESSION_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StageTimer:
+    """
+    Lap timer for the stages of one frame
+
+    Each lap() charges the time since the previous lap to a stage; laps with
+    the same name accumulate, so a stage can be split across several calls.
+    """
+
+    __slots__ = ("start", "_last", "stages")
+
+    def __init__(self):
+        self.start = self._last = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def total_ms(self) -> float:
+        return (self._last - self.start) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage timings in milliseconds, plus the total"""
+        timings = {stage: round(ms, 3) for stage, ms in self.stages.items()}
+        timings["total"] = round(self.total_ms(), 3)
+        return timings
+
+
+class _Histogram:
+    """Cumulative Prometheus-style histogram over STAGE_BUCKETS_MS"""
+
+    __slots__ = ("counts", "sum_ms", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(STAGE_BUCKETS_MS) + 1)  # Last bucket is +Inf
+        self.sum_ms = 0.0
+        self.count = 0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(STAGE_BUCKETS_MS, ms)] += 1
+        self.sum_ms += ms
+        self.count += 1
+
+
+def _quantile(sorted_samples: List[float], q: float) -> float:
+    return sorted_samples[min(int(q * len(sorted_samples)), len(sorted_samples) - 1)]
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class FrameMetrics:
+    """
+    Per-stage frame timings for the realtime path
+
+    Every processed frame feeds a global cumulative histogram per stage and a
+    rolling window of the session's most recent frames. render_prometheus()
+    writes both in the Prometheus text exposition format.
+    """
+
+    def __init__(self, window: int = 120):
+        self.window = window
+        self._lock = threading.Lock()
+        self._global: Dict[str, _Histogram] = {}
+        self._sessions: Dict[str, Dict[str, deque]] = {}
+        self._frames_total = 0
+        self._errors_total = 0
+
+    def observe(self, sid: str, timings: Dict[str, float]):
+        """Record one frame's stage timings (milliseconds) for a session"""
+        with self._lock:
+            self._frames_total += 1
+            session = self._sessions.setdefault(sid, {})
+            for stage, ms in timings.items():
+                histogram = self._global.get(stage)
+                if histogram is None:
+                    histogram = self._global[stage] = _Histogram()
+                histogram.observe(ms)
+                samples = session.get(stage)
+                if samples is None:
+                    samples = session[stage] = deque(maxlen=self.window)
+                samples.append(ms)
+
+    def observe_error(self):
+        with self._lock:
+            self._errors_total += 1
+
+    def remove_session(self, sid: str):
+        """Drop a finished session's rolling window"""
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None,
+                          counters: Optional[Dict[str, float]] = None) -> str:
+        """
+        Render all metrics in the Prometheus text format
+
+        Args:
+            gauges: Extra point-in-time values (e.g. pool occupancy), exported
+                as realtime_<name> gauges
+            counters: Extra running totals kept elsewhere (e.g. dropped log
+                records), exported as realtime_<name> counters
+        """
+        with self._lock:
+            frames_total, errors_total = self._frames_total, self._errors_total
+            histograms = {
+                stage: (list(h.counts), h.sum_ms, h.count) for stage, h in self._global.items()
+            }
+            sessions = {
+                sid: {stage: sorted(samples) for stage, samples in session.items() if samples}
+                for sid, session in self._sessions.items()
+            }
+
+        lines = [
+            "# HELP realtime_frames_total Frames processed by the realtime detector",
+            "# TYPE realtime_frames_total counter",
+            f"realtime_frames_total {frames_total}",
+            "# HELP realtime_frame_errors_total Frames that failed processing",
+            "# TYPE realtime_frame_errors_total counter",
+            f"realtime_frame_errors_total {errors_total}",
+            # process_time() only covers this process: inference and video scan workers are not included
+            "# HELP realtime_main_process_cpu_seconds_total User and system CPU time of the server process "
+            "(all threads, excluding worker processes)",
+            "# TYPE realtime_main_process_cpu_seconds_total counter",
+            f"realtime_main_process_cpu_seconds_total {time.process_time():.3f}",
+            "# HELP realtime_frame_stage_seconds Time spent per frame processing stage",
+            "# TYPE realtime_frame_stage_seconds histogram"
+        ]
+        for stage in sorted(histograms):
+            counts, sum_ms, count = histograms[stage]
+            label = f'stage="{_escape_label(stage)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(STAGE_BUCKETS_MS, counts):
+                cumulative += bucket_count
+                lines.append(f'realtime_frame_stage_seconds_bucket{{{label},le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'realtime_frame_stage_seconds_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"realtime_frame_stage_seconds_sum{{{label}}} {sum_ms / 1000:.6f}")
+            lines.append(f"realtime_frame_stage_seconds_count{{{label}}} {count}")
+
+        lines += [
+            "# HELP realtime_session_stage_seconds Per-session stage time over the last frames",
+            "# TYPE realtime_session_stage_seconds summary"
+        ]
+        for sid in sorted(sessions):
+            for stage in sorted(sessions[sid]):
+                samples = sessions[sid][stage]
+                label = f'session="{_escape_label(sid)}",stage="{_escape_label(stage)}"'
+                for q in SESSION_QUANTILES:
+                    lines.append(
+                        f'realtime_session_stage_seconds{{{label},quantile="{q}"}} {_quantile(samples, q) / 1000:.6f}'
+                    )
+                lines.append(f"realtime_session_stage_seconds_sum{{{label}}} {sum(samples) / 1000:.6f}")
+                lines.append(f"realtime_session_stage_seconds_count{{{label}}} {len(samples)}")
+
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE realtime_{name} gauge")
+            lines.append(f"realtime_{name} {value}")
+        for name, value in sorted((counters or {}).items()):
+            lines.append(f"# TYPE realtime_{name} counter")
+            lines.append(f"realtime_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
@@ -0,0 +1,175 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class _SessionSlot:
+    """Single-frame mailbox for one streaming session"""
+
+    __slots__ = ("pending", "received_at", "scheduled", "dropped_frames", "stale_frames")
+
+    def __init__(self):
+        self.pending: Optional[Any] = None
+        self.received_at = 0.0
+        self.scheduled = False  # Queued for a worker, or rescheduled once its running frame finishes
+        self.dropped_frames = 0
+        self.stale_frames = 0
+
+
+class FrameDispatcher:
+    """Latest-frame-wins backpressure queue drained by worker threads
+
+    Each session holds at most one pending frame; a newer frame replaces it
+    and the older one counts as dropped. Sessions are processed by at most one
+    worker at a time, so per-session detectors never run concurrently, and
+    frames that waited longer than max_frame_age are skipped as stale. Under
+    overload clients see a lower effective frame rate instead of growing lag.
+
+    Which sessions are being processed is tracked apart from their slots, so
+    a session discarded and restarted mid-frame is only picked up again once
+    that frame is done. A paused session accepts no frames at all, so its
+    detector can be reset and reconfigured without a new frame racing it.
+    """
+
+    def __init__(self, process_fn: Callable[[str, Any, Dict], None],
+                 num_workers: int = 4, max_frame_age: float = 1.0):
+        """
+        Args:
+            process_fn: Called as process_fn(sid, frame_data, stats) on a worker
+                thread, where stats holds the session's drop counters and
+                queue wait time
+            num_workers: Number of worker threads draining the queue
+            max_frame_age: Seconds after which a pending frame is discarded
+        """
+        self._process_fn = process_fn
+        self.max_frame_age = max_frame_age
+        self._lock = threading.Lock()
+        self._slots: Dict[str, _SessionSlot] = {}
+        self._running: Set[str] = set()  # Sessions a worker is processing a frame for
+        self._paused: Set[str] = set()  # Sessions whose frames are dropped on submit
+        self._idle = threading.Condition(self._lock)
+        self._ready: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"frame-worker-{i}", daemon=True)
+            for i in range(num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, sid: str, frame_data: Any) -> bool:
+        """Queue a frame for a session, replacing any frame still waiting
+
+        Returns False if the session is paused and the frame was dropped.
+        """
+        with self._lock:
+            if sid in self._paused:
+                return False
+            slot = self._slots.get(sid)
+            if slot is None:
+                slot = self._slots[sid] = _SessionSlot()
+            if slot.pending is not None:
+                slot.dropped_frames += 1
+            slot.pending = frame_data
+            slot.received_at = time.monotonic()
+            if slot.scheduled:
+                return True
+            slot.scheduled = True
+            if sid in self._running:
+                return True  # _finish() schedules it once the running frame is done
+        self._ready.put(sid)
+        return True
+
+    def discard(self, sid: str, wait: bool = False, timeout: Optional[float] = None) -> bool:
+        """
+        Forget a session and any frame it has waiting
+
+        With wait=True, also block until a frame a worker is already processing
+        for the session is done, so its detector can be touched safely. Returns
+        False if that didn't happen within timeout seconds.
+        """
+        with self._idle:
+            self._slots.pop(sid, None)
+            if not wait:
+                return True
+            return self._idle.wait_for(lambda: sid not in self._running, timeout)
+
+    def pause(self, sid: str):
+        """Drop every frame submitted for a session until resume() is called"""
+        with self._lock:
+            self._paused.add(sid)
+
+    def resume(self, sid: str):
+        """Accept frames for a paused session again"""
+        with self._lock:
+            self._paused.discard(sid)
+
+    def stats(self, sid: str) -> Optional[Dict]:
+        """Get drop counters for a session"""
+        with self._lock:
+            slot = self._slots.get(sid)
+            if slot is None:
+                return None
+            return {"dropped_frames": slot.dropped_frames, "stale_frames": slot.stale_frames}
+
+    def shutdown(self):
+        """Stop all worker threads"""
+        for _ in self._workers:
+            self._ready.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def _take(self, sid: str):
+        """Pop the pending frame for a session, skipping it if stale"""
+        with self._lock:
+            slot = self._slots.get(sid)
+            if slot is None or sid in self._running:
+                # A duplicate entry left by a discard and restart; the running
+                # worker reschedules the session when it finishes
+                return None, None
+            frame_data, slot.pending = slot.pending, None
+            if frame_data is None:
+                slot.scheduled = False
+                return None, None
+            wait = time.monotonic() - slot.received_at
+            if wait > self.max_frame_age:
+                slot.stale_frames += 1
+                slot.scheduled = False
+                return None, None
+            self._running.add(sid)
+            return frame_data, {
+                "dropped_frames": slot.dropped_frames,
+                "stale_frames": slot.stale_frames,
+                "queue_wait_ms": wait * 1000.0
+            }
+
+    def _finish(self, sid: str):
+        """Reschedule a session if a newer frame arrived while it was processed"""
+        with self._idle:
+            self._running.discard(sid)
+            self._idle.notify_all()
+            slot = self._slots.get(sid)
+            if slot is None:
+                return
+            if slot.pending is None:
+                slot.scheduled = False
+                return
+        self._ready.put(sid)
+
+    def _worker_loop(self):
+        while True:
+            sid = self._ready.get()
+            if sid is None:
+                return
+            frame_data, stats = self._take(sid)
+            if frame_data is None:
+                continue
+            try:
+                self._process_fn(sid, frame_data, stats)
+            except Exception as e:
+                logger.exception("Error in frame worker for %s: %s", sid, e, extra={"event": "frame_error"})
+            finally:
+                self._finish(sid)
@@ -0,0 +1,88 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# libjpeg(-turbo) can scale during the IDCT, so these decode at a fraction of the
+# full-resolution cost instead of decoding everything and resizing afterwards
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# Start-of-frame markers (baseline, extended, progressive, lossless...) - not DHT, JPG or DAC
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_STANDALONE_MARKERS = frozenset(range(0xD0, 0xDA)) | {0x01}
+
+
+def jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read (width, height) from a JPEG's start-of-frame header without decoding it
+
+    Returns None for anything that isn't a well-formed JPEG.
+    """
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    offset = 2
+    end = len(data)
+    while offset + 4 <= end:
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:  # Fill byte
+            offset += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            offset += 2
+            continue
+        segment_length = (data[offset + 2] << 8) | data[offset + 3]
+        if marker in _SOF_MARKERS:
+            if offset + 9 > end:
+                return None
+            height = (data[offset + 5] << 8) | data[offset + 6]
+            width = (data[offset + 7] << 8) | data[offset + 8]
+            return (width, height) if width and height else None
+        if marker == 0xDA:  # Start of scan without a frame header
+            return None
+        offset += 2 + segment_length
+    return None
+
+
+def decode_scale(width: int, height: int, min_size: int) -> int:
+    """Largest reduction (1, 2, 4 or 8) that keeps the longer side at least min_size"""
+    if min_size <= 0:
+        return 1
+    longest = max(width, height)
+    for scale, _ in REDUCED_DECODE_FLAGS:
+        if longest // scale >= min_size:
+            return scale
+    return 1
+
+
+def decode_jpeg(data: bytes, min_size: int = 0) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int]]]:
+    """
+    Decode an image as BGR, at 1/2, 1/4 or 1/8 scale when that still leaves min_size pixels
+
+    Returns:
+        (image, full_size) - the decoded image (None if it couldn't be decoded)
+        and the full-resolution (width, height). Non-JPEG input, and min_size
+        of 0, decode at full resolution.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    full_size = jpeg_size(data)
+    if full_size is not None:
+        scale = decode_scale(full_size[0], full_size[1], min_size)
+        if scale > 1:
+            flag = dict(REDUCED_DECODE_FLAGS)[scale]
+            image = cv2.imdecode(buffer, flag)
+            if image is not None:
+                # imdecode applies EXIF rotation, which swaps the header's axes
+                if (image.shape[1] > image.shape[0]) != (full_size[0] > full_size[1]):
+                    full_size = (full_size[1], full_size[0])
+                return image, full_size
+
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    if image is None:
+        return None, full_size
+    return image, (image.shape[1], image.shape[0])
@@ -0,0 +1,279 @@
+import atexit
+import itertools
+import logging
+import multiprocessing as mp_proc
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from multiprocessing import connection, shared_memory
+from types import SimpleNamespace
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _inference_worker(shm_name: str, slot_bytes: int, task_queue, result_conn,
+                      graphs_per_worker: int):
+    """
+    Worker process main loop - owns MediaPipe Pose graphs for its sessions
+
+    Tasks arrive as small tuples naming a shared-memory slot; pixels are read
+    straight from the slot and only the serialized landmarks travel back.
+    """
+    import mediapipe as mp
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # Graphs are per client so each session keeps its own tracking state
+    graphs: "OrderedDict[int, tuple]" = OrderedDict()
+
+    def get_graph(client_id: int, pose_options: Dict):
+        entry = graphs.get(client_id)
+        if entry is not None and entry[0] == pose_options:
+            graphs.move_to_end(client_id)
+            return entry[1]
+        if entry is not None:
+            entry[1].close()
+        elif len(graphs) >= graphs_per_worker:
+            _, (_, oldest) = graphs.popitem(last=False)
+            oldest.close()
+        graph = mp.solutions.pose.Pose(**pose_options)
+        graphs[client_id] = (pose_options, graph)
+        return graph
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            kind = task[0]
+            if kind in ("reset", "release"):
+                entry = graphs.pop(task[1], None)
+                if entry is not None:
+                    entry[1].close()
+                continue
+
+            _, task_id, client_id, slot, shape, pose_options = task
+            try:
+                frame_rgb = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+                results = get_graph(client_id, pose_options).process(frame_rgb)
+                landmarks = results.pose_landmarks.SerializeToString() if results.pose_landmarks else None
+                result_conn.send((task_id, landmarks, None))
+            except Exception as e:
+                result_conn.send((task_id, None, str(e)))
+    finally:
+        for _, graph in graphs.values():
+            graph.close()
+        shm.close()
+
+
+class RemotePose:
+    """Drop-in stand-in for mediapipe Pose that runs inference in an InferencePool worker"""
+
+    def __init__(self, pool: "InferencePool", client_id: int, pose_options: Dict):
+        self._pool = pool
+        self.client_id = client_id
+        self.pose_options = dict(pose_options)
+
+    def process(self, frame_rgb: np.ndarray):
+        """Run pose inference; returns an object with a pose_landmarks attribute like Pose.process"""
+        return SimpleNamespace(pose_landmarks=self._pool.infer(self.client_id, frame_rgb, self.pose_options))
+
+    def reset(self):
+        self._pool.send_control("reset", self.client_id)
+
+    def close(self):
+        self._pool.send_control("release", self.client_id)
+
+
+class InferencePool:
+    """
+    Pool of worker processes running MediaPipe pose inference outside the GIL
+
+    Frames are written into a ring of shared-memory slots, so pixel data is
+    never pickled through a pipe; workers send back serialized landmarks.
+    Each client (one per detector) is pinned to a single worker so its
+    tracking graph stays consistent between frames.
+
+    A slot goes back to the ring only when its worker has replied, even if
+    the caller gave up waiting, so a late worker never reads a frame that was
+    overwritten under it. Workers that die are restarted (their clients'
+    graphs start fresh) and the tasks they held fail.
+    """
+
+    def __init__(self, num_workers: int, max_width: int = 1920, max_height: int = 1080,
+                 slots_per_worker: int = 2, graphs_per_worker: int = 16, timeout: float = 10.0,
+                 monitor_interval: float = 1.0):
+        self.num_workers = num_workers
+        self.max_width = max_width
+        self.max_height = max_height
+        self.timeout = timeout
+        self.monitor_interval = monitor_interval
+        self.restarts = 0
+        self._graphs_per_worker = graphs_per_worker
+        self._slot_bytes = max_width * max_height * 3
+        num_slots = num_workers * slots_per_worker
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self._slot_bytes * num_slots)
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(num_slots):
+            self._free_slots.put(slot)
+
+        self._ctx = mp_proc.get_context("spawn")  # MediaPipe graphs don't survive fork
+        # One result pipe per worker: a shared queue's write lock, held by a
+        # worker that dies mid-send, would stall every other worker
+        self._result_conns = [None] * num_workers
+        self._task_queues = [None] * num_workers
+        self._processes = [None] * num_workers
+        for i in range(num_workers):
+            self._start_worker(i)
+
+        self._lock = threading.Lock()
+        # task_id -> (future, slot, worker index); the slot is held until the worker replies
+        self._pending: Dict[int, Tuple[Future, int, int]] = {}
+        self._task_ids = itertools.count()
+        self._client_ids = itertools.count()
+        self._closed = False
+
+        self._collector = threading.Thread(target=self._collect_results, name="inference-results", daemon=True)
+        self._collector.start()
+        atexit.register(self.shutdown)
+
+    def pose_client(self, **pose_options) -> RemotePose:
+        """Create a Pose-compatible client pinned to one worker"""
+        return RemotePose(self, next(self._client_ids), pose_options)
+
+    def infer(self, client_id: int, frame_rgb: np.ndarray, pose_options: Dict):
+        """Run pose inference for a client and return its NormalizedLandmarkList (or None)"""
+        from mediapipe.framework.formats import landmark_pb2
+
+        # Landmarks are normalized, so oversized frames can be shrunk to fit a slot
+        height, width = frame_rgb.shape[:2]
+        if width > self.max_width or height > self.max_height:
+            scale = min(self.max_width / width, self.max_height / height)
+            frame_rgb = cv2.resize(frame_rgb, (int(width * scale), int(height * scale)),
+                                   interpolation=cv2.INTER_AREA)
+
+        worker = client_id % self.num_workers
+        slot = self._free_slots.get(timeout=self.timeout)
+        slot_view = np.ndarray(frame_rgb.shape, dtype=np.uint8, buffer=self._shm.buf,
+                               offset=slot * self._slot_bytes)
+        np.copyto(slot_view, frame_rgb)
+
+        future: Future = Future()
+        with self._lock:
+            # A dead worker's tasks fail when the result collector restarts it
+            task_id = next(self._task_ids)
+            self._pending[task_id] = (future, slot, worker)
+            self._task_queues[worker].put(
+                ("process", task_id, client_id, slot, frame_rgb.shape, pose_options)
+            )
+        # On timeout the slot stays with the task until the worker replies or dies
+        landmarks, error = future.result(timeout=self.timeout)
+
+        if error:
+            raise RuntimeError(f"Inference worker error: {error}")
+        if landmarks is None:
+            return None
+        return landmark_pb2.NormalizedLandmarkList.FromString(landmarks)
+
+    def send_control(self, kind: str, client_id: int):
+        """Reset or release a client's graph in its worker"""
+        if not self._closed:
+            with self._lock:
+                self._task_queues[client_id % self.num_workers].put((kind, client_id))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "alive_workers": sum(1 for p in self._processes if p.is_alive()),
+                "restarts": self.restarts,
+                "free_slots": self._free_slots.qsize(),
+                "pending": len(self._pending)
+            }
+
+    def shutdown(self):
+        """Stop worker processes and free the shared-memory ring"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for task_queue in self._task_queues:
+            task_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._collector.join(timeout=self.monitor_interval * 2)
+        for result_conn in self._result_conns:
+            result_conn.close()
+        self._shm.close()
+        self._shm.unlink()
+
+    def _start_worker(self, index: int):
+        task_queue = self._ctx.Queue()
+        result_conn, worker_conn = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_inference_worker,
+            args=(self._shm.name, self._slot_bytes, task_queue, worker_conn, self._graphs_per_worker),
+            name=f"inference-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        worker_conn.close()  # Only the worker writes, so its exit shows up as EOF here
+        self._task_queues[index] = task_queue
+        self._result_conns[index] = result_conn
+        self._processes[index] = process
+
+    def _restart_worker(self, index: int):
+        """Replace a dead worker and fail the tasks it held, freeing their slots (caller holds _lock)"""
+        process = self._processes[index]
+        process.join(timeout=1.0)
+        if process.is_alive():
+            process.kill()  # Its result pipe broke, so it can't answer anyway
+            process.join()
+        logger.warning("Inference worker %d exited with code %s, restarting", index, process.exitcode)
+        self._result_conns[index].close()
+        for task_id, (future, slot, worker) in list(self._pending.items()):
+            if worker == index:
+                del self._pending[task_id]
+                self._free_slots.put(slot)
+                if not future.done():
+                    future.set_result((None, "worker process died"))
+        self._start_worker(index)
+        self.restarts += 1
+
+    def _check_workers(self, dead=()):
+        """Restart workers that exited, or whose result pipe reached EOF (only the collector does this)"""
+        with self._lock:
+            if self._closed:
+                return
+            for index, process in enumerate(self._processes):
+                if index in dead or not process.is_alive():
+                    self._restart_worker(index)
+
+    def _collect_results(self):
+        """Route worker results back to the waiting caller and free their slots"""
+        while not self._closed:
+            dead = set()
+            for result_conn in connection.wait(list(self._result_conns), timeout=self.monitor_interval):
+                index = self._result_conns.index(result_conn)
+                try:
+                    task_id, landmarks, error = result_conn.recv()
+                except (EOFError, OSError):
+                    dead.add(index)
+                    continue
+                with self._lock:
+                    entry = self._pending.pop(task_id, None)
+                if entry is None:
+                    continue  # Its worker was restarted and the task already failed
+                future, slot, _ = entry
+                self._free_slots.put(slot)
+                if not future.done():
+                    future.set_result((landmarks, error))
+            self._check_workers(dead)
@@ -0,0 +1,190 @@
+import numpy as np
+import mediapipe as mp
+from typing import Dict, List
+
+PoseLandmark = mp.solutions.pose.PoseLandmark
+
+NUM_POSE_LANDMARKS = 33
+VISIBILITY_THRESHOLD = 0.3  # Landmarks at or below this are treated as not visible
+
+# Landmark array columns
+X, Y, Z, VISIBILITY = 0, 1, 2, 3
+
+# Essential body parts for virtual try-on (torso, arms, legs)
+ESSENTIAL_PARTS = (
+    # Torso
+    ('left_shoulder', PoseLandmark.LEFT_SHOULDER),
+    ('right_shoulder', PoseLandmark.RIGHT_SHOULDER),
+    ('left_hip', PoseLandmark.LEFT_HIP),
+    ('right_hip', PoseLandmark.RIGHT_HIP),
+
+    # Arms
+    ('left_elbow', PoseLandmark.LEFT_ELBOW),
+    ('right_elbow', PoseLandmark.RIGHT_ELBOW),
+    ('left_wrist', PoseLandmark.LEFT_WRIST),
+    ('right_wrist', PoseLandmark.RIGHT_WRIST),
+
+    # Legs
+    ('left_knee', PoseLandmark.LEFT_KNEE),
+    ('right_knee', PoseLandmark.RIGHT_KNEE),
+    ('left_ankle', PoseLandmark.LEFT_ANKLE),
+    ('right_ankle', PoseLandmark.RIGHT_ANKLE),
+)
+
+# Full body validation landmarks (head to toe)
+FULL_BODY_PARTS = (
+    # Head
+    ('nose', PoseLandmark.NOSE),
+    ('left_ear', PoseLandmark.LEFT_EAR),
+    ('right_ear', PoseLandmark.RIGHT_EAR),
+) + ESSENTIAL_PARTS
+
+# Body regions checked during full body validation
+BODY_REGIONS = {
+    "head": ["nose", "left_ear", "right_ear"],
+    "torso": ["left_shoulder", "right_shoulder", "left_hip", "right_hip"],
+    "arms": ["left_elbow", "right_elbow", "left_wrist", "right_wrist"],
+    "legs": ["left_knee", "right_knee", "left_ankle", "right_ankle"]
+}
+
+# Head and feet must be visible for a valid full body frame
+CRITICAL_PARTS = ["nose", "left_ankle", "right_ankle"]
+
+# Precomputed index arrays so per-frame work is a handful of NumPy ops
+ESSENTIAL_NAMES = [name for name, _ in ESSENTIAL_PARTS]
+ESSENTIAL_IDX = np.array([int(landmark_id) for _, landmark_id in ESSENTIAL_PARTS], dtype=np.intp)
+FULL_BODY_NAMES = [name for name, _ in FULL_BODY_PARTS]
+FULL_BODY_IDX = np.array([int(landmark_id) for _, landmark_id in FULL_BODY_PARTS], dtype=np.intp)
+# Region membership over FULL_BODY_IDX rows, so every region is counted in one matmul
+REGION_NAMES = list(BODY_REGIONS)
+REGION_MATRIX = np.array([
+    [1.0 if name in BODY_REGIONS[region] else 0.0 for name in FULL_BODY_NAMES]
+    for region in REGION_NAMES
+])
+_REGION_SIZES = [len(BODY_REGIONS[region]) for region in REGION_NAMES]
+_CRITICAL_POSITIONS = [FULL_BODY_NAMES.index(name) for name in CRITICAL_PARTS]
+# FULL_BODY_PARTS lists the head first, then the essential parts
+_FIRST_ESSENTIAL_POSITION = FULL_BODY_NAMES.index(ESSENTIAL_NAMES[0])
+
+
+def landmarks_to_array(landmarks) -> np.ndarray:
+    """
+    Convert a MediaPipe NormalizedLandmarkList into a (33, 4) float64 array
+    of [x, y, z, visibility] rows
+
+    Arrays are passed through unchanged. Missing trailing landmarks are
+    zero-filled, which reads as "not visible".
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    array = np.zeros((NUM_POSE_LANDMARKS, 4), dtype=np.float64)
+    rows = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks.landmark[:NUM_POSE_LANDMARKS]]
+    if rows:
+        array[:len(rows)] = rows
+    return array
+
+
+def analyze_landmarks(landmark_array: np.ndarray, width: int = 1, height: int = 1) -> Dict:
+    """
+    Compute every per-frame landmark metric in a single vectorized pass
+
+    Visibility thresholding, region counts and the bounding box run as a few
+    NumPy ops over the precomputed index arrays; the per-part output dicts are
+    then built from one tolist() of the selected rows.
+
+    Args:
+        landmark_array: (33, 4) array from landmarks_to_array
+        width, height: Frame size used for the pixel-space essential landmarks
+
+    Returns:
+        Dict with essential_confidence, essential_landmarks (pixel space) and the
+        full body metrics: missing_parts, visible_landmarks, body_coverage,
+        region_coverage, critical_visible and positioning_score
+    """
+    points = landmark_array[FULL_BODY_IDX]
+    visible = points[:, VISIBILITY] > VISIBILITY_THRESHOLD
+    selected = points[visible]
+    region_counts = (REGION_MATRIX @ visible).tolist()
+    visible_flags = visible.tolist()
+
+    missing_parts = []
+    visible_landmarks = {}
+    essential_landmarks = []
+    rows = iter(selected.tolist())
+    for position, (name, is_visible) in enumerate(zip(FULL_BODY_NAMES, visible_flags)):
+        if not is_visible:
+            missing_parts.append(name)
+            continue
+        x, y, _, v = next(rows)
+        visible_landmarks[name] = {"x": x, "y": y, "visibility": v}
+        if position >= _FIRST_ESSENTIAL_POSITION:
+            essential_landmarks.append({"part": name, "x": int(x * width), "y": int(y * height), "confidence": v})
+
+    return {
+        "essential_confidence": min(len(essential_landmarks) / len(ESSENTIAL_NAMES), 1.0),
+        "essential_landmarks": essential_landmarks,
+        "missing_parts": missing_parts,
+        "visible_landmarks": visible_landmarks,
+        "body_coverage": len(visible_landmarks) / len(FULL_BODY_NAMES),
+        "region_coverage": {
+            region: int(count) / size for region, count, size in zip(REGION_NAMES, region_counts, _REGION_SIZES)
+        },
+        "critical_visible": all(visible_flags[i] for i in _CRITICAL_POSITIONS),
+        "positioning_score": body_positioning_score(selected[:, :2])
+    }
+
+
+def essential_confidence(landmark_array: np.ndarray) -> float:
+    """Fraction of essential body parts (torso, legs, arms) that are visible"""
+    visible = np.count_nonzero(landmark_array[ESSENTIAL_IDX, VISIBILITY] > VISIBILITY_THRESHOLD)
+    return min(int(visible) / len(ESSENTIAL_IDX), 1.0)
+
+
+def body_positioning_score(points_xy: np.ndarray) -> float:
+    """Score how well the visible body is centered, sized and proportioned in the frame"""
+    if not len(points_xy):
+        return 0.0
+
+    # Bounding box of the visible landmarks
+    (min_x, min_y), (max_x, max_y) = points_xy.min(axis=0).tolist(), points_xy.max(axis=0).tolist()
+
+    # Calculate body dimensions relative to frame
+    body_width = max_x - min_x
+    body_height = max_y - min_y
+    body_center_x = (min_x + max_x) / 2
+
+    # Check if body is centered horizontally (within 20% of center)
+    horizontal_centering = 1.0 - min(abs(body_center_x - 0.5) / 0.2, 1.0)
+
+    # Check if body fills appropriate portion of frame height (not too small, not too large)
+    # For full body, should be between 50% and 80% of frame height (stricter - person must be further away)
+    if 0.5 <= body_height <= 0.8:
+        size_score = 1.0
+    elif 0.4 <= body_height <= 0.85:
+        size_score = 0.5
+    else:
+        size_score = 0.0  # Reject if too close or too far
+
+    # Check if body is not cut off at top or bottom
+    margin_score = 1.0
+    if min_y < 0.05:  # Too close to top
+        margin_score -= 0.3
+    if max_y > 0.95:  # Too close to bottom
+        margin_score -= 0.3
+
+    # Check aspect ratio (body should be taller than wide)
+    aspect_ratio = body_height / body_width if body_width > 0 else 0
+    if 1.5 <= aspect_ratio <= 3.0:
+        aspect_score = 1.0
+    elif 1.2 <= aspect_ratio <= 4.0:
+        aspect_score = 0.7
+    else:
+        aspect_score = 0.3
+
+    # Calculate final positioning score
+    return (
+        horizontal_centering * 0.3 +
+        size_score * 0.3 +
+        margin_score * 0.2 +
+        aspect_score * 0.2
+    )
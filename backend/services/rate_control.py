@@ -0,0 +1,138 @@
+import threading
+import time
+from typing import Dict, Optional
+
+# JPEG quality range hinted to clients (canvas.toBlob scale, 0-1); the top
+# matches the client's default so an idle server never asks for more
+MAX_JPEG_QUALITY = 0.8
+MIN_JPEG_QUALITY = 0.5
+
+
+class _SessionRate:
+    """Measured cost and last hint for one streaming session"""
+
+    __slots__ = ("requested_fps", "frames", "cost_ms", "dropped_frames", "stale_frames", "fps", "jpeg_quality",
+                 "sent_at")
+
+    def __init__(self, requested_fps: float):
+        self.requested_fps = requested_fps
+        self.frames = 0
+        self.cost_ms: Optional[float] = None  # Smoothed processing time per frame
+        self.dropped_frames = 0
+        self.stale_frames = 0
+        self.fps = requested_fps
+        self.jpeg_quality = MAX_JPEG_QUALITY
+        self.sent_at: Optional[float] = None
+
+
+class RateController:
+    """
+    Server-driven capture rate for streaming clients
+
+    Each processed frame updates a smoothed per-session processing cost. The
+    hinted frame rate is the lowest of: what the client asked for, what one
+    worker can sustain for this session, and this session's fair share of
+    all workers given every active session's cost. Frames dropped or skipped
+    as stale since the last hint back the rate off further. JPEG quality is
+    lowered along with the rate, so an overloaded server also receives
+    smaller uploads.
+
+    Hints are rate-limited to one per interval and only sent when they change
+    enough to matter; clients that don't listen for them are unaffected.
+    """
+
+    def __init__(self, workers: int, min_fps: float = 2.0, headroom: float = 0.8,
+                 interval: float = 1.0, smoothing: float = 0.2, warmup_frames: int = 2):
+        """
+        Args:
+            workers: Frames the server can process concurrently
+            min_fps: Lowest rate ever hinted
+            headroom: Fraction of measured capacity to plan for, so queues stay short
+            interval: Minimum seconds between hints to one session
+            smoothing: Weight of the newest frame in the cost average
+            warmup_frames: Leading frames left out of the cost (the first one
+                pays for MediaPipe graph setup)
+        """
+        self.workers = max(1, workers)
+        self.min_fps = min_fps
+        self.headroom = headroom
+        self.interval = interval
+        self.smoothing = smoothing
+        self.warmup_frames = warmup_frames
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, _SessionRate] = {}
+
+    def start(self, sid: str, requested_fps: float, queue_stats: Optional[Dict] = None):
+        """
+        Begin (or restart) rate control for a session at the client's own frame rate
+
+        queue_stats are the session's current drop counters, so drops from an
+        earlier stream don't count as a fresh backlog.
+        """
+        session = _SessionRate(max(self.min_fps, requested_fps))
+        if queue_stats:
+            session.dropped_frames = queue_stats["dropped_frames"]
+            session.stale_frames = queue_stats["stale_frames"]
+        with self._lock:
+            self._sessions[sid] = session
+
+    def remove(self, sid: str):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def observe(self, sid: str, process_ms: float, queue_stats: Dict) -> Optional[Dict]:
+        """
+        Record one processed frame and return a rate_hint payload when one is due
+
+        Args:
+            process_ms: Time the frame spent being processed
+            queue_stats: The frame's FrameDispatcher stats (drop counters)
+        """
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return None
+            session.frames += 1
+            if session.frames <= self.warmup_frames:
+                return None
+            if session.cost_ms is None:
+                session.cost_ms = process_ms
+            else:
+                session.cost_ms += self.smoothing * (process_ms - session.cost_ms)
+            if session.sent_at is not None and now - session.sent_at < self.interval:
+                return None
+
+            # One worker at a time per session, and a fair share of all workers
+            session_limit = 1000.0 * self.headroom / max(session.cost_ms, 1e-3)
+            total_cost = sum(s.cost_ms for s in self._sessions.values() if s.cost_ms is not None)
+            fair_share = 1000.0 * self.workers * self.headroom / max(total_cost, 1e-3)
+            fps = min(session.requested_fps, session_limit, fair_share)
+
+            # Frames already being replaced or going stale: back off from the current rate
+            backlog = (queue_stats["dropped_frames"] > session.dropped_frames
+                       or queue_stats["stale_frames"] > session.stale_frames)
+            if backlog:
+                fps = min(fps, session.fps * 0.75)
+            session.dropped_frames = queue_stats["dropped_frames"]
+            session.stale_frames = queue_stats["stale_frames"]
+
+            fps = max(self.min_fps, min(session.requested_fps, fps))
+            span = session.requested_fps - self.min_fps
+            ratio = (fps - self.min_fps) / span if span > 0 else 1.0
+            jpeg_quality = round(MIN_JPEG_QUALITY + (MAX_JPEG_QUALITY - MIN_JPEG_QUALITY) * ratio, 2)
+
+            first = session.sent_at is None
+            changed = abs(fps - session.fps) >= 1.0 or abs(jpeg_quality - session.jpeg_quality) >= 0.05
+            if not (first or changed):
+                return None
+            session.fps, session.jpeg_quality, session.sent_at = fps, jpeg_quality, now
+            # Share of worker time the hinted rates add up to
+            demand_ms = sum(s.cost_ms * s.fps for s in self._sessions.values() if s.cost_ms is not None)
+            return {
+                "fps": round(fps, 1),
+                "jpeg_quality": jpeg_quality,
+                "process_ms": round(session.cost_ms, 1),
+                "load": round(demand_ms / (1000.0 * self.workers), 2),
+                "backlog": backlog
+            }
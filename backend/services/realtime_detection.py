@@ -1,88 +1,170 @@
 import cv2
 import numpy as np
 import base64
+import logging
 import mediapipe as mp
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
+from services.pose_landmarks import (
+    ESSENTIAL_PARTS, FULL_BODY_PARTS, landmarks_to_array, analyze_landmarks, essential_confidence
+)
+from services.best_frames import BestFrameStore, frame_sharpness
+from services.capture_stability import StabilityDetector
+from services.frame_metrics import StageTimer
+from services.image_decode import decode_jpeg
+
+logger = logging.getLogger(__name__)
+
+# Frame transports negotiated in start_stream
+TRANSPORT_BASE64 = "base64"  # data-URL strings (legacy clients)
+TRANSPORT_BINARY = "binary"  # raw JPEG bytes as Socket.IO binary attachments
+FRAME_TRANSPORTS = (TRANSPORT_BASE64, TRANSPORT_BINARY)
+
+# How the untouched clean frame is returned with each processed frame
+CLEAN_FRAME_ECHO = "echo"  # send back the client's original JPEG bytes, no re-encode
+CLEAN_FRAME_OMIT = "omit"  # send nothing; fetch the best frame from /api/best-frame
+CLEAN_FRAME_MODES = (CLEAN_FRAME_ECHO, CLEAN_FRAME_OMIT)
+
+# Where the skeleton/status overlay is drawn
+RENDER_IMAGE = "image"  # server draws the overlay and sends an annotated JPEG
+RENDER_VECTOR = "vector"  # server sends landmark/validation data only; client draws
+RENDER_MODES = (RENDER_IMAGE, RENDER_VECTOR)
+
+# MediaPipe Pose settings for essential pose detection only
+POSE_OPTIONS = {
+    "static_image_mode": False,
+    "model_complexity": 0,  # Use fastest model
+    "smooth_landmarks": False,  # Disable smoothing for speed
+    "min_detection_confidence": 0.3,  # Lower threshold for speed
+    "min_tracking_confidence": 0.3
+}
+
+# Per-session processing profiles selected by detection_mode in start_stream
+DETECTION_PROFILES = {
+    # Highest fidelity: full-resolution inference with the heavier model
+    "strict": {
+        "inference_width": None,  # None = full resolution
+        "model_complexity": 1,
+        "frame_skip": 1,  # Run inference on every Nth frame, reuse landmarks between
+        "annotate": True,
+        "validate": True,
+        "jpeg_quality": 90
+    },
+    # Default: full-resolution inference with the fastest model
+    "realtime": {
+        "inference_width": None,
+        "model_complexity": 0,
+        "frame_skip": 1,
+        "annotate": True,
+        "validate": True,
+        "jpeg_quality": 85
+    },
+    # Cheapest: downscaled inference on every other frame, no server-side drawing
+    "performance": {
+        "inference_width": 480,
+        "model_complexity": 0,
+        "frame_skip": 2,
+        "annotate": False,
+        "validate": True,
+        "jpeg_quality": 70
+    }
+}
+DEFAULT_DETECTION_MODE = "realtime"
+
+# Motion gate: frames are compared as small grayscale thumbnails
+MOTION_THUMBNAIL_SIZE = (64, 48)
+DEFAULT_MOTION_THRESHOLD = 2.0  # Mean absolute difference (0-255) below which a frame counts as static
+DEFAULT_MAX_MOTION_SKIPS = 15  # Force fresh inference after this many reused frames in a row
+
+# Reduced-scale decode: the Pose model runs on a 256x256 input, so there's no
+# point decoding every pixel of a 1080p webcam frame for inference
+DEFAULT_DECODE_MIN_SIZE = 960  # Longer side, in pixels, a reduced decode may not go below
+
+# A frame with nobody in it: warms a new Pose graph, and drops a used one's tracking state
+BLANK_FRAME = np.zeros((64, 64, 3), dtype=np.uint8)
 
 class RealtimeBodyDetector:
     """Optimized real-time body detection focusing only on torso, legs, and arms"""
     
-    def __init__(self):
-        """Initialize detection models with minimal processing"""
-        # MediaPipe for essential pose detection only
-        self.mp_pose = mp.solutions.pose.Pose(
-            static_image_mode=False,
-            model_complexity=0,  # Use fastest model
-            smooth_landmarks=False,  # Disable smoothing for speed
-            min_detection_confidence=0.3,  # Lower threshold for speed
-            min_tracking_confidence=0.3
-        )
+    def __init__(self, inference_pool=None, motion_threshold: float = DEFAULT_MOTION_THRESHOLD,
+                 max_motion_skips: int = DEFAULT_MAX_MOTION_SKIPS, best_frame_candidates: int = 5,
+                 detection_mode: str = DEFAULT_DETECTION_MODE, decode_min_size: int = DEFAULT_DECODE_MIN_SIZE,
+                 stability: Optional[StabilityDetector] = None):
+        """
+        Initialize detection models with minimal processing
+        
+        Args:
+            inference_pool: Optional InferencePool; when given, pose inference
+                runs in a worker process instead of this interpreter
+            motion_threshold: Thumbnail difference below which the previous
+                pose and validation are reused (0 disables the motion gate)
+            max_motion_skips: Max consecutive frames that may reuse a result
+            best_frame_candidates: How many best-frame candidates to keep
+            detection_mode: Initial processing profile, so the first Pose graph
+                is built with the right model
+            decode_min_size: Frames are decoded at 1/2, 1/4 or 1/8 scale as long
+                as the longer side stays at least this many pixels (0 = always
+                decode at full resolution)
+            stability: Decides when an auto_capture session is done (defaults
+                to StabilityDetector's settings)
+        """
+        if detection_mode not in DETECTION_PROFILES:
+            raise ValueError(f"Unsupported detection_mode '{detection_mode}', expected one of {tuple(DETECTION_PROFILES)}")
+        self._inference_pool = inference_pool
+        self.pose_options = dict(POSE_OPTIONS, model_complexity=DETECTION_PROFILES[detection_mode]["model_complexity"])
+        if inference_pool is not None:
+            self.mp_pose = inference_pool.pose_client(**self.pose_options)
+        else:
+            self.mp_pose = mp.solutions.pose.Pose(**self.pose_options)
         self.mp_drawing = mp.solutions.drawing_utils
         
         # Get pose connections from the correct module
         self.pose_connections = mp.solutions.pose.POSE_CONNECTIONS
         
+        # Stream settings (negotiated per session in start_stream)
+        self.transport = TRANSPORT_BASE64
+        self.clean_frame_mode = CLEAN_FRAME_ECHO
+        self.render_mode = RENDER_IMAGE
+        self.detection_mode = detection_mode
+        self.profile = DETECTION_PROFILES[detection_mode]
+        self.confidence_threshold = 0.7  # Frames below it are neither best-frame candidates nor valid for auto_capture
+        self.include_timings = False  # Send per-stage timings with each annotated_frame
+        self.decode_min_size = decode_min_size
+        
         # Detection state
         self.frame_count = 0
+        self._last_pose_landmarks = None  # Reused on frames the profile skips
+        self._last_landmark_array = None
         self.best_confidence = 0.0
-        self.best_frame = None
+        
+        # Motion gate state: thumbnail of the last inferred frame and its results
+        self.motion_threshold = motion_threshold
+        self.max_motion_skips = max_motion_skips
+        self._motion_reference = None  # (frame shape, grayscale thumbnail)
+        self._last_detection = None  # (pose_landmarks, analysis, validation)
+        self._motion_skips = 0
+        self.best_frames = BestFrameStore(best_frame_candidates)  # Original JPEG bytes of the top clean frames
+        
+        # Auto-capture: end the session once full body validation is stable
+        self.auto_capture = False
+        self.stability = stability or StabilityDetector()
+        self.capture_complete = False  # Best frame frozen; no more frames are processed
         
         # Purple color for brand consistency (BGR format)
         self.brand_color = (255, 0, 255)
         
-        # Define essential body parts for virtual try-on
-        self.essential_landmarks = {
-            # Torso
-            'left_shoulder': mp.solutions.pose.PoseLandmark.LEFT_SHOULDER,
-            'right_shoulder': mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER,
-            'left_hip': mp.solutions.pose.PoseLandmark.LEFT_HIP,
-            'right_hip': mp.solutions.pose.PoseLandmark.RIGHT_HIP,
-            
-            # Arms
-            'left_elbow': mp.solutions.pose.PoseLandmark.LEFT_ELBOW,
-            'right_elbow': mp.solutions.pose.PoseLandmark.RIGHT_ELBOW,
-            'left_wrist': mp.solutions.pose.PoseLandmark.LEFT_WRIST,
-            'right_wrist': mp.solutions.pose.PoseLandmark.RIGHT_WRIST,
-            
-            # Legs
-            'left_knee': mp.solutions.pose.PoseLandmark.LEFT_KNEE,
-            'right_knee': mp.solutions.pose.PoseLandmark.RIGHT_KNEE,
-            'left_ankle': mp.solutions.pose.PoseLandmark.LEFT_ANKLE,
-            'right_ankle': mp.solutions.pose.PoseLandmark.RIGHT_ANKLE,
-        }
-        
-        # Define full body validation landmarks (head to toe)
-        self.full_body_landmarks = {
-            # Head
-            'nose': mp.solutions.pose.PoseLandmark.NOSE,
-            'left_ear': mp.solutions.pose.PoseLandmark.LEFT_EAR,
-            'right_ear': mp.solutions.pose.PoseLandmark.RIGHT_EAR,
-            
-            # Torso
-            'left_shoulder': mp.solutions.pose.PoseLandmark.LEFT_SHOULDER,
-            'right_shoulder': mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER,
-            'left_hip': mp.solutions.pose.PoseLandmark.LEFT_HIP,
-            'right_hip': mp.solutions.pose.PoseLandmark.RIGHT_HIP,
-            
-            # Arms
-            'left_elbow': mp.solutions.pose.PoseLandmark.LEFT_ELBOW,
-            'right_elbow': mp.solutions.pose.PoseLandmark.RIGHT_ELBOW,
-            'left_wrist': mp.solutions.pose.PoseLandmark.LEFT_WRIST,
-            'right_wrist': mp.solutions.pose.PoseLandmark.RIGHT_WRIST,
-            
-            # Legs
-            'left_knee': mp.solutions.pose.PoseLandmark.LEFT_KNEE,
-            'right_knee': mp.solutions.pose.PoseLandmark.RIGHT_KNEE,
-            'left_ankle': mp.solutions.pose.PoseLandmark.LEFT_ANKLE,
-            'right_ankle': mp.solutions.pose.PoseLandmark.RIGHT_ANKLE,
-        }
+        # Essential body parts for virtual try-on, and full body (head to toe) validation parts
+        self.essential_landmarks = dict(ESSENTIAL_PARTS)
+        self.full_body_landmarks = dict(FULL_BODY_PARTS)
         
     def validate_full_body_visibility(self, landmarks) -> Dict:
         """
         Validate that the entire body is visible in the frame
         Returns validation result with detailed feedback
+        
+        Args:
+            landmarks: NormalizedLandmarkList or a (33, 4) landmark array
         """
-        if not landmarks:
+        if landmarks is None:
             return {
                 "is_valid": False,
                 "confidence": 0.0,
@@ -91,25 +173,12 @@ class RealtimeBodyDetector:
                 "body_coverage": 0.0
             }
         
-        height, width = landmarks.shape[:2] if hasattr(landmarks, 'shape') else (1, 1)
-        
-        # Track visible landmarks and their positions
-        visible_landmarks = {}
-        missing_parts = []
-        
-        for part_name, landmark_id in self.full_body_landmarks.items():
-            if landmark_id < len(landmarks.landmark):
-                landmark = landmarks.landmark[landmark_id]
-                if landmark.visibility > 0.3:  # Landmark is visible
-                    visible_landmarks[part_name] = {
-                        "x": landmark.x,
-                        "y": landmark.y,
-                        "visibility": landmark.visibility
-                    }
-                else:
-                    missing_parts.append(part_name)
-            else:
-                missing_parts.append(part_name)
+        return self._validate_from_analysis(analyze_landmarks(landmarks_to_array(landmarks)))
+    
+    def _validate_from_analysis(self, analysis: Dict) -> Dict:
+        """Build the full body validation result from analyze_landmarks output"""
+        missing_parts = analysis["missing_parts"]
+        visible_landmarks = analysis["visible_landmarks"]
         
         # Calculate body coverage metrics
         if not visible_landmarks:
@@ -121,26 +190,9 @@ class RealtimeBodyDetector:
                 "body_coverage": 0.0
             }
         
-        # Check for essential body regions
-        regions = {
-            "head": ["nose", "left_ear", "right_ear"],
-            "torso": ["left_shoulder", "right_shoulder", "left_hip", "right_hip"],
-            "arms": ["left_elbow", "right_elbow", "left_wrist", "right_wrist"],
-            "legs": ["left_knee", "right_knee", "left_ankle", "right_ankle"]
-        }
-        
-        region_coverage = {}
-        for region, parts in regions.items():
-            visible_parts = [p for p in parts if p in visible_landmarks]
-            region_coverage[region] = len(visible_parts) / len(parts)
-        
-        # Calculate overall body coverage
-        total_parts = len(self.full_body_landmarks)
-        visible_parts = len(visible_landmarks)
-        body_coverage = visible_parts / total_parts
-        
-        # Check body positioning and size
-        positioning_score = self._check_body_positioning(visible_landmarks, width, height)
+        region_coverage = analysis["region_coverage"]
+        body_coverage = analysis["body_coverage"]
+        positioning_score = analysis["positioning_score"]
         
         # Calculate final validation score
         validation_score = (
@@ -149,16 +201,12 @@ class RealtimeBodyDetector:
             min(region_coverage.values()) * 0.2  # 20% weight for minimum region coverage
         )
         
-        # MUCH STRICTER validation - require ALL critical body parts
-        critical_parts = ["nose", "left_ankle", "right_ankle"]  # Head and feet must be visible
-        critical_visible = all(part in visible_landmarks for part in critical_parts)
-        
-        # Determine if validation passes
+        # Determine if validation passes - MUCH STRICTER, head and feet must be visible
         is_valid = (
             body_coverage >= 0.8 and        # At least 80% of body parts visible (increased from 70%)
             positioning_score >= 0.7 and    # Better positioning required (increased from 0.6)
             min(region_coverage.values()) >= 0.6 and  # At least 60% of each region visible (increased from 0.5)
-            critical_visible and            # Head and feet must be visible
+            analysis["critical_visible"] and  # Head and feet must be visible
             region_coverage["legs"] >= 0.8  # Legs must be mostly visible (ankles detected)
         )
         
@@ -178,65 +226,6 @@ class RealtimeBodyDetector:
             "visible_landmarks": visible_landmarks
         }
     
-    def _check_body_positioning(self, visible_landmarks: Dict, frame_width: int, frame_height: int) -> float:
-        """Check if body is properly positioned in the frame"""
-        if not visible_landmarks:
-            return 0.0
-        
-        # Get bounding box of visible landmarks
-        x_coords = [landmark["x"] for landmark in visible_landmarks.values()]
-        y_coords = [landmark["y"] for landmark in visible_landmarks.values()]
-        
-        if not x_coords or not y_coords:
-            return 0.0
-        
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
-        
-        # Calculate body dimensions relative to frame
-        body_width = max_x - min_x
-        body_height = max_y - min_y
-        body_center_x = (min_x + max_x) / 2
-        body_center_y = (min_y + max_y) / 2
-        
-        # Check if body is centered horizontally (within 20% of center)
-        horizontal_centering = 1.0 - min(abs(body_center_x - 0.5) / 0.2, 1.0)
-        
-        # Check if body fills appropriate portion of frame height (not too small, not too large)
-        # For full body, should be between 50% and 80% of frame height (stricter - person must be further away)
-        if 0.5 <= body_height <= 0.8:
-            size_score = 1.0
-        elif 0.4 <= body_height <= 0.85:
-            size_score = 0.5
-        else:
-            size_score = 0.0  # Reject if too close or too far
-        
-        # Check if body is not cut off at top or bottom
-        margin_score = 1.0
-        if min_y < 0.05:  # Too close to top
-            margin_score -= 0.3
-        if max_y > 0.95:  # Too close to bottom
-            margin_score -= 0.3
-        
-        # Check aspect ratio (body should be taller than wide)
-        aspect_ratio = body_height / body_width if body_width > 0 else 0
-        if 1.5 <= aspect_ratio <= 3.0:
-            aspect_score = 1.0
-        elif 1.2 <= aspect_ratio <= 4.0:
-            aspect_score = 0.7
-        else:
-            aspect_score = 0.3
-        
-        # Calculate final positioning score
-        positioning_score = (
-            horizontal_centering * 0.3 +
-            size_score * 0.3 +
-            margin_score * 0.2 +
-            aspect_score * 0.2
-        )
-        
-        return positioning_score
-    
     def _generate_validation_feedback(self, is_valid: bool, body_coverage: float, 
                                     region_coverage: Dict, missing_parts: List[str], 
                                     positioning_score: float) -> str:
@@ -282,56 +271,138 @@ class RealtimeBodyDetector:
         
     def calculate_essential_confidence(self, landmarks) -> float:
         """Calculate confidence based only on essential body parts (torso, legs, arms)"""
-        if not landmarks:
+        if landmarks is None:
             return 0.0
+        return essential_confidence(landmarks_to_array(landmarks))
+        
+    def configure(self, transport: str = TRANSPORT_BASE64, clean_frame_mode: str = CLEAN_FRAME_ECHO,
+                  render_mode: str = RENDER_IMAGE, detection_mode: str = DEFAULT_DETECTION_MODE,
+                  confidence_threshold: float = 0.7, include_timings: bool = False, auto_capture: bool = False):
+        """Apply per-session stream settings negotiated in start_stream"""
+        if transport not in FRAME_TRANSPORTS:
+            raise ValueError(f"Unsupported transport '{transport}', expected one of {FRAME_TRANSPORTS}")
+        if clean_frame_mode not in CLEAN_FRAME_MODES:
+            raise ValueError(f"Unsupported clean_frame_mode '{clean_frame_mode}', expected one of {CLEAN_FRAME_MODES}")
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Unsupported render_mode '{render_mode}', expected one of {RENDER_MODES}")
+        self.transport = transport
+        self.clean_frame_mode = clean_frame_mode
+        self.render_mode = render_mode
+        self.confidence_threshold = confidence_threshold
+        self.include_timings = include_timings
+        self.auto_capture = auto_capture
+        self.set_detection_mode(detection_mode)
+    
+    def set_detection_mode(self, detection_mode: str):
+        """
+        Switch the session's processing profile
         
-        # Count visible essential parts
-        visible_essential = 0
-        total_essential = len(self.essential_landmarks)
-        
-        for landmark_id in self.essential_landmarks.values():
-            if landmark_id < len(landmarks.landmark):
-                landmark = landmarks.landmark[landmark_id]
-                if landmark.visibility > 0.3:  # Lower threshold for speed
-                    visible_essential += 1
-        
-        # Simple confidence calculation
-        confidence = visible_essential / total_essential if total_essential > 0 else 0
-        return min(confidence, 1.0)
-        
-    def process_frame(self, frame_data: str) -> Dict:
+        Safe to call mid-stream, e.g. to degrade sessions under load; the Pose
+        graph is only rebuilt when the model complexity actually changes.
+        """
+        if detection_mode not in DETECTION_PROFILES:
+            raise ValueError(f"Unsupported detection_mode '{detection_mode}', expected one of {tuple(DETECTION_PROFILES)}")
+        self.detection_mode = detection_mode
+        self.profile = DETECTION_PROFILES[detection_mode]
+        # Cached results may not match the new profile (e.g. validation switched off)
+        self._clear_motion_state()
+        
+        pose_options = dict(POSE_OPTIONS, model_complexity=self.profile["model_complexity"])
+        if pose_options == self.pose_options:
+            return
+        self.pose_options = pose_options
+        self._last_pose_landmarks = None
+        if self._inference_pool is not None:
+            # The worker rebuilds its graph when it sees new options
+            self.mp_pose.pose_options = dict(pose_options)
+        else:
+            self.mp_pose.close()
+            self.mp_pose = mp.solutions.pose.Pose(**pose_options)
+    
+    def _decode_frame_bytes(self, frame_data: Union[str, bytes]) -> bytes:
+        """Get raw JPEG bytes from either a binary attachment or a base64 data URL"""
+        if isinstance(frame_data, (bytes, bytearray, memoryview)):
+            return frame_data
+        return base64.b64decode(frame_data.split(',')[1])
+    
+    def _encode_output(self, buffer: np.ndarray) -> Union[str, bytes]:
+        """Package an encoded JPEG for the session's transport"""
+        if self.transport == TRANSPORT_BINARY:
+            return buffer.tobytes()
+        return f"data:image/jpeg;base64,{base64.b64encode(buffer).decode('utf-8')}"
+    
+    def _echo_output(self, frame_data: Union[str, bytes], frame_bytes: bytes) -> Union[str, bytes]:
+        """Return the client's original frame without decoding or re-encoding it"""
+        if self.transport == TRANSPORT_BINARY:
+            return bytes(frame_bytes)
+        if isinstance(frame_data, str):
+            return frame_data
+        return f"data:image/jpeg;base64,{base64.b64encode(frame_bytes).decode('utf-8')}"
+    
+    def process_frame(self, frame_data: Union[str, bytes]) -> Dict:
         """
         Process a single video frame with minimal processing
         
         Args:
-            frame_data: Base64 encoded image data
+            frame_data: Raw JPEG bytes (binary transport) or base64 data URL
             
         Returns:
             Dict containing annotated frame (for display), clean frame (for try-on), 
-            detection results, and confidence scores
+            detection results, and confidence scores. Frames are JPEG bytes for
+            the binary transport and data URLs otherwise; annotated_frame is None
+            in vector render mode, and the client's own frame for profiles that
+            don't draw. "timings" holds per-stage milliseconds.
         """
         try:
-            # Decode base64 frame
-            frame_bytes = base64.b64decode(frame_data.split(',')[1])
-            frame_array = np.frombuffer(frame_bytes, dtype=np.uint8)
-            frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
+            timer = StageTimer()
+            
+            # Decode frame
+            frame_bytes = self._decode_frame_bytes(frame_data)
+            timer.lap("b64_decode")
+            # Inference, drawing and the motion gate only need a reduced-scale decode
+            frame, full_size = decode_jpeg(frame_bytes, self.decode_min_size)
+            timer.lap("imdecode")
             
             if frame is None:
                 return {"error": "Invalid frame data"}
             
-            # Create copy for annotation
-            annotated_frame = frame.copy()
+            # Create copy for annotation (vector mode and lightweight profiles skip drawing)
+            annotate = self.render_mode == RENDER_IMAGE and self.profile["annotate"]
+            annotated_frame = frame.copy() if annotate else None
             
             # Convert to RGB for MediaPipe
             frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            timer.lap("cvt_color")
             
             # Get essential body part detection
-            detection_results = self._detect_essential_parts(frame_rgb, annotated_frame)
+            detection_results = self._detect_essential_parts(frame_rgb, annotated_frame, timer, full_size)
             
-            # Update best confidence tracking - store the CLEAN frame (not annotated)
-            if detection_results["confidence"] > self.best_confidence:
-                self.best_confidence = detection_results["confidence"]
-                self.best_frame = frame.copy()  # Store clean frame for try-on
+            # Offer the CLEAN frame (not annotated) as a best-frame candidate
+            confidence = detection_results["confidence"]
+            validation = detection_results["full_body_validation"]
+            meets_threshold = confidence >= self.confidence_threshold
+            detection_results["meets_threshold"] = meets_threshold
+            previous_best = self.best_frames.best()
+            if meets_threshold and self.best_frames.would_accept(confidence, validation):
+                # Only frames that make the candidate list pay for a full-resolution decode
+                if frame.shape[1] != full_size[0]:
+                    full_frame = cv2.imdecode(np.frombuffer(frame_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    sharpness = frame_sharpness(cv2.cvtColor(full_frame, cv2.COLOR_BGR2RGB))
+                else:
+                    sharpness = frame_sharpness(frame_rgb)
+                self.best_frames.offer(bytes(frame_bytes), confidence, validation, sharpness)
+            detection_results["best_frame_changed"] = self.best_frames.best() is not previous_best
+            self.best_confidence = max(self.best_confidence, confidence)
+            
+            # Auto-capture: freeze the best frame once the pose has been valid and steady.
+            # Only frames that ran inference count: reused results (motion gate, frame
+            # skip) would feed the same landmarks again and look perfectly still.
+            if self.auto_capture and not self.capture_complete and detection_results["pose_inferred"]:
+                is_valid = bool(meets_threshold and validation and validation["is_valid"])
+                stable = self.stability.update(is_valid, self._last_landmark_array)
+                self.capture_complete = stable and self.best_frames.best() is not None
+            detection_results["capture_complete"] = self.capture_complete
+            timer.lap("best_frame")
             
             # Add frame info
             detection_results["frame_number"] = self.frame_count
@@ -341,86 +412,104 @@ class RealtimeBodyDetector:
             # Update frame counter
             self.frame_count += 1
             
-            # Encode annotated frame back to base64 (for display)
-            _, buffer = cv2.imencode('.jpg', annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            annotated_frame_b64 = base64.b64encode(buffer).decode('utf-8')
-            detection_results["annotated_frame"] = f"data:image/jpeg;base64,{annotated_frame_b64}"
+            # Encode annotated frame (for display)
+            if annotated_frame is not None:
+                _, buffer = cv2.imencode('.jpg', annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, self.profile["jpeg_quality"]])
+                timer.lap("imencode")
+                detection_results["annotated_frame"] = self._encode_output(buffer)
+            elif self.render_mode == RENDER_IMAGE:
+                # The profile skips drawing, but the client still expects a frame to show
+                detection_results["annotated_frame"] = self._echo_output(frame_data, frame_bytes)
+            else:
+                detection_results["annotated_frame"] = None
             
-            # Encode clean frame back to base64 (for try-on processing)
-            _, clean_buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            clean_frame_b64 = base64.b64encode(clean_buffer).decode('utf-8')
-            detection_results["clean_frame"] = f"data:image/jpeg;base64,{clean_frame_b64}"
+            # Clean frame (for try-on processing) is the client's own JPEG
+            if self.clean_frame_mode == CLEAN_FRAME_ECHO:
+                detection_results["clean_frame"] = self._echo_output(frame_data, frame_bytes)
+            else:
+                detection_results["clean_frame"] = None
+            timer.lap("b64_encode")  # Output packaging; just a bytes copy on the binary transport
             
+            detection_results["timings"] = timer.as_dict()
             return detection_results
             
         except Exception as e:
-            print(f"Error processing frame: {str(e)}")
+            logger.error("Error processing frame: %s", e, extra={"event": "frame_error"})
             return {"error": f"Frame processing error: {str(e)}"}
     
-    def _detect_essential_parts(self, frame_rgb: np.ndarray, annotated_frame: np.ndarray) -> Dict:
-        """Detect only essential body parts (torso, legs, arms) with minimal processing"""
-        height, width = frame_rgb.shape[:2]
+    def _detect_essential_parts(self, frame_rgb: np.ndarray, annotated_frame: Optional[np.ndarray],
+                                timer: Optional[StageTimer] = None,
+                                full_size: Optional[Tuple[int, int]] = None) -> Dict:
+        """
+        Detect only essential body parts (torso, legs, arms) with minimal processing
+        
+        The overlay is drawn onto annotated_frame when one is given; pass None
+        to skip all drawing (vector render mode). Stage times are recorded on
+        timer when one is given. full_size is the (width, height) of the
+        original frame when frame_rgb was decoded at reduced scale; pixel
+        coordinates and frame_size are reported at that size.
+        """
+        timer = timer or StageTimer()
+        width, height = full_size or (frame_rgb.shape[1], frame_rgb.shape[0])
         
         detection_results = {
             "confidence": 0.0,
             "detection_quality": {},
             "essential_landmarks": [],
-            "full_body_validation": None
+            "full_body_validation": None,
+            "frame_size": {"width": width, "height": height},
+            "motion_skipped": False,
+            "pose_inferred": False
         }
         
         # MediaPipe Pose Detection - only essential parts
         try:
-            pose_results = self.mp_pose.process(frame_rgb)
-            if pose_results.pose_landmarks:
+            thumbnail = self._motion_thumbnail(frame_rgb)
+            static = self._is_static_frame(frame_rgb.shape, thumbnail)
+            timer.lap("motion_gate")
+            if static:
+                # Barely changed since the last inferred frame - reuse its pose and validation
+                pose_landmarks, analysis, validation = self._last_detection
+                self._motion_skips += 1
+                detection_results["motion_skipped"] = True
+            else:
+                pose_landmarks, landmark_array, inferred = self._infer_pose(frame_rgb)
+                detection_results["pose_inferred"] = inferred
+                timer.lap("pose")
+                # All landmark metrics come from one vectorized pass
+                analysis = analyze_landmarks(landmark_array, width, height) if pose_landmarks else None
+                validation = None
+                if analysis is not None and self.profile["validate"]:
+                    validation = self._validate_from_analysis(analysis)
+                self._last_detection = (pose_landmarks, analysis, validation)
+                self._motion_reference = (frame_rgb.shape, thumbnail) if thumbnail is not None else None
+                self._motion_skips = 0
+                timer.lap("validation")
+            
+            if pose_landmarks:
                 # Calculate confidence based on essential parts only
-                confidence = self.calculate_essential_confidence(pose_results.pose_landmarks)
-                detection_results["confidence"] = confidence
+                detection_results["confidence"] = analysis["essential_confidence"]
                 
-                # Perform full body validation
-                full_body_validation = self.validate_full_body_visibility(pose_results.pose_landmarks)
-                detection_results["full_body_validation"] = full_body_validation
+                # Full body validation
+                detection_results["full_body_validation"] = validation
                 
-                # Create custom drawing style with purple color
-                purple_rgb = (self.brand_color[2], self.brand_color[1], self.brand_color[0])  # BGR to RGB
-                purple_style = mp.solutions.drawing_styles.DrawingSpec(
-                    color=purple_rgb, thickness=2, circle_radius=3
-                )
-                purple_connections_style = mp.solutions.drawing_styles.DrawingSpec(
-                    color=purple_rgb, thickness=2
-                )
+                if annotated_frame is not None:
+                    self._draw_pose(annotated_frame, pose_landmarks)
+                    timer.lap("draw")
                 
-                # Draw only essential pose landmarks with purple color
-                self.mp_drawing.draw_landmarks(
-                    annotated_frame,
-                    pose_results.pose_landmarks,
-                    self.pose_connections,
-                    landmark_drawing_spec=purple_style,
-                    connection_drawing_spec=purple_connections_style
-                )
-                
-                # Extract only essential landmarks
-                essential_landmarks = []
-                for part_name, landmark_id in self.essential_landmarks.items():
-                    if landmark_id < len(pose_results.pose_landmarks.landmark):
-                        landmark = pose_results.pose_landmarks.landmark[landmark_id]
-                        if landmark.visibility > 0.3:  # Only visible landmarks
-                            x_px = int(landmark.x * width)
-                            y_px = int(landmark.y * height)
-                            essential_landmarks.append({
-                                "part": part_name,
-                                "x": x_px,
-                                "y": y_px,
-                                "confidence": landmark.visibility
-                            })
-                
-                detection_results["essential_landmarks"] = essential_landmarks
+                # Extract only visible essential landmarks
+                detection_results["essential_landmarks"] = analysis["essential_landmarks"]
                 
         except Exception as e:
-            print(f"MediaPipe pose detection error: {str(e)}")
+            logger.warning("MediaPipe pose detection error: %s", e, extra={"event": "frame_error"})
+            timer.lap("pose")
             # Continue without pose detection if it fails
         
         # Add minimal detection quality metrics
-        gray = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2GRAY)
+        if annotated_frame is not None:
+            gray = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2GRAY)
         brightness = np.mean(gray)
         contrast = np.std(gray)
         
@@ -430,7 +519,88 @@ class RealtimeBodyDetector:
             "essential_landmarks_count": len(detection_results["essential_landmarks"]),
             "total_confidence": detection_results["confidence"]
         }
+        timer.lap("quality")
         
+        if annotated_frame is not None:
+            self._draw_status(annotated_frame, detection_results)
+            timer.lap("draw")
+        
+        return detection_results
+    
+    def _motion_thumbnail(self, frame_rgb: np.ndarray) -> Optional[np.ndarray]:
+        """Downsampled grayscale copy of the frame for the motion gate, or None when it's off"""
+        if self.motion_threshold <= 0 or self.max_motion_skips <= 0:
+            return None
+        thumbnail = cv2.resize(frame_rgb, MOTION_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(thumbnail, cv2.COLOR_RGB2GRAY)
+    
+    def _is_static_frame(self, frame_shape: Tuple, thumbnail: Optional[np.ndarray]) -> bool:
+        """
+        Check whether a frame is close enough to the last inferred one to reuse its results
+        
+        Frames are compared with the last frame that actually ran inference (not
+        the previous frame), so slow drift still triggers fresh inference.
+        """
+        if thumbnail is None or self._motion_reference is None or self._last_detection is None:
+            return False
+        if self._motion_skips >= self.max_motion_skips:
+            return False
+        reference_shape, reference = self._motion_reference
+        if reference_shape != frame_shape:
+            return False  # Pixel-space landmarks are only valid for the same frame size
+        return float(cv2.absdiff(thumbnail, reference).mean()) < self.motion_threshold
+    
+    def _clear_motion_state(self):
+        self._motion_reference = None
+        self._last_detection = None
+        self._motion_skips = 0
+    
+    def _infer_pose(self, frame_rgb: np.ndarray):
+        """
+        Run pose inference at the profile's resolution and frame-skip ratio
+        
+        Returns:
+            (pose_landmarks, landmark_array, inferred) - the protobuf result (for
+            drawing), its (33, 4) array form, converted once per inference, and
+            False when both were reused from the last inference frame
+        """
+        # Between inference frames, reuse the last landmarks (they're normalized)
+        if self.frame_count % self.profile["frame_skip"] != 0 and self._last_pose_landmarks is not None:
+            return self._last_pose_landmarks, self._last_landmark_array, False
+        
+        inference_width = self.profile["inference_width"]
+        height, width = frame_rgb.shape[:2]
+        if inference_width and width > inference_width:
+            inference_height = int(height * inference_width / width)
+            frame_rgb = cv2.resize(frame_rgb, (inference_width, inference_height), interpolation=cv2.INTER_AREA)
+        
+        pose_landmarks = self.mp_pose.process(frame_rgb).pose_landmarks
+        self._last_pose_landmarks = pose_landmarks
+        self._last_landmark_array = landmarks_to_array(pose_landmarks) if pose_landmarks else None
+        return self._last_pose_landmarks, self._last_landmark_array, True
+    
+    def _draw_pose(self, annotated_frame: np.ndarray, pose_landmarks):
+        """Draw the pose skeleton onto the annotated frame"""
+        # Create custom drawing style with purple color
+        purple_rgb = (self.brand_color[2], self.brand_color[1], self.brand_color[0])  # BGR to RGB
+        purple_style = mp.solutions.drawing_styles.DrawingSpec(
+            color=purple_rgb, thickness=2, circle_radius=3
+        )
+        purple_connections_style = mp.solutions.drawing_styles.DrawingSpec(
+            color=purple_rgb, thickness=2
+        )
+        
+        # Draw only essential pose landmarks with purple color
+        self.mp_drawing.draw_landmarks(
+            annotated_frame,
+            pose_landmarks,
+            self.pose_connections,
+            landmark_drawing_spec=purple_style,
+            connection_drawing_spec=purple_connections_style
+        )
+    
+    def _draw_status(self, annotated_frame: np.ndarray, detection_results: Dict):
+        """Draw the validation status text onto the annotated frame"""
         # Add validation status overlay to frame
         if detection_results["full_body_validation"]:
             validation = detection_results["full_body_validation"]
@@ -448,15 +618,38 @@ class RealtimeBodyDetector:
                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, self.brand_color, 2)
             cv2.putText(annotated_frame, f'Best: {self.best_confidence:.1%}', 
                        (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.brand_color, 2)
-        
-        return detection_results
+    
+    def warm_up(self):
+        """Pay the Pose graph's one-off setup (model load, delegate init) before the first real frame"""
+        self.mp_pose.process(BLANK_FRAME)
     
     def reset(self):
         """Reset detection state"""
         self.frame_count = 0
         self.best_confidence = 0.0
-        self.best_frame = None
+        self.best_frames.clear()
+        self.transport = TRANSPORT_BASE64
+        self.clean_frame_mode = CLEAN_FRAME_ECHO
+        self.render_mode = RENDER_IMAGE
+        self.confidence_threshold = 0.7
+        self.include_timings = False
+        self.auto_capture = False
+        self.capture_complete = False
+        self.stability.reset()
+        self._last_pose_landmarks = None
+        self.set_detection_mode(DEFAULT_DETECTION_MODE)
+        # Drop pose tracking state so a reused detector starts fresh. Losing the
+        # person on a blank frame does that without mp_pose.reset(), which
+        # restarts the graph and makes the next frame pay model setup again.
+        self.mp_pose.process(BLANK_FRAME)
+    
+    def close(self):
+        """Release the MediaPipe graph"""
+        self.mp_pose.close()
     
     def get_best_frame(self):
-        """Get the best frame captured so far"""
-        return self.best_frame, self.best_confidence 
\ No newline at end of file
+        """Get the top-ranked frame captured so far as original JPEG bytes, with its confidence"""
+        best = self.best_frames.best()
+        if best is None:
+            return None, 0.0
+        return best["frame"], best["confidence"] 
\ No newline at end of file
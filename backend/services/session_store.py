@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+
+class SessionStore(ABC):
+    """
+    Shared per-session state for the streaming tier
+
+    Holds each session's best-frame JPEG bytes (with its ranking metadata) and
+    a small stats dict, so any node behind the load balancer can answer for a
+    session that streams to another node. Entries expire ttl seconds after
+    their last write.
+    """
+
+    @abstractmethod
+    def put_best_frame(self, sid: str, frame_bytes: bytes, meta: Dict):
+        pass
+
+    @abstractmethod
+    def get_best_frame(self, sid: str) -> Optional[Tuple[bytes, Dict]]:
+        """Get (frame_bytes, meta) for a session, or None"""
+
+    @abstractmethod
+    def put_stats(self, sid: str, stats: Dict):
+        pass
+
+    @abstractmethod
+    def get_stats(self, sid: str) -> Optional[Dict]:
+        pass
+
+    @abstractmethod
+    def clear(self, sid: str):
+        """Forget a session's best frame and stats (e.g. when its stream restarts)"""
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store - the single-node default, and a Redis stand-in for tests"""
+
+    def __init__(self, ttl: float = 600.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Tuple[float, object]] = {}
+
+    def _put(self, sid: str, kind: str, value):
+        with self._lock:
+            self._entries[(sid, kind)] = (time.monotonic() + self.ttl, value)
+
+    def _get(self, sid: str, kind: str):
+        with self._lock:
+            entry = self._entries.get((sid, kind))
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[(sid, kind)]
+                return None
+            return entry[1]
+
+    def put_best_frame(self, sid: str, frame_bytes: bytes, meta: Dict):
+        self._put(sid, "best_frame", (bytes(frame_bytes), dict(meta)))
+
+    def get_best_frame(self, sid: str) -> Optional[Tuple[bytes, Dict]]:
+        entry = self._get(sid, "best_frame")
+        return (entry[0], dict(entry[1])) if entry is not None else None
+
+    def put_stats(self, sid: str, stats: Dict):
+        self._put(sid, "stats", dict(stats))
+
+    def get_stats(self, sid: str) -> Optional[Dict]:
+        stats = self._get(sid, "stats")
+        return dict(stats) if stats is not None else None
+
+    def clear(self, sid: str):
+        with self._lock:
+            self._entries.pop((sid, "best_frame"), None)
+            self._entries.pop((sid, "stats"), None)
+
+
+class RedisSessionStore(SessionStore):
+    """Redis-backed store shared by every node in a multi-node deployment"""
+
+    def __init__(self, url: Optional[str] = None, ttl: float = 600.0, prefix: str = "tryon:session:",
+                 client=None):
+        """
+        Args:
+            url: redis://, rediss:// or unix:// URL to connect to
+            client: An already connected redis.Redis-compatible client, used instead of url
+        """
+        if client is None:
+            import redis  # Only needed for multi-node deployments (the "redis" extra)
+            client = redis.Redis.from_url(url)
+
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self._redis = client
+
+    def _key(self, sid: str, kind: str) -> str:
+        return f"{self.prefix}{sid}:{kind}"
+
+    def put_best_frame(self, sid: str, frame_bytes: bytes, meta: Dict):
+        # Frame and metadata are written together so readers never see a mismatched pair
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(sid, "frame"), bytes(frame_bytes), ex=self.ttl)
+        pipe.set(self._key(sid, "frame_meta"), json.dumps(meta), ex=self.ttl)
+        pipe.execute()
+
+    def get_best_frame(self, sid: str) -> Optional[Tuple[bytes, Dict]]:
+        frame_bytes, meta = self._redis.mget(self._key(sid, "frame"), self._key(sid, "frame_meta"))
+        if frame_bytes is None or meta is None:
+            return None
+        return frame_bytes, json.loads(meta)
+
+    def put_stats(self, sid: str, stats: Dict):
+        self._redis.set(self._key(sid, "stats"), json.dumps(stats), ex=self.ttl)
+
+    def get_stats(self, sid: str) -> Optional[Dict]:
+        stats = self._redis.get(self._key(sid, "stats"))
+        return json.loads(stats) if stats is not None else None
+
+    def clear(self, sid: str):
+        self._redis.delete(self._key(sid, "frame"), self._key(sid, "frame_meta"), self._key(sid, "stats"))
+
+
+def create_session_store(url: Optional[str], ttl: float = 600.0) -> SessionStore:
+    """Build the store named by SESSION_STORE_URL: "memory" (or empty) or a redis:// URL"""
+    if not url or url == "memory":
+        return InMemorySessionStore(ttl=ttl)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(url, ttl=ttl)
+    raise ValueError(f"Unsupported SESSION_STORE_URL '{url}', expected 'memory' or a redis:// URL")
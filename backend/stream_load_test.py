@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Socket.IO load generator for the real-time streaming endpoint
+
+Opens N concurrent clients against a running backend. Each client replays a
+JPEG frame sequence (recorded frames from a directory, or synthetic ones)
+through start_stream / video_frame / stop_stream at a fixed FPS. The run
+reports round-trip latency percentiles, achieved FPS per client, error counts
+and server main-process CPU (scraped from /metrics; INFERENCE_WORKERS
+processes are not included), and writes everything to JSON so runs
+against different builds can be compared.
+
+Usage:
+    python stream_load_test.py --clients 20 --fps 15 --duration 30
+    python stream_load_test.py --frames-dir recordings/standing --transport binary --output results.json
+"""
+
+import argparse
+import base64
+import glob
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+import requests
+import socketio
+
+
+def synthetic_frames(count: int, width: int, height: int, quality: int = 80) -> List[bytes]:
+    """Render a stick figure swaying across a noisy background, as JPEG bytes"""
+    rng = np.random.default_rng(0)
+    background = rng.integers(90, 140, size=(height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        cx = int(width / 2 + np.sin(i / 10) * width / 10)
+        head_y, hip_y, foot_y = int(height * 0.15), int(height * 0.55), int(height * 0.9)
+        color, thickness = (40, 40, 40), max(2, width // 80)
+        cv2.circle(frame, (cx, head_y), height // 16, color, -1)
+        cv2.line(frame, (cx, head_y), (cx, hip_y), color, thickness)
+        cv2.line(frame, (cx, int(height * 0.3)), (cx - width // 8, int(height * 0.45)), color, thickness)
+        cv2.line(frame, (cx, int(height * 0.3)), (cx + width // 8, int(height * 0.45)), color, thickness)
+        cv2.line(frame, (cx, hip_y), (cx - width // 12, foot_y), color, thickness)
+        cv2.line(frame, (cx, hip_y), (cx + width // 12, foot_y), color, thickness)
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        frames.append(buffer.tobytes())
+    return frames
+
+
+def load_frames(frames_dir: str) -> List[bytes]:
+    """Load a recorded frame sequence (JPEG files, replayed in name order)"""
+    paths = sorted(glob.glob(os.path.join(frames_dir, '*.jpg')) + glob.glob(os.path.join(frames_dir, '*.jpeg')))
+    if not paths:
+        raise SystemExit(f"No .jpg frames found in {frames_dir}")
+    frames = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            frames.append(f.read())
+    return frames
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """Nearest-rank p50/p90/p95/p99 plus mean, min and max"""
+    if not samples:
+        return {"p50": None, "p90": None, "p95": None, "p99": None, "mean": None, "min": None, "max": None}
+    ordered = sorted(samples)
+
+    def rank(q):
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 2)
+
+    return {
+        "p50": rank(0.5), "p90": rank(0.9), "p95": rank(0.95), "p99": rank(0.99),
+        "mean": round(sum(ordered) / len(ordered), 2), "min": round(ordered[0], 2), "max": round(ordered[-1], 2)
+    }
+
+
+def scrape_server_counters(url: str) -> Optional[Dict[str, float]]:
+    """Read CPU seconds and frame counters from the backend's /metrics"""
+    try:
+        text = requests.get(f"{url}/metrics", timeout=5).text
+    except requests.RequestException:
+        return None
+    counters = {}
+    for name in ("realtime_main_process_cpu_seconds_total", "realtime_frames_total", "realtime_frame_errors_total"):
+        match = re.search(rf"^{name} ([0-9.eE+-]+)$", text, re.MULTILINE)
+        if match:
+            counters[name] = float(match.group(1))
+    return counters
+
+
+class StreamClient:
+    """One simulated streaming user"""
+
+    def __init__(self, index: int, args, frames: List[bytes]):
+        self.index = index
+        self.args = args
+        self.frames = frames
+        self.sent = 0
+        self.received = 0
+        self.errors: Dict[str, int] = {}
+        self.latencies_ms: List[float] = []
+        self.send_times: Dict[int, float] = {}
+        self.streaming_seconds = 0.0
+        self._lock = threading.Lock()
+        self._started = threading.Event()
+
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on('stream_started', self._on_stream_started)
+        self.sio.on('annotated_frame', self._on_annotated_frame)
+        self.sio.on('frame_error', lambda data: self._count_error('frame_error'))
+        self.sio.on('stream_error', lambda data: self._count_error('stream_error'))
+
+    def _count_error(self, kind: str):
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def _on_stream_started(self, data):
+        self._started.set()
+
+    def _on_annotated_frame(self, data):
+        received_at = time.perf_counter()
+        with self._lock:
+            sent_at = self.send_times.pop(data.get('frame_id'), None)
+            if sent_at is None:
+                return
+            self.received += 1
+            self.latencies_ms.append((received_at - sent_at) * 1000)
+
+    def _encode(self, frame: bytes):
+        if self.args.transport == 'binary':
+            return frame
+        return f"data:image/jpeg;base64,{base64.b64encode(frame).decode('utf-8')}"
+
+    def run(self, start_at: float):
+        time.sleep(max(0.0, start_at - time.perf_counter()))
+        try:
+            self.sio.connect(self.args.url, wait_timeout=10)
+            self.sio.emit('start_stream', {
+                'transport': self.args.transport,
+                'detection_mode': self.args.detection_mode,
+                'render_mode': self.args.render_mode,
+                'clean_frame_mode': self.args.clean_frame_mode
+            })
+            if not self._started.wait(timeout=30):
+                self._count_error('start_timeout')
+                return
+
+            payloads = [self._encode(frame) for frame in self.frames]
+            interval = 1.0 / self.args.fps
+            stream_start = time.perf_counter()
+            deadline = stream_start + self.args.duration
+            next_send = stream_start
+            while next_send < deadline:
+                time.sleep(max(0.0, next_send - time.perf_counter()))
+                frame_id = self.sent
+                with self._lock:
+                    self.send_times[frame_id] = time.perf_counter()
+                self.sio.emit('video_frame', {'frame': payloads[frame_id % len(payloads)], 'frame_id': frame_id})
+                self.sent += 1
+                next_send += interval
+            self.streaming_seconds = time.perf_counter() - stream_start
+
+            # Let in-flight frames come back before stopping
+            time.sleep(self.args.drain)
+            self.sio.emit('stop_stream')
+        except Exception as e:
+            print(f"❌ Client {self.index} failed: {e}")
+            self._count_error('connection')
+        finally:
+            if self.sio.connected:
+                self.sio.disconnect()
+
+    def result(self) -> Dict:
+        with self._lock:
+            return {
+                "client": self.index,
+                "sent": self.sent,
+                "received": self.received,
+                "unanswered": self.sent - self.received,  # Dropped by the server's latest-frame-wins queue, or lost
+                "achieved_fps": round(self.received / self.streaming_seconds, 2) if self.streaming_seconds else 0.0,
+                "errors": dict(self.errors),
+                "latency_ms": percentiles(self.latencies_ms)
+            }
+
+
+def run_load_test(args) -> Dict:
+    frames = load_frames(args.frames_dir) if args.frames_dir else synthetic_frames(args.synthetic_frames, args.width, args.height)
+    clients = [StreamClient(i, args, frames) for i in range(args.clients)]
+
+    counters_before = scrape_server_counters(args.url)
+    wall_start = time.perf_counter()
+    # Stagger connections over the ramp-up period
+    threads = []
+    for client in clients:
+        start_at = wall_start + (args.ramp * client.index / max(1, args.clients - 1) if args.clients > 1 else 0.0)
+        thread = threading.Thread(target=client.run, args=(start_at,), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - wall_start
+    counters_after = scrape_server_counters(args.url)
+
+    results = [client.result() for client in clients]
+    all_latencies = [latency for client in clients for latency in client.latencies_ms]
+    errors: Dict[str, int] = {}
+    for result in results:
+        for kind, count in result["errors"].items():
+            errors[kind] = errors.get(kind, 0) + count
+
+    server = None
+    if counters_before and counters_after:
+        cpu_seconds = (counters_after.get("realtime_main_process_cpu_seconds_total", 0) -
+                       counters_before.get("realtime_main_process_cpu_seconds_total", 0))
+        server = {
+            "cpu_seconds": round(cpu_seconds, 2),
+            "cpu_percent": round(cpu_seconds / wall_seconds * 100, 1),  # 100% = one full core
+            "frames_processed": int(counters_after.get("realtime_frames_total", 0) - counters_before.get("realtime_frames_total", 0)),
+            "frame_errors": int(counters_after.get("realtime_frame_errors_total", 0) - counters_before.get("realtime_frame_errors_total", 0))
+        }
+
+    sent = sum(r["sent"] for r in results)
+    received = sum(r["received"] for r in results)
+    fps_values = [r["achieved_fps"] for r in results]
+    return {
+        "run_at": datetime.utcnow().isoformat(),
+        "config": {
+            "url": args.url,
+            "clients": args.clients,
+            "target_fps": args.fps,
+            "duration": args.duration,
+            "transport": args.transport,
+            "detection_mode": args.detection_mode,
+            "render_mode": args.render_mode,
+            "clean_frame_mode": args.clean_frame_mode,
+            "frames": args.frames_dir or f"synthetic {args.width}x{args.height} x{len(frames)}",
+            "avg_frame_bytes": int(sum(len(f) for f in frames) / len(frames))
+        },
+        "aggregate": {
+            "wall_seconds": round(wall_seconds, 2),
+            "sent": sent,
+            "received": received,
+            "delivery_ratio": round(received / sent, 3) if sent else 0.0,
+            "achieved_fps": percentiles(fps_values),
+            "latency_ms": percentiles(all_latencies),
+            "errors": errors
+        },
+        "server": server,
+        "clients": results
+    }
+
+
+def print_summary(report: Dict):
+    aggregate = report["aggregate"]
+    latency = aggregate["latency_ms"]
+    print("\n📊 Stream Load Test Results")
+    print("=" * 50)
+    print(f"Clients: {report['config']['clients']} @ {report['config']['target_fps']} FPS target, "
+          f"{report['config']['duration']}s ({report['config']['transport']}, {report['config']['detection_mode']})")
+    print(f"Frames: {aggregate['sent']} sent, {aggregate['received']} answered "
+          f"({aggregate['delivery_ratio']:.1%})")
+    fps = aggregate["achieved_fps"]
+    print(f"Achieved FPS per client: p50 {fps['p50']}, min {fps['min']}, max {fps['max']}")
+    print(f"Round-trip latency (ms): p50 {latency['p50']}, p95 {latency['p95']}, p99 {latency['p99']}, max {latency['max']}")
+    if aggregate["errors"]:
+        print(f"❌ Errors: {aggregate['errors']}")
+    else:
+        print("✅ No errors")
+    if report["server"]:
+        print(f"🖥️ Server CPU (main process): {report['server']['cpu_percent']}% of one core "
+              f"({report['server']['frames_processed']} frames processed)")
+    else:
+        print("⚠️ Server /metrics not reachable - no CPU figures")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the real-time streaming Socket.IO endpoint")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="Backend base URL")
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent streaming clients")
+    parser.add_argument("--fps", type=float, default=15.0, help="Frames per second sent by each client")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds each client streams for")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which client connections are staggered")
+    parser.add_argument("--drain", type=float, default=2.0, help="Seconds to wait for in-flight frames before stop_stream")
+    parser.add_argument("--frames-dir", help="Directory of recorded .jpg frames to replay (default: synthetic frames)")
+    parser.add_argument("--synthetic-frames", type=int, default=60, help="Number of synthetic frames to generate")
+    parser.add_argument("--width", type=int, default=640, help="Synthetic frame width")
+    parser.add_argument("--height", type=int, default=480, help="Synthetic frame height")
+    parser.add_argument("--transport", choices=["base64", "binary"], default="binary")
+    parser.add_argument("--detection-mode", choices=["strict", "realtime", "performance"], default="realtime")
+    parser.add_argument("--render-mode", choices=["image", "vector"], default="image")
+    parser.add_argument("--clean-frame-mode", choices=["echo", "omit"], default="echo")
+    parser.add_argument("--output", default=f"stream_load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    print(f"🚀 Starting {args.clients} streaming clients against {args.url}")
+    report = run_load_test(args)
+    print_summary(report)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the async server runtime
+
+async_runtime must not import threading before it has patched the standard
+library, and app.py must patch before importing anything that does. The
+eventlet and gevent smoke tests run in a fresh interpreter and are skipped
+when the optional dependency isn't installed (`uv sync --extra test`).
+"""
+
+import ast
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import async_runtime
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_python(code, *flags, env=None):
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True,
+                          timeout=60, env=dict(os.environ, **(env or {})))
+
+
+def test_import_does_not_load_threading():
+    """Importing async_runtime leaves threading unimported (-S: no site hooks that import it)"""
+    result = run_python(
+        f"import sys; sys.path.insert(0, {BACKEND_DIR!r}); import async_runtime; "
+        "assert 'threading' not in sys.modules, 'threading imported before patch()'",
+        "-S"
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_app_patches_before_other_imports():
+    """app.py's first import is async_runtime, and patch() runs before the next import"""
+    with open(os.path.join(BACKEND_DIR, "app.py")) as source:
+        body = ast.parse(source.read()).body
+    imports = [i for i, node in enumerate(body) if isinstance(node, (ast.Import, ast.ImportFrom))]
+    first = body[imports[0]]
+    assert isinstance(first, ast.Import) and first.names[0].name == "async_runtime"
+    patch_call = next(i for i, node in enumerate(body)
+                      if isinstance(node, ast.Expr) and ast.unparse(node) == "async_runtime.patch()")
+    assert patch_call < imports[1]
+
+
+def test_threading_mode_offload_is_inline_and_bounded():
+    """In threading mode offload() runs on the calling thread, at most pool-size calls at once"""
+    async_runtime.patch("threading")
+    async_runtime.configure_pools({"smoke": 2})
+    assert async_runtime.async_mode() == "threading"
+    assert async_runtime.offload(threading.get_ident, pool="smoke") == threading.get_ident()
+
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    callers = [threading.Thread(target=async_runtime.offload, args=(work,), kwargs={"pool": "smoke"})
+               for _ in range(6)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    assert peak[0] == 2
+
+
+def test_native_lock_in_threading_mode():
+    """Without patching the native lock is an ordinary threading lock"""
+    async_runtime.patch("threading")
+    lock = async_runtime.native_lock()
+    assert type(lock) is type(threading.Lock())
+    assert lock is not async_runtime.native_lock()
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        async_runtime.patch("asyncio")
+
+
+SMOKE = """
+import async_runtime
+async_runtime.patch()
+async_runtime.configure_pools({"cpu": 2})
+import socket, threading
+assert async_runtime.async_mode() == MODE
+assert async_runtime.offload(sum, [1, 2, 3]) == 6
+
+# Best frames are offered on offload threads and read on the loop
+from services.best_frames import BestFrameStore
+store = BestFrameStore(capacity=2)
+for i in range(20):
+    async_runtime.offload(store.offer, b"frame", i / 20, {"is_valid": True, "confidence": 0.8}, 0.5)
+    assert len(store) <= 2
+assert store.best()["confidence"] == 0.95
+
+# Detectors are built and reset on offload threads, the pool lock taken on both sides
+from services.detector_pool import DetectorPool
+class Detector:
+    resets = 0
+    def reset(self):
+        Detector.resets += 1
+    def warm_up(self):
+        pass
+    def close(self):
+        pass
+pool = DetectorPool(max_size=2, factory=Detector)
+assert async_runtime.offload(pool.warm, 1) == 1
+first = pool.acquire("sid-1")
+assert pool.acquire("sid-2") is not first and len(pool) == 2
+assert pool.release("sid-1") and Detector.resets == 1
+"""
+
+
+@pytest.mark.parametrize("mode, patched_check", [
+    ("eventlet", "import eventlet.patcher; assert eventlet.patcher.is_monkey_patched('thread')"),
+    ("gevent", "import gevent.monkey; assert gevent.monkey.is_module_patched('threading')"),
+])
+def test_cooperative_mode_smoke(mode, patched_check):
+    """patch() + offload() in a fresh interpreter for each cooperative mode"""
+    if importlib.util.find_spec(mode) is None:
+        pytest.skip(f"{mode} is not installed (uv sync --extra test)")
+    result = run_python(f"MODE = {mode!r}\n{SMOKE}\n{patched_check}\n", env={"ASYNC_MODE": mode})
+    assert result.returncode == 0, result.stderr
+
+
+if __name__ == "__main__":
+    print("🔀 Async Runtime Test")
+    print("=" * 50)
+    test_import_does_not_load_threading()
+    test_app_patches_before_other_imports()
+    test_threading_mode_offload_is_inline_and_bounded()
+    test_native_lock_in_threading_mode()
+    test_unknown_mode_rejected()
+    print("✅ async_runtime patches before threading is imported")
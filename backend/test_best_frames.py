@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the per-session best-frame store
+
+BestFrameStore keeps the top K candidates, validated full bodies first, and
+encodes the winner's data URL once until a different frame takes first place.
+"""
+
+import base64
+import threading
+
+import numpy as np
+
+from services.best_frames import BestFrameStore, frame_sharpness
+
+VALID = {"is_valid": True, "confidence": 0.8}
+INVALID = {"is_valid": False, "confidence": 0.9}
+
+
+def test_top_k_order():
+    """Validated frames outrank higher-scoring invalid ones; only the best K are kept"""
+    store = BestFrameStore(capacity=3)
+    assert store.offer(b"invalid-high", 1.0, INVALID, 1.0)
+    assert store.offer(b"valid-low", 0.5, VALID, 0.1)
+    assert store.offer(b"valid-high", 0.9, VALID, 0.9)
+    # Full: an unvalidated frame scoring below every kept one is refused
+    assert not store.offer(b"no-validation", 0.9, None, 1.0)
+    assert len(store) == 3
+
+    ranked = store.candidates()
+    assert [candidate["is_valid"] for candidate in ranked] == [True, True, False]
+    assert [candidate["confidence"] for candidate in ranked] == [0.9, 0.5, 1.0]
+    assert "frame" not in ranked[0] and "id" not in ranked[0]
+    assert store.best()["frame"] == b"valid-high"
+
+    # A frame ranking below the last kept one is refused, before and after scoring sharpness
+    assert not store.would_accept(0.1, None)
+    assert not store.offer(b"worse", 0.1, None, 0.0)
+    assert not store.would_accept(0.0, VALID)
+    assert store.would_accept(0.6, VALID)
+    assert len(store) == 3
+
+
+def test_data_url_cached_per_winner():
+    """The winner's data URL is encoded once and replaced when the winner changes"""
+    store = BestFrameStore(capacity=2)
+    assert store.best_data_url() is None
+
+    store.offer(b"first", 0.5, VALID, 0.5)
+    url = store.best_data_url()
+    assert url == "data:image/jpeg;base64," + base64.b64encode(b"first").decode("utf-8")
+    assert store.best_data_url() is url
+
+    store.offer(b"runner-up", 0.4, VALID, 0.5)
+    assert store.best_data_url() is url
+
+    store.offer(b"second", 0.9, VALID, 0.5)
+    assert base64.b64decode(store.best_data_url().split(",", 1)[1]) == b"second"
+
+    store.clear()
+    assert len(store) == 0
+    assert store.best() is None and store.best_data_url() is None
+
+
+def test_len_consistent_with_concurrent_offers():
+    """len() never sees the store above capacity while offers run on other threads"""
+    store = BestFrameStore(capacity=4)
+    start, stop = threading.Event(), threading.Event()
+    lengths = []
+
+    def offer():
+        start.wait()
+        for i in range(2000):
+            store.offer(b"frame", (i % 97) / 97, VALID if i % 3 else None, 0.5)
+        stop.set()
+
+    writer = threading.Thread(target=offer)
+    writer.start()
+    start.set()
+    while not stop.is_set():
+        lengths.append(len(store))
+    lengths.append(len(store))
+    writer.join()
+    assert max(lengths) <= 4
+    assert len(store) == 4
+
+
+def test_frame_sharpness():
+    """Flat frames score zero; detailed frames score higher; large frames are downscaled first"""
+    flat = np.full((480, 640, 3), 128, dtype=np.uint8)
+    noisy = np.random.default_rng(0).integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+    assert frame_sharpness(flat) == 0.0
+    assert 0.5 < frame_sharpness(noisy) < 1.0
+    assert 0.5 < frame_sharpness(noisy[:100, :100]) < 1.0
+
+
+if __name__ == "__main__":
+    print("🖼️ Best Frame Store Test")
+    print("=" * 50)
+    test_top_k_order()
+    test_data_url_cached_per_winner()
+    test_len_consistent_with_concurrent_offers()
+    test_frame_sharpness()
+    print("✅ Best frames are ranked and cached")
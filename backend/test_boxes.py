@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Parity test for vectorized box scoring
+
+Checks that the (N, 4) box toolkit in services/boxes.py, as used by
+services/body_detection.py, deduplicates, scores, validates and places face
+search regions like the original per-box Python loops (kept in
+box_benchmark.py, which also times both). Quality scores are summed in a
+different order, so they only match to floating point precision.
+"""
+
+import numpy as np
+import pytest
+
+from box_benchmark import (
+    FRAME, FRAME_HEIGHT, FRAME_WIDTH, legacy_dedupe, legacy_detection_quality, legacy_face_search_regions,
+    legacy_largest, legacy_positioning, sample_detections
+)
+from services.body_detection import (
+    calculate_detection_quality, face_search_regions, validate_full_body_visibility_opencv
+)
+from services.boxes import as_boxes, dedupe_boxes, largest_box, merge_boxes, scale_boxes
+
+
+def test_as_boxes():
+    """Any detection result becomes an (N, 4) array"""
+    assert as_boxes(()).shape == (0, 4)
+    assert as_boxes([]).shape == (0, 4)
+    assert as_boxes(np.array([[1, 2, 3, 4]], dtype=np.int32)).tolist() == [[1, 2, 3, 4]]
+    assert merge_boxes((), [(1, 2, 3, 4)], [(5, 6, 7, 8)]).tolist() == [[1, 2, 3, 4], [5, 6, 7, 8]]
+    assert merge_boxes().shape == (0, 4)
+    assert largest_box(as_boxes(())) is None
+    assert scale_boxes(as_boxes([(10, 15, 21, 33)]), 0.5).tolist() == [[20, 30, 42, 66]]
+
+
+def test_dedupe_parity():
+    """Same boxes kept, in the same order, as the pairwise loop"""
+    for faces, bodies in sample_detections():
+        for boxes, overlap in ((faces, 0.5), (bodies, 0.7)):
+            expected = [list(box) for box in legacy_dedupe(boxes, overlap)]
+            assert dedupe_boxes(as_boxes(boxes), overlap).tolist() == expected, boxes
+
+
+def test_scoring_parity():
+    """Quality score, validation and face search regions match the loops"""
+    for faces, bodies in sample_detections():
+        quality = calculate_detection_quality(FRAME, as_boxes(faces), as_boxes(bodies))
+        expected = legacy_detection_quality(FRAME_WIDTH, FRAME_HEIGHT, faces, bodies)
+        assert quality == pytest.approx(expected, abs=1e-12), (faces, bodies)
+
+        validation = validate_full_body_visibility_opencv(FRAME, as_boxes(faces), as_boxes(bodies))
+        if faces and bodies:
+            body_coverage, positioning_score = legacy_positioning(FRAME_WIDTH, FRAME_HEIGHT, legacy_largest(bodies))
+            assert validation["body_coverage"] == body_coverage
+            assert validation["positioning_score"] == positioning_score
+            assert validation["is_valid"] == (body_coverage >= 0.2 and positioning_score >= 0.6)
+            assert largest_box(as_boxes(faces)).tolist() == list(legacy_largest(faces))
+        else:
+            assert not validation["is_valid"] and validation["confidence"] == 0.0
+
+        expected = legacy_face_search_regions(bodies, FRAME_WIDTH, FRAME_HEIGHT)
+        assert face_search_regions(as_boxes(bodies), FRAME_WIDTH, FRAME_HEIGHT) == expected, bodies
+
+
+if __name__ == "__main__":
+    print("📦 Box Scoring Parity Test")
+    print("=" * 50)
+    test_as_boxes()
+    test_dedupe_parity()
+    test_scoring_parity()
+    print("✅ Vectorized output matches the loop implementation")
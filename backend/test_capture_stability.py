@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test the auto-capture stability detector
+
+A stream completes once enough recent frames pass full body validation and
+their landmarks hold still; invalid frames or a moving pose keep it going.
+"""
+
+import numpy as np
+
+from services.capture_stability import StabilityDetector
+from services.pose_landmarks import NUM_POSE_LANDMARKS
+
+
+def pose(offset=0.0, seed=0):
+    """A (33, 4) landmark array, shifted horizontally by offset"""
+    landmarks = np.random.default_rng(seed).uniform(0.2, 0.8, size=(NUM_POSE_LANDMARKS, 4)).astype(np.float32)
+    landmarks[:, 0] += offset
+    landmarks[:, 3] = 0.9
+    return landmarks
+
+
+def test_fires_after_required_valid_frames():
+    """Steady, valid frames complete the capture on the required_valid-th frame"""
+    detector = StabilityDetector(required_valid=5, window=8, max_jitter=0.01)
+    results = [detector.update(True, pose(offset=0.001 * (i % 2))) for i in range(5)]
+    assert results == [False, False, False, False, True]
+    assert detector.jitter is not None and detector.jitter <= 0.01
+
+
+def test_invalid_frames_within_window_are_tolerated():
+    """A few invalid frames inside the window don't reset the count"""
+    detector = StabilityDetector(required_valid=4, window=6, max_jitter=0.01)
+    sequence = [True, False, True, None, True, True]
+    results = [detector.update(bool(valid), pose() if valid is not None else None) for valid in sequence]
+    assert results[-1] is True
+    assert not any(results[:-1])
+
+
+def test_moving_pose_does_not_fire():
+    """Valid frames with a drifting pose are not a stable capture"""
+    detector = StabilityDetector(required_valid=5, window=5, max_jitter=0.01)
+    assert not any(detector.update(True, pose(offset=0.03 * i)) for i in range(10))
+
+
+def test_too_few_valid_frames_in_window():
+    """Valid frames that fall out of the window stop counting; reset() starts over"""
+    detector = StabilityDetector(required_valid=3, window=4, max_jitter=0.01)
+    sequence = [True, False, False, True, False, False, True]
+    assert not any(detector.update(valid, pose()) for valid in sequence)
+    assert detector.update(True, pose()) is False  # Only two valid frames in the last four
+    assert detector.update(True, pose()) is True
+    detector.reset()
+    assert detector.update(True, pose()) is False
+
+
+if __name__ == "__main__":
+    print("📸 Auto-Capture Stability Test")
+    print("=" * 50)
+    test_fires_after_required_valid_frames()
+    test_invalid_frames_within_window_are_tolerated()
+    test_moving_pose_does_not_fire()
+    test_too_few_valid_frames_in_window()
+    print("✅ Stable full-body poses complete the capture")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test the per-session detector pool
+
+DetectorPool hands each streaming session its own detector, recycles
+released ones, evicts sessions idle past the timeout and refuses new
+sessions once every slot is held.
+"""
+
+import threading
+import time
+
+from services.detector_pool import DetectorPool, DetectorPoolFullError
+
+
+class FakeDetector:
+    """Records the lifecycle calls the pool makes; building a real Pose graph isn't needed"""
+
+    created = 0
+
+    def __init__(self):
+        FakeDetector.created += 1
+        self.resets = 0
+        self.warmed = False
+        self.closed = False
+
+    def reset(self):
+        self.resets += 1
+
+    def warm_up(self):
+        self.warmed = True
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**options):
+    return DetectorPool(factory=FakeDetector, **options)
+
+
+def test_one_detector_per_session():
+    """A session keeps its detector; other sessions get their own"""
+    pool = make_pool(max_size=4)
+    first = pool.acquire("sid-1")
+    assert pool.acquire("sid-1") is first
+    assert pool.get("sid-1") is first
+    assert pool.acquire("sid-2") is not first
+    assert pool.get("unknown-sid") is None
+    assert len(pool) == 2
+
+
+def test_released_detectors_are_reset_and_reused():
+    """Released detectors are reset and handed to the next session instead of building a new one"""
+    pool = make_pool(max_size=4)
+    detector = pool.acquire("sid-1")
+    assert pool.release("sid-1") is True
+    assert pool.release("sid-1") is False
+    assert detector.resets == 1
+    assert pool.stats()["free_detectors"] == 1
+
+    created = FakeDetector.created
+    assert pool.acquire("sid-2") is detector
+    assert FakeDetector.created == created
+    assert pool.get("sid-1") is None
+
+
+def test_full_pool_rejects_new_sessions():
+    """Once every slot is held by an active session, new sessions get DetectorPoolFullError"""
+    pool = make_pool(max_size=2, idle_timeout=60)
+    pool.acquire("sid-1")
+    pool.acquire("sid-2")
+    try:
+        pool.acquire("sid-3")
+        assert False, "expected DetectorPoolFullError"
+    except DetectorPoolFullError:
+        pass
+    # Existing sessions are still served
+    assert pool.acquire("sid-1") is not None
+
+
+def test_idle_sessions_are_evicted():
+    """Sessions idle past the timeout make room; recently used ones are kept"""
+    pool = make_pool(max_size=2, idle_timeout=0.05)
+    idle = pool.acquire("sid-idle")
+    pool.acquire("sid-busy")
+    time.sleep(0.1)
+    pool.get("sid-busy")  # Touching a session keeps it alive
+
+    replacement = pool.acquire("sid-new")
+    assert replacement is idle and idle.resets == 1
+    assert pool.get("sid-idle") is None
+    assert pool.get("sid-busy") is not None
+
+    time.sleep(0.1)
+    assert pool.evict_idle() == 2
+    assert len(pool) == 0
+
+
+def test_eviction_reports_each_session():
+    """on_evict hears about every evicted sid, so state kept outside the pool can go too"""
+    evicted = []
+    pool = make_pool(max_size=2, idle_timeout=0.05, on_evict=evicted.append)
+    pool.acquire("sid-1")
+    pool.acquire("sid-2")
+    time.sleep(0.1)
+    pool.acquire("sid-3")
+    assert sorted(evicted) == ["sid-1", "sid-2"]
+    pool.release("sid-3")
+    assert len(evicted) == 2
+
+
+def test_reset_runs_outside_the_pool_lock():
+    """A slow reset on release doesn't block other sessions' get() or acquire()"""
+    pool = make_pool(max_size=4)
+    slow = pool.acquire("sid-slow")
+    other = pool.acquire("sid-other")
+    pool.warm(1)  # The slow reset holds the offload slot building a detector would need
+    resetting, finish = threading.Event(), threading.Event()
+
+    def slow_reset():
+        resetting.set()
+        finish.wait(5.0)
+        slow.resets += 1
+
+    slow.reset = slow_reset
+    releaser = threading.Thread(target=pool.release, args=("sid-slow",))
+    releaser.start()
+    try:
+        assert resetting.wait(2.0)
+        started = time.monotonic()
+        assert pool.get("sid-other") is other
+        assert pool.acquire("sid-new") is not slow
+        assert time.monotonic() - started < 1.0
+    finally:
+        finish.set()
+        releaser.join()
+    assert slow.resets == 1 and pool.stats()["free_detectors"] == 1
+
+
+def test_warm_never_exceeds_capacity():
+    """warm() builds idle detectors up to max_size, counting active sessions"""
+    pool = make_pool(max_size=3)
+    pool.acquire("sid-1")
+    assert pool.warm(5) == 2
+    stats = pool.stats()
+    assert stats["active_sessions"] == 1 and stats["free_detectors"] == 2
+    assert pool.acquire("sid-2").warmed
+
+
+def test_concurrent_acquire_shares_one_detector():
+    """Threads racing to acquire the same session all get the same detector"""
+    pool = make_pool(max_size=8)
+    results = []
+    barrier = threading.Barrier(8)
+
+    def acquire():
+        barrier.wait()
+        results.append(pool.acquire("sid-1"))
+
+    threads = [threading.Thread(target=acquire) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(detector) for detector in results}) == 1
+    assert len(pool) == 1
+
+
+if __name__ == "__main__":
+    print("🏊 Detector Pool Test")
+    print("=" * 50)
+    test_one_detector_per_session()
+    test_released_detectors_are_reset_and_reused()
+    test_full_pool_rejects_new_sessions()
+    test_idle_sessions_are_evicted()
+    test_eviction_reports_each_session()
+    test_reset_runs_outside_the_pool_lock()
+    test_warm_never_exceeds_capacity()
+    test_concurrent_acquire_shares_one_detector()
+    print("✅ Sessions get their own pooled detectors")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test the per-stage frame metrics behind /metrics
+
+FrameMetrics keeps a cumulative histogram per stage across all sessions and a
+rolling window per session, and renders both in the Prometheus text format.
+"""
+
+import time
+
+from services.frame_metrics import FrameMetrics, StageTimer
+
+
+def metric_lines(text, prefix):
+    """{series: value} for the sample lines starting with prefix"""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            series, value = line.rsplit(" ", 1)
+            samples[series] = float(value)
+    return samples
+
+
+def test_stage_timer_accumulates_laps():
+    """Laps with the same name add up; total covers every lap"""
+    timer = StageTimer()
+    time.sleep(0.002)
+    timer.lap("decode")
+    timer.lap("inference")
+    time.sleep(0.002)
+    timer.lap("decode")
+    timings = timer.as_dict()
+    assert set(timings) == {"decode", "inference", "total"}
+    assert timings["decode"] >= 4.0
+    assert abs(timings["total"] - (timings["decode"] + timings["inference"])) < 0.01
+
+
+def test_histogram_buckets_are_cumulative():
+    """Each bucket counts observations at or below its bound; +Inf counts them all"""
+    metrics = FrameMetrics()
+    for ms in (0.5, 1.0, 3.0, 30.0, 5000.0):
+        metrics.observe("sid-1", {"decode": ms})
+    metrics.observe_error()
+    text = metrics.render_prometheus()
+
+    buckets = metric_lines(text, 'realtime_frame_stage_seconds_bucket{stage="decode"')
+    assert buckets['realtime_frame_stage_seconds_bucket{stage="decode",le="0.001"}'] == 2
+    assert buckets['realtime_frame_stage_seconds_bucket{stage="decode",le="0.0025"}'] == 2
+    assert buckets['realtime_frame_stage_seconds_bucket{stage="decode",le="0.005"}'] == 3
+    assert buckets['realtime_frame_stage_seconds_bucket{stage="decode",le="0.05"}'] == 4
+    assert buckets['realtime_frame_stage_seconds_bucket{stage="decode",le="2.5"}'] == 4
+    assert buckets['realtime_frame_stage_seconds_bucket{stage="decode",le="+Inf"}'] == 5
+    counts = list(buckets.values())
+    assert counts == sorted(counts)
+
+    assert metric_lines(text, "realtime_frame_stage_seconds_sum") == {
+        'realtime_frame_stage_seconds_sum{stage="decode"}': 5.0345
+    }
+    assert metric_lines(text, "realtime_frames_total") == {"realtime_frames_total": 5}
+    assert metric_lines(text, "realtime_frame_errors_total") == {"realtime_frame_errors_total": 1}
+
+
+def test_session_window_and_quantiles():
+    """Per-session summaries cover only the last `window` frames"""
+    metrics = FrameMetrics(window=4)
+    for ms in (100.0, 100.0, 1.0, 2.0, 3.0, 4.0):
+        metrics.observe("sid-1", {"inference": ms})
+    summary = metric_lines(metrics.render_prometheus(), "realtime_session_stage_seconds")
+    label = 'session="sid-1",stage="inference"'
+    assert summary[f"realtime_session_stage_seconds_count{{{label}}}"] == 4
+    assert summary[f"realtime_session_stage_seconds_sum{{{label}}}"] == 0.01
+    assert summary[f'realtime_session_stage_seconds{{{label},quantile="0.5"}}'] == 0.003
+    assert summary[f'realtime_session_stage_seconds{{{label},quantile="0.99"}}'] == 0.004
+
+
+def test_label_values_are_escaped():
+    """Quotes, backslashes and newlines in session ids can't break the exposition format"""
+    metrics = FrameMetrics()
+    metrics.observe('a"b\\c\nd', {"decode": 1.0})
+    text = metrics.render_prometheus()
+    assert 'session="a\\"b\\\\c\\nd",stage="decode"' in text
+    for line in text.splitlines():
+        assert line.startswith(("#", "realtime_")), line
+
+
+def test_remove_session_keeps_global_histograms():
+    """Dropping a finished session removes its summary but not its share of the totals"""
+    metrics = FrameMetrics()
+    metrics.observe("sid-1", {"decode": 1.0})
+    metrics.observe("sid-2", {"decode": 2.0})
+    metrics.remove_session("sid-1")
+    metrics.remove_session("never-seen")
+    text = metrics.render_prometheus()
+    assert 'session="sid-1"' not in text
+    assert 'session="sid-2"' in text
+    assert metric_lines(text, 'realtime_frame_stage_seconds_count{stage="decode"}') == {
+        'realtime_frame_stage_seconds_count{stage="decode"}': 2
+    }
+
+
+def test_gauges_rendered():
+    """Extra gauges are exported with the realtime_ prefix"""
+    text = FrameMetrics().render_prometheus({"active_sessions": 3, "free_slots": 1})
+    assert "# TYPE realtime_active_sessions gauge\nrealtime_active_sessions 3\n" in text
+    assert "realtime_free_slots 1\n" in text
+    # Named for what process_time() measures: worker processes' CPU isn't in it
+    assert "\nrealtime_main_process_cpu_seconds_total " in text
+    assert "\nprocess_cpu_seconds_total" not in text
+
+
+def test_counters_rendered():
+    """Extra counters are exported with the realtime_ prefix and counter type"""
+    text = FrameMetrics().render_prometheus(counters={"log_records_dropped_total": 7})
+    assert "# TYPE realtime_log_records_dropped_total counter\nrealtime_log_records_dropped_total 7\n" in text
+
+
+if __name__ == "__main__":
+    print("📈 Frame Metrics Test")
+    print("=" * 50)
+    test_stage_timer_accumulates_laps()
+    test_histogram_buckets_are_cumulative()
+    test_session_window_and_quantiles()
+    test_label_values_are_escaped()
+    test_remove_session_keeps_global_histograms()
+    test_gauges_rendered()
+    test_counters_rendered()
+    print("✅ Frame metrics render as Prometheus text")
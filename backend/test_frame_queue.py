@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test the latest-frame-wins dispatcher that feeds streaming sessions
+
+FrameDispatcher must never run one session's frames on two workers at once,
+including when the session is discarded and restarted while a worker is
+still processing one of its frames.
+"""
+
+import threading
+import time
+
+from services.frame_queue import FrameDispatcher
+
+
+class Recorder:
+    """process_fn that records frames and flags overlapping calls per session"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = {}
+        self.overlaps = 0
+        self.frames = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, sid, frame_data, stats):
+        with self.lock:
+            self.active[sid] = self.active.get(sid, 0) + 1
+            if self.active[sid] > 1:
+                self.overlaps += 1
+        self.started.set()
+        self.release.wait()
+        time.sleep(self.delay)
+        with self.lock:
+            self.frames.append((sid, frame_data))
+            self.active[sid] -= 1
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_latest_frame_wins():
+    """Frames arriving while one is processed replace each other; only the newest runs next"""
+    recorder = Recorder()
+    recorder.release.clear()
+    dispatcher = FrameDispatcher(recorder, num_workers=2, max_frame_age=5.0)
+    try:
+        dispatcher.submit("sid-1", 1)
+        assert recorder.started.wait(2.0)
+        for frame in (2, 3, 4):
+            dispatcher.submit("sid-1", frame)
+        recorder.release.set()
+        assert wait_until(lambda: len(recorder.frames) == 2)
+        assert recorder.frames == [("sid-1", 1), ("sid-1", 4)]
+        assert dispatcher.stats("sid-1")["dropped_frames"] == 2
+    finally:
+        dispatcher.shutdown()
+
+
+def test_restart_mid_frame_waits_for_running_frame():
+    """A session discarded and restarted mid-frame is not picked up by a second worker"""
+    recorder = Recorder()
+    recorder.release.clear()
+    dispatcher = FrameDispatcher(recorder, num_workers=4, max_frame_age=5.0)
+    try:
+        dispatcher.submit("sid-1", "old stream")
+        assert recorder.started.wait(2.0)
+        # stop_stream / start_stream while the worker is still busy
+        dispatcher.discard("sid-1")
+        dispatcher.submit("sid-1", "new stream")
+        time.sleep(0.05)
+        assert recorder.overlaps == 0
+        recorder.release.set()
+        assert wait_until(lambda: len(recorder.frames) == 2)
+        assert recorder.frames == [("sid-1", "old stream"), ("sid-1", "new stream")]
+        assert recorder.overlaps == 0
+    finally:
+        dispatcher.shutdown()
+
+
+def test_discard_can_wait_for_running_frame():
+    """discard(wait=True) returns only once the frame in progress is done"""
+    recorder = Recorder()
+    recorder.release.clear()
+    dispatcher = FrameDispatcher(recorder, num_workers=2, max_frame_age=5.0)
+    try:
+        dispatcher.submit("sid-1", 1)
+        assert recorder.started.wait(2.0)
+        assert dispatcher.discard("sid-1", wait=True, timeout=0.05) is False
+        threading.Timer(0.05, recorder.release.set).start()
+        assert dispatcher.discard("sid-1", wait=True, timeout=2.0) is True
+        assert recorder.frames == [("sid-1", 1)]
+        # Nothing running: returns straight away
+        assert dispatcher.discard("sid-2", wait=True, timeout=0) is True
+    finally:
+        dispatcher.shutdown()
+
+
+def test_paused_session_drops_frames():
+    """Frames submitted while a session is paused are dropped, other sessions are unaffected"""
+    recorder = Recorder()
+    dispatcher = FrameDispatcher(recorder, num_workers=2, max_frame_age=5.0)
+    try:
+        dispatcher.pause("sid-1")
+        assert dispatcher.submit("sid-1", "during restart") is False
+        assert dispatcher.submit("sid-2", "other session") is True
+        assert wait_until(lambda: len(recorder.frames) == 1)
+        dispatcher.resume("sid-1")
+        assert dispatcher.submit("sid-1", "restarted") is True
+        assert wait_until(lambda: len(recorder.frames) == 2)
+        assert recorder.frames == [("sid-2", "other session"), ("sid-1", "restarted")]
+    finally:
+        dispatcher.shutdown()
+
+
+def test_no_concurrent_frames_under_churn():
+    """Many workers, rapid submits and restarts: each session still runs one frame at a time"""
+    recorder = Recorder(delay=0.001)
+    dispatcher = FrameDispatcher(recorder, num_workers=8, max_frame_age=5.0)
+    sids = [f"sid-{i}" for i in range(3)]
+
+    def client(sid):
+        for frame in range(200):
+            dispatcher.submit(sid, frame)
+            if frame % 7 == 0:
+                dispatcher.discard(sid)
+            time.sleep(0.0005)
+
+    try:
+        clients = [threading.Thread(target=client, args=(sid,)) for sid in sids]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        for sid in sids:
+            assert dispatcher.discard(sid, wait=True, timeout=2.0)
+    finally:
+        dispatcher.shutdown()
+
+    assert recorder.overlaps == 0
+    assert recorder.frames
+
+
+def test_worker_survives_process_errors():
+    """An exception in process_fn is logged and the session keeps being served"""
+    calls = []
+
+    def process(sid, frame_data, stats):
+        calls.append(frame_data)
+        if frame_data == "bad":
+            raise ValueError("corrupt frame")
+
+    dispatcher = FrameDispatcher(process, num_workers=1, max_frame_age=5.0)
+    try:
+        dispatcher.submit("sid-1", "bad")
+        assert wait_until(lambda: calls == ["bad"])
+        dispatcher.submit("sid-1", "good")
+        assert wait_until(lambda: calls == ["bad", "good"])
+    finally:
+        dispatcher.shutdown()
+
+
+if __name__ == "__main__":
+    print("📬 Frame Dispatcher Test")
+    print("=" * 50)
+    test_latest_frame_wins()
+    test_restart_mid_frame_waits_for_running_frame()
+    test_discard_can_wait_for_running_frame()
+    test_paused_session_drops_frames()
+    test_no_concurrent_frames_under_churn()
+    test_worker_survives_process_errors()
+    print("✅ Sessions are never processed on two workers at once")
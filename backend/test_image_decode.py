@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test reduced-scale JPEG decoding for the inference path
+
+Checks that JPEG dimensions are read from the header without decoding, that
+frames decode at the largest 1/2, 1/4 or 1/8 scale that keeps the requested
+size, and that non-JPEG input falls back to a full decode.
+"""
+
+import cv2
+import numpy as np
+
+from services.image_decode import decode_jpeg, decode_scale, jpeg_size
+
+
+def encode(width, height, ext='.jpg', params=None):
+    image = np.random.default_rng(0).integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    return cv2.imencode(ext, image, params or [])[1].tobytes()
+
+
+def test_jpeg_size_from_header():
+    """Baseline and progressive JPEGs report their size; other data reports None"""
+    assert jpeg_size(encode(1920, 1080)) == (1920, 1080)
+    assert jpeg_size(encode(640, 480, params=[cv2.IMWRITE_JPEG_PROGRESSIVE, 1])) == (640, 480)
+    assert jpeg_size(encode(64, 48, ext='.png')) is None
+    assert jpeg_size(b"\xff\xd8\xff") is None
+    assert jpeg_size(b"not an image") is None
+
+
+def test_decode_scale():
+    """The largest reduction that keeps the longer side at least min_size"""
+    assert decode_scale(1920, 1080, 960) == 2
+    assert decode_scale(3840, 2160, 960) == 4
+    assert decode_scale(1280, 720, 960) == 1
+    assert decode_scale(1080, 1920, 480) == 4
+    assert decode_scale(1920, 1080, 0) == 1
+
+
+def test_decode_jpeg():
+    """Reduced decodes keep the full size for pixel coordinates; PNGs decode at full size"""
+    image, full_size = decode_jpeg(encode(1920, 1080), min_size=960)
+    assert image.shape == (540, 960, 3)
+    assert full_size == (1920, 1080)
+
+    image, full_size = decode_jpeg(encode(1920, 1080), min_size=0)
+    assert image.shape == (1080, 1920, 3)
+    assert full_size == (1920, 1080)
+
+    image, full_size = decode_jpeg(encode(1920, 1080, ext='.png'), min_size=960)
+    assert image.shape == (1080, 1920, 3)
+    assert full_size == (1920, 1080)
+
+    image, _ = decode_jpeg(b"not an image", min_size=960)
+    assert image is None
+
+
+if __name__ == "__main__":
+    print("🖼️ Reduced-Scale Decode Test")
+    print("=" * 50)
+    test_jpeg_size_from_header()
+    test_decode_scale()
+    test_decode_jpeg()
+    print("✅ Frames decode at reduced scale")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test the multi-process pose inference pool
+
+Runs real MediaPipe workers on blank frames. Workers are paused with SIGSTOP
+to hold a task in flight: a caller that times out must not get its
+shared-memory slot handed to the next frame before the worker has replied,
+and a worker killed mid-task must be replaced with its tasks failed.
+"""
+
+import os
+import signal
+import threading
+import time
+
+import numpy as np
+
+from services.inference_pool import InferencePool
+
+SLOTS_PER_WORKER = 2
+
+
+def make_pool(**options):
+    return InferencePool(num_workers=1, max_width=320, max_height=240, slots_per_worker=SLOTS_PER_WORKER,
+                         graphs_per_worker=4, monitor_interval=0.1, **options)
+
+
+def wait_until(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_round_trip():
+    """Blank frames find no pose; oversized frames are shrunk to fit a slot; slots come back"""
+    pool = make_pool()
+    try:
+        client = pool.pose_client(model_complexity=1)
+        assert client.process(np.zeros((240, 320, 3), dtype=np.uint8)).pose_landmarks is None
+        assert client.process(np.zeros((720, 1280, 3), dtype=np.uint8)).pose_landmarks is None
+        stats = pool.stats()
+        assert stats["free_slots"] == SLOTS_PER_WORKER
+        assert stats["pending"] == 0
+        assert stats["alive_workers"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_timed_out_slot_held_until_reply():
+    """After a caller times out, its slot stays out of the ring until the worker answers"""
+    pool = make_pool()
+    try:
+        client = pool.pose_client(model_complexity=1)
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        client.process(frame)  # Graph built, so the late reply below comes quickly
+        pool.timeout = 0.2
+
+        worker_pid = pool._processes[0].pid
+        os.kill(worker_pid, signal.SIGSTOP)
+        try:
+            try:
+                client.process(frame)
+                assert False, "expected the paused worker to time out"
+            except TimeoutError:
+                pass
+            assert pool.stats()["free_slots"] == SLOTS_PER_WORKER - 1
+            assert pool.stats()["pending"] == 1
+        finally:
+            os.kill(worker_pid, signal.SIGCONT)
+
+        assert wait_until(lambda: pool.stats()["free_slots"] == SLOTS_PER_WORKER)
+        assert pool.stats()["pending"] == 0
+        assert pool.stats()["restarts"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_dead_worker_restarted():
+    """A worker killed mid-task fails that task, frees its slot and is replaced"""
+    pool = make_pool()
+    try:
+        client = pool.pose_client(model_complexity=1)
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        client.process(frame)
+
+        worker_pid = pool._processes[0].pid
+        os.kill(worker_pid, signal.SIGSTOP)
+        errors = []
+
+        def infer():
+            try:
+                client.process(frame)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        caller = threading.Thread(target=infer)
+        caller.start()
+        assert wait_until(lambda: pool.stats()["pending"] == 1)
+        os.kill(worker_pid, signal.SIGKILL)
+        caller.join(timeout=30.0)
+
+        assert errors and "worker process died" in errors[0]
+        stats = pool.stats()
+        assert stats["restarts"] == 1
+        assert stats["free_slots"] == SLOTS_PER_WORKER
+        # The replacement serves the same client with a fresh graph
+        assert client.process(frame).pose_landmarks is None
+        assert pool.stats()["alive_workers"] == 1
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    print("🧠 Inference Pool Test")
+    print("=" * 50)
+    test_round_trip()
+    print("✅ Round trip")
+    test_timed_out_slot_held_until_reply()
+    print("✅ Timed-out slots are held until the worker replies")
+    test_dead_worker_restarted()
+    print("✅ Dead workers are restarted")
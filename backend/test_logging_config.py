@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test hot-path log sampling and the non-blocking log queue
+
+EventSamplingFilter keeps 1 of every N records tagged with a sampled event
+and rate-limits others, noting how many were suppressed on the next record
+that gets through. DroppingQueueHandler drops records instead of blocking
+when the log queue is full.
+"""
+
+import logging
+import queue
+
+from logging_config import DroppingQueueHandler, EventSamplingFilter
+
+
+def make_record(message, event=None):
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+    if event is not None:
+        record.event = event
+    return record
+
+
+def test_sampling_keeps_one_record_per_n():
+    """With sample=N the 1st, N+1th, 2N+1th... records pass; untagged records always do"""
+    sampler = EventSamplingFilter({"frame": {"sample": 3}})
+    kept = [i for i in range(9) if sampler.filter(make_record(f"frame {i}", "frame"))]
+    assert kept == [0, 3, 6]
+    assert all(sampler.filter(make_record("untagged")) for _ in range(5))
+    assert all(sampler.filter(make_record("other", "unknown-event")) for _ in range(5))
+
+
+def test_next_record_reports_suppressed_count():
+    """The record after a run of dropped ones says how many were suppressed"""
+    sampler = EventSamplingFilter({"frame": {"sample": 4}})
+    records = [make_record(f"frame {i}", "frame") for i in range(9)]
+    kept = [record for record in records if sampler.filter(record)]
+    assert [record.getMessage() for record in kept] == [
+        "frame 0",
+        "frame 4 (3 similar suppressed)",
+        "frame 8 (3 similar suppressed)",
+    ]
+
+
+def test_rate_limit_allows_a_burst():
+    """per_second/burst lets a burst through, then suppresses until tokens refill"""
+    sampler = EventSamplingFilter({"error": {"per_second": 0.001, "burst": 2}})
+    results = [sampler.filter(make_record(f"error {i}", "error")) for i in range(5)]
+    assert results == [True, True, False, False, False]
+
+
+def test_full_queue_drops_records():
+    """Records that don't fit in the queue are counted as dropped, never block"""
+    log_queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+    for i in range(5):
+        handler.handle(make_record(f"record {i}"))
+    assert log_queue.qsize() == 2
+    assert handler.dropped == 3
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["record 0", "record 1"]
+
+
+if __name__ == "__main__":
+    print("🪵 Logging Config Test")
+    print("=" * 50)
+    test_sampling_keeps_one_record_per_n()
+    test_next_record_reports_suppressed_count()
+    test_rate_limit_allows_a_burst()
+    test_full_queue_drops_records()
+    print("✅ Hot-path logs are sampled and never block")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Parity test and benchmark for vectorized landmark post-processing
+
+Checks that the NumPy landmark pipeline in services/pose_landmarks.py gives
+the same validation, confidence and essential-landmark output as the
+original per-landmark Python loops, then times both.
+"""
+
+import random
+import time
+
+from mediapipe.framework.formats import landmark_pb2
+
+from services.pose_landmarks import (
+    ESSENTIAL_PARTS, FULL_BODY_PARTS, landmarks_to_array, analyze_landmarks
+)
+from services.realtime_detection import RealtimeBodyDetector
+
+FRAME_WIDTH, FRAME_HEIGHT = 1280, 720
+
+
+# Reference implementation: the per-landmark loops the vectorized code replaced
+
+def legacy_check_body_positioning(visible_landmarks):
+    x_coords = [landmark["x"] for landmark in visible_landmarks.values()]
+    y_coords = [landmark["y"] for landmark in visible_landmarks.values()]
+    if not x_coords or not y_coords:
+        return 0.0
+    min_x, max_x = min(x_coords), max(x_coords)
+    min_y, max_y = min(y_coords), max(y_coords)
+    body_width = max_x - min_x
+    body_height = max_y - min_y
+    body_center_x = (min_x + max_x) / 2
+    horizontal_centering = 1.0 - min(abs(body_center_x - 0.5) / 0.2, 1.0)
+    if 0.5 <= body_height <= 0.8:
+        size_score = 1.0
+    elif 0.4 <= body_height <= 0.85:
+        size_score = 0.5
+    else:
+        size_score = 0.0
+    margin_score = 1.0
+    if min_y < 0.05:
+        margin_score -= 0.3
+    if max_y > 0.95:
+        margin_score -= 0.3
+    aspect_ratio = body_height / body_width if body_width > 0 else 0
+    if 1.5 <= aspect_ratio <= 3.0:
+        aspect_score = 1.0
+    elif 1.2 <= aspect_ratio <= 4.0:
+        aspect_score = 0.7
+    else:
+        aspect_score = 0.3
+    return horizontal_centering * 0.3 + size_score * 0.3 + margin_score * 0.2 + aspect_score * 0.2
+
+
+def legacy_validate(detector, landmarks):
+    visible_landmarks = {}
+    missing_parts = []
+    for part_name, landmark_id in FULL_BODY_PARTS:
+        if landmark_id < len(landmarks.landmark):
+            landmark = landmarks.landmark[landmark_id]
+            if landmark.visibility > 0.3:
+                visible_landmarks[part_name] = {"x": landmark.x, "y": landmark.y, "visibility": landmark.visibility}
+            else:
+                missing_parts.append(part_name)
+        else:
+            missing_parts.append(part_name)
+    if not visible_landmarks:
+        return {"is_valid": False, "confidence": 0.0, "missing_parts": missing_parts,
+                "feedback": "No visible body parts detected", "body_coverage": 0.0}
+    regions = {
+        "head": ["nose", "left_ear", "right_ear"],
+        "torso": ["left_shoulder", "right_shoulder", "left_hip", "right_hip"],
+        "arms": ["left_elbow", "right_elbow", "left_wrist", "right_wrist"],
+        "legs": ["left_knee", "right_knee", "left_ankle", "right_ankle"]
+    }
+    region_coverage = {}
+    for region, parts in regions.items():
+        region_coverage[region] = len([p for p in parts if p in visible_landmarks]) / len(parts)
+    body_coverage = len(visible_landmarks) / len(FULL_BODY_PARTS)
+    positioning_score = legacy_check_body_positioning(visible_landmarks)
+    validation_score = body_coverage * 0.4 + positioning_score * 0.4 + min(region_coverage.values()) * 0.2
+    critical_visible = all(part in visible_landmarks for part in ["nose", "left_ankle", "right_ankle"])
+    is_valid = (
+        body_coverage >= 0.8 and positioning_score >= 0.7 and
+        min(region_coverage.values()) >= 0.6 and critical_visible and region_coverage["legs"] >= 0.8
+    )
+    feedback = detector._generate_validation_feedback(
+        is_valid, body_coverage, region_coverage, missing_parts, positioning_score
+    )
+    return {
+        "is_valid": is_valid,
+        "confidence": validation_score,
+        "missing_parts": missing_parts,
+        "feedback": feedback,
+        "body_coverage": body_coverage,
+        "region_coverage": region_coverage,
+        "positioning_score": positioning_score,
+        "visible_landmarks": visible_landmarks
+    }
+
+
+def legacy_confidence(landmarks):
+    visible = sum(1 for _, landmark_id in ESSENTIAL_PARTS if landmarks.landmark[landmark_id].visibility > 0.3)
+    return min(visible / len(ESSENTIAL_PARTS), 1.0)
+
+
+def legacy_essential_landmarks(landmarks, width, height):
+    essential_landmarks = []
+    for part_name, landmark_id in ESSENTIAL_PARTS:
+        landmark = landmarks.landmark[landmark_id]
+        if landmark.visibility > 0.3:
+            essential_landmarks.append({
+                "part": part_name,
+                "x": int(landmark.x * width),
+                "y": int(landmark.y * height),
+                "confidence": landmark.visibility
+            })
+    return essential_landmarks
+
+
+def make_landmarks(rng, visibility_bias=0.5):
+    """Build a random 33-landmark pose, loosely shaped like a standing person"""
+    center_x = rng.uniform(0.2, 0.8)
+    top = rng.uniform(-0.05, 0.4)
+    height = rng.uniform(0.2, 1.0)
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    for i in range(33):
+        landmarks.landmark.add(
+            x=center_x + rng.uniform(-0.25, 0.25) * height,
+            y=top + (i / 32.0) * height + rng.uniform(-0.02, 0.02),
+            z=rng.uniform(-1, 1),
+            visibility=min(max(rng.gauss(visibility_bias, 0.35), 0.0), 1.0)
+        )
+    return landmarks
+
+
+def make_detector():
+    # Post-processing needs no model, so skip building a Pose graph
+    return RealtimeBodyDetector.__new__(RealtimeBodyDetector)
+
+
+def sample_poses(count=500, seed=7):
+    rng = random.Random(seed)
+    poses = [make_landmarks(rng, visibility_bias=rng.choice([0.1, 0.5, 0.9, 1.0])) for _ in range(count)]
+    # Edge cases: nothing visible, and visibility exactly at the threshold
+    nothing = make_landmarks(rng)
+    for landmark in nothing.landmark:
+        landmark.visibility = 0.0
+    threshold = make_landmarks(rng)
+    for landmark in threshold.landmark:
+        landmark.visibility = 0.3
+    return poses + [nothing, threshold]
+
+
+def test_validation_parity():
+    """Vectorized validation matches the loop implementation field for field"""
+    detector = make_detector()
+    for landmarks in sample_poses():
+        expected = legacy_validate(detector, landmarks)
+        assert detector.validate_full_body_visibility(landmarks) == expected
+        assert detector.validate_full_body_visibility(landmarks_to_array(landmarks)) == expected
+
+
+def test_confidence_and_essential_landmark_parity():
+    """Essential confidence and pixel landmarks match the loop implementation"""
+    detector = make_detector()
+    for landmarks in sample_poses():
+        array = landmarks_to_array(landmarks)
+        assert detector.calculate_essential_confidence(array) == legacy_confidence(landmarks)
+        analysis = analyze_landmarks(array, FRAME_WIDTH, FRAME_HEIGHT)
+        assert analysis["essential_confidence"] == legacy_confidence(landmarks)
+        assert analysis["essential_landmarks"] == legacy_essential_landmarks(landmarks, FRAME_WIDTH, FRAME_HEIGHT)
+
+
+def benchmark(iterations=20):
+    """Time per-frame landmark post-processing, loops vs vectorized"""
+    detector = make_detector()
+    poses = sample_poses()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for landmarks in poses:
+            legacy_confidence(landmarks)
+            legacy_validate(detector, landmarks)
+            legacy_essential_landmarks(landmarks, FRAME_WIDTH, FRAME_HEIGHT)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for landmarks in poses:
+            # What _detect_essential_parts does per frame
+            analysis = analyze_landmarks(landmarks_to_array(landmarks), FRAME_WIDTH, FRAME_HEIGHT)
+            detector._validate_from_analysis(analysis)
+    vectorized_time = time.perf_counter() - start
+
+    frames = iterations * len(poses)
+    print(f"Loop implementation:       {legacy_time / frames * 1e6:8.1f} µs/frame")
+    print(f"Vectorized implementation: {vectorized_time / frames * 1e6:8.1f} µs/frame")
+    print(f"Speedup: {legacy_time / vectorized_time:.2f}x")
+
+
+if __name__ == "__main__":
+    print("🦴 Landmark Post-Processing Parity Test")
+    print("=" * 50)
+    test_validation_parity()
+    test_confidence_and_essential_landmark_parity()
+    print("✅ Vectorized output matches the loop implementation")
+    print()
+    benchmark()
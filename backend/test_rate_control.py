@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test server-driven capture rate hints
+
+RateController turns measured per-session processing cost, the number of
+active sessions and queue drops into rate_hint payloads for the client.
+"""
+
+from services.rate_control import MAX_JPEG_QUALITY, MIN_JPEG_QUALITY, RateController
+
+NO_DROPS = {"dropped_frames": 0, "stale_frames": 0}
+
+
+def test_idle_server_keeps_requested_rate():
+    """Cheap frames on an idle server: the client keeps its own rate and quality"""
+    controller = RateController(workers=4, warmup_frames=0, interval=0)
+    controller.start("sid-1", 15)
+    hint = controller.observe("sid-1", 20.0, NO_DROPS)
+    assert hint["fps"] == 15
+    assert hint["jpeg_quality"] == MAX_JPEG_QUALITY
+    # Nothing changed, so nothing more is sent
+    assert controller.observe("sid-1", 20.0, NO_DROPS) is None
+
+
+def test_slow_session_is_slowed_down():
+    """A session whose frames take 200 ms can't be served at 15 fps by one worker"""
+    controller = RateController(workers=4, warmup_frames=0, headroom=0.8, interval=0, smoothing=1.0)
+    controller.start("sid-1", 15)
+    hint = controller.observe("sid-1", 200.0, NO_DROPS)
+    assert hint["fps"] == 4.0
+    assert MIN_JPEG_QUALITY <= hint["jpeg_quality"] < MAX_JPEG_QUALITY
+
+
+def test_sessions_share_workers():
+    """Ten 50 ms sessions on two workers get a fair share of 3.2 fps each"""
+    controller = RateController(workers=2, warmup_frames=0, headroom=0.8, interval=0, smoothing=1.0)
+    for i in range(10):
+        controller.start(f"sid-{i}", 15)
+        controller.observe(f"sid-{i}", 50.0, NO_DROPS)
+    hint = controller.observe("sid-0", 50.0, {"dropped_frames": 0, "stale_frames": 0})
+    assert hint is not None and hint["fps"] == 3.2
+
+
+def test_drops_back_off_and_recover():
+    """New drops cut the rate; once load clears the rate climbs back"""
+    controller = RateController(workers=4, warmup_frames=0, interval=0, smoothing=1.0)
+    controller.start("sid-1", 15)
+    controller.observe("sid-1", 20.0, NO_DROPS)
+    hint = controller.observe("sid-1", 20.0, {"dropped_frames": 3, "stale_frames": 0})
+    assert hint["backlog"] is True
+    assert hint["fps"] == 11.2
+    hint = controller.observe("sid-1", 20.0, {"dropped_frames": 3, "stale_frames": 0})
+    assert hint["backlog"] is False
+    assert hint["fps"] == 15
+
+
+def test_hints_are_rate_limited():
+    """At most one hint per interval, and none for unknown sessions"""
+    controller = RateController(workers=1, warmup_frames=0, interval=60, smoothing=1.0)
+    controller.start("sid-1", 15)
+    assert controller.observe("sid-1", 20.0, NO_DROPS) is not None
+    assert controller.observe("sid-1", 500.0, NO_DROPS) is None
+    assert controller.observe("unknown-sid", 20.0, NO_DROPS) is None
+
+
+if __name__ == "__main__":
+    print("⏱️ Rate Hint Test")
+    print("=" * 50)
+    test_idle_server_keeps_requested_rate()
+    test_slow_session_is_slowed_down()
+    test_sessions_share_workers()
+    test_drops_back_off_and_recover()
+    test_hints_are_rate_limited()
+    print("✅ Rate hints follow server load")
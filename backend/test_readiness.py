@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test background warm-up and the /ready endpoint
+
+/ready must answer 503 until every component is warm, while /health answers
+straight away. Failing warm-up steps are retried until they succeed.
+"""
+
+import time
+
+from app import create_app
+from warmup import Readiness, start_warmup
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_failed_steps_are_retried():
+    """A step that raises is reported and retried until it succeeds"""
+    readiness = Readiness(["flaky", "steady"])
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("not up yet")
+        return "up"
+
+    start_warmup(readiness, [("flaky", flaky), ("steady", lambda: "ok")], retry_interval=0.01)
+    assert wait_for(readiness.is_ready)
+    state = readiness.snapshot()
+    assert state["flaky"] == {"ready": True, "detail": "up", "attempts": 3, "elapsed_ms": state["flaky"]["elapsed_ms"]}
+    assert state["steady"]["detail"] == "ok"
+
+
+def test_ready_endpoint():
+    """/ready is 503 while components are cold and 200 once all are warm; /health never waits"""
+    app, _ = create_app(warmup=False)
+    client = app.test_client()
+
+    assert client.get('/health').status_code == 200
+    response = client.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json()["ready"] is False
+
+    app.readiness.mark("detector", True, "1 idle detector(s) warmed")
+    app.readiness.mark("mongo", True, "ping ok")
+    assert client.get('/ready').status_code == 503
+
+    app.readiness.mark("http", True, {"https://api.segmind.com": "ok"})
+    response = client.get('/ready')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["ready"] is True
+    assert body["components"]["mongo"]["detail"] == "ping ok"
+
+
+if __name__ == "__main__":
+    print("🚦 Warm-up and Readiness Test")
+    print("=" * 50)
+    test_failed_steps_are_retried()
+    test_ready_endpoint()
+    print("✅ /ready waits for warm-up")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test how stream settings drive RealtimeBodyDetector.process_frame
+
+Pose inference is answered by a scripted pose client passed in place of an
+InferencePool, so these checks don't depend on which MediaPipe models are
+installed: every frame that runs inference gets the same standing pose,
+visible head to toe.
+"""
+
+import base64
+
+import cv2
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from fake_pose import ScriptedPosePool
+from services.capture_stability import StabilityDetector
+from services.pose_landmarks import NUM_POSE_LANDMARKS
+from services.realtime_detection import (CLEAN_FRAME_ECHO, CLEAN_FRAME_OMIT, RENDER_IMAGE, RENDER_VECTOR,
+                                        TRANSPORT_BASE64, TRANSPORT_BINARY, RealtimeBodyDetector)
+
+
+def standing_pose(visibility=0.99):
+    """A person centered in the frame, filling 15%-85% of its height"""
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    for i in range(NUM_POSE_LANDMARKS):
+        landmarks.landmark.add(x=0.4 + 0.2 * (i % 2), y=0.15 + 0.7 * i / (NUM_POSE_LANDMARKS - 1),
+                               z=0.0, visibility=visibility)
+    return landmarks
+
+
+def jpeg_frame(seed=0, size=(640, 480)):
+    """A noisy (so never motion-gated) JPEG"""
+    width, height = size
+    image = np.random.default_rng(seed).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def make_detector(landmarks=None, detector_options=None, **stream_options):
+    pool = ScriptedPosePool(landmarks or standing_pose())
+    detector = RealtimeBodyDetector(inference_pool=pool, detection_mode="strict", decode_min_size=0,
+                                    stability=StabilityDetector(required_valid=3, window=3, max_jitter=0.05),
+                                    **(detector_options or {}))
+    detector.configure(**{"transport": TRANSPORT_BINARY, **stream_options})
+    return detector, pool
+
+
+def test_performance_profile_still_sends_a_frame():
+    """In image render mode a profile that doesn't draw sends the client's frame back as is"""
+    frame = jpeg_frame()
+    detector, _ = make_detector(detection_mode="performance", render_mode=RENDER_IMAGE)
+    result = detector.process_frame(frame)
+    assert "error" not in result, result
+    assert result["annotated_frame"] == frame
+
+    detector, _ = make_detector(detection_mode="performance", render_mode=RENDER_VECTOR)
+    assert detector.process_frame(frame)["annotated_frame"] is None
+
+    # Profiles that draw send a re-encoded, annotated frame
+    detector, _ = make_detector(detection_mode="strict", render_mode=RENDER_IMAGE)
+    annotated = detector.process_frame(frame)["annotated_frame"]
+    assert annotated and annotated != frame
+
+
+def test_clean_frame_echoed_only_when_requested():
+    """clean_frame is the client's own frame in echo mode and None in omit mode, whatever the render mode"""
+    frame = jpeg_frame()
+    for render_mode in (RENDER_IMAGE, RENDER_VECTOR):
+        detector, _ = make_detector(render_mode=render_mode, clean_frame_mode=CLEAN_FRAME_ECHO)
+        result = detector.process_frame(frame)
+        assert "error" not in result, result
+        assert result["clean_frame"] == frame, render_mode
+
+        detector, _ = make_detector(render_mode=render_mode, clean_frame_mode=CLEAN_FRAME_OMIT)
+        result = detector.process_frame(frame)
+        assert "error" not in result, result
+        assert result["clean_frame"] is None, render_mode
+        # Omitting the echo doesn't lose the frame for try-on
+        assert len(detector.best_frames) == 1
+
+
+def test_frames_come_back_in_the_transport_they_arrived_in():
+    """Binary frames get bytes back; base64 frames get data-URL strings, the clean one verbatim"""
+    frame = jpeg_frame()
+    detector, _ = make_detector()
+    result = detector.process_frame(frame)
+    assert isinstance(result["annotated_frame"], bytes) and result["annotated_frame"][:2] == b"\xff\xd8"
+    assert result["clean_frame"] == frame and isinstance(result["clean_frame"], bytes)
+
+    data_url = "data:image/jpeg;base64," + base64.b64encode(frame).decode("utf-8")
+    detector, _ = make_detector(transport=TRANSPORT_BASE64)
+    result = detector.process_frame(data_url)
+    assert result["clean_frame"] == data_url
+    header, encoded = result["annotated_frame"].split(",", 1)
+    assert header == "data:image/jpeg;base64"
+    assert base64.b64decode(encoded)[:2] == b"\xff\xd8"
+
+
+def test_confidence_threshold_gates_best_frames():
+    """Frames below confidence_threshold are not kept as best frames"""
+    detector, _ = make_detector(confidence_threshold=0.7)
+    result = detector.process_frame(jpeg_frame())
+    assert result["confidence"] == 1.0 and result["meets_threshold"] is True
+    assert result["full_body_validation"]["is_valid"]
+    assert len(detector.best_frames) == 1
+
+    # Only some essential parts visible: below a 0.9 threshold
+    partial = standing_pose()
+    for landmark in list(partial.landmark)[23:]:
+        landmark.visibility = 0.1
+    detector, _ = make_detector(landmarks=partial, confidence_threshold=0.9)
+    result = detector.process_frame(jpeg_frame())
+    assert 0 < result["confidence"] < 0.9 and result["meets_threshold"] is False
+    assert len(detector.best_frames) == 0
+    assert detector.get_best_frame() == (None, 0.0)
+
+
+def test_confidence_threshold_gates_auto_capture():
+    """Valid frames below the threshold never complete an auto_capture stream"""
+    detector, _ = make_detector(confidence_threshold=1.01, auto_capture=True)
+    for seed in range(6):
+        assert detector.process_frame(jpeg_frame(seed))["capture_complete"] is False
+
+    detector, _ = make_detector(confidence_threshold=0.7, auto_capture=True)
+    results = [detector.process_frame(jpeg_frame(seed))["capture_complete"] for seed in range(3)]
+    assert results == [False, False, True]
+
+
+def test_reused_frames_do_not_count_toward_stability():
+    """Frames answered by the motion gate or frame_skip don't feed the stability detector"""
+    # The same frame over and over: after the first, the motion gate reuses its result
+    detector, pool = make_detector(auto_capture=True)
+    frame = jpeg_frame()
+    results = [detector.process_frame(frame) for _ in range(6)]
+    assert pool.calls == 1
+    assert [result["motion_skipped"] for result in results] == [False] + [True] * 5
+    assert [result["pose_inferred"] for result in results] == [True] + [False] * 5
+    assert not any(result["capture_complete"] for result in results)
+
+    # Once the gate forces fresh inference, those frames count
+    detector, pool = make_detector(detector_options={"max_motion_skips": 1}, auto_capture=True)
+    results = [detector.process_frame(frame)["capture_complete"] for _ in range(5)]
+    assert pool.calls == 3
+    assert results == [False, False, False, False, True]
+
+    # performance infers every other frame
+    detector, pool = make_detector(detection_mode="performance", auto_capture=True)
+    results = [detector.process_frame(jpeg_frame(seed))["capture_complete"] for seed in range(5)]
+    assert pool.calls == 3
+    assert results == [False, False, False, False, True]
+
+
+if __name__ == "__main__":
+    print("🎛️ Realtime Detector Stream Settings Test")
+    print("=" * 50)
+    test_performance_profile_still_sends_a_frame()
+    test_clean_frame_echoed_only_when_requested()
+    test_frames_come_back_in_the_transport_they_arrived_in()
+    test_confidence_threshold_gates_best_frames()
+    test_confidence_threshold_gates_auto_capture()
+    test_reused_frames_do_not_count_toward_stability()
+    print("✅ Stream settings drive frame processing")
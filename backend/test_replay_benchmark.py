@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Golden-value check for the offline replay benchmark
+
+Replays the recorded, synthetic and video frame sequences through
+RealtimeBodyDetector in every render mode and checks per-frame confidence and
+validation against benchmark_golden.json. Each detection mode is checked
+separately: a mode whose Pose model isn't installed, or that has no golden
+values yet, is skipped with the reason (only the strict mode's model ships
+with mediapipe). REPLAY_GOLDEN_MODES (e.g. REPLAY_GOLDEN_MODES=strict) limits
+the modes checked. If a change is meant to alter results, re-record with
+`python replay_benchmark.py --update-golden`.
+"""
+
+import os
+
+import pytest
+
+from replay_benchmark import (
+    RENDER_MODES, build_sources, compare_to_golden, golden_applies, load_golden, missing_models, replay
+)
+from services.realtime_detection import DETECTION_PROFILES
+
+GOLDEN_MODES = [mode for mode in os.getenv("REPLAY_GOLDEN_MODES", ",".join(DETECTION_PROFILES)).split(",") if mode]
+
+
+def skip_reason(mode, golden):
+    """Why a mode can't be checked on this machine, or None"""
+    missing = missing_models([mode])
+    if missing:
+        return f"{mode}: {missing[mode]} is not installed (MediaPipe downloads it on first use with network access)"
+    if not any(key.endswith(f"/{mode}") for key in golden["results"]):
+        return f"{mode}: no golden values recorded (run replay_benchmark.py --update-golden --modes {mode})"
+    return None
+
+
+def check_mode(mode):
+    golden = load_golden()
+    assert golden is not None, "benchmark_golden.json is missing"
+    reason = skip_reason(mode, golden)
+    if reason:
+        pytest.skip(reason)
+
+    checked, mismatches = 0, []
+    for source, frames in build_sources().items():
+        if not golden_applies(golden, source, mode, frames):
+            continue
+        for render in RENDER_MODES:
+            run = replay(frames, mode, render)
+            assert run["errors"] == 0
+            mismatches.extend(f"[{render}] {m}" for m in compare_to_golden(source, mode, run["results"], golden))
+            checked += 1
+    assert checked, f"No golden values for {mode} apply to the frames on this machine"
+    assert not mismatches, "\n".join(mismatches[:20])
+
+
+@pytest.mark.parametrize("mode", GOLDEN_MODES)
+def test_results_match_golden(mode):
+    """The detection mode reproduces the golden confidences and validation"""
+    check_mode(mode)
+
+
+if __name__ == "__main__":
+    print("🎞️ Replay Benchmark Golden Test")
+    print("=" * 50)
+    golden = load_golden()
+    for mode in GOLDEN_MODES:
+        reason = skip_reason(mode, golden)
+        if reason:
+            print(f"⚠️ Skipped {reason}")
+            continue
+        check_mode(mode)
+        print(f"✅ {mode} output matches the golden values")
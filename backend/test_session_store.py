@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test the shared session store used by multi-node deployments
+
+Two app instances share one InMemorySessionStore (standing in for Redis):
+a best frame published by the node a session streams to must be served by
+any other node's /api/best-frame. RedisSessionStore runs against a minimal
+in-process fake of the redis client, and against a real server when
+REDIS_URL is set and the "redis" extra is installed.
+"""
+
+import base64
+import importlib.util
+import os
+import time
+
+import pytest
+
+from app import create_app
+from services.session_store import InMemorySessionStore, RedisSessionStore, SessionStore
+
+FRAME_BYTES = b"\xff\xd8\xff\xe0fake-jpeg-bytes\xff\xd9"
+META = {"confidence": 0.92, "is_valid": True, "score": 0.81}
+
+
+def test_store_round_trip():
+    """Best frames and stats round-trip and are forgotten by clear()"""
+    store = InMemorySessionStore(ttl=60)
+    store.put_best_frame("sid-1", FRAME_BYTES, META)
+    store.put_stats("sid-1", {"frame_count": 42})
+
+    assert store.get_best_frame("sid-1") == (FRAME_BYTES, META)
+    assert store.get_stats("sid-1") == {"frame_count": 42}
+    assert store.get_best_frame("sid-2") is None
+
+    store.clear("sid-1")
+    assert store.get_best_frame("sid-1") is None
+    assert store.get_stats("sid-1") is None
+
+
+def test_store_expiry():
+    """Entries expire ttl seconds after their last write"""
+    store = InMemorySessionStore(ttl=0.05)
+    store.put_best_frame("sid-1", FRAME_BYTES, META)
+    time.sleep(0.1)
+    assert store.get_best_frame("sid-1") is None
+
+
+class FakeRedis:
+    """The slice of redis.Redis that RedisSessionStore uses; values come back as bytes"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value.encode() if isinstance(value, str) else bytes(value), time.monotonic() + ex)
+        self.ttls[key] = ex
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def mget(self, *keys):
+        return [self.get(key) for key in keys]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+
+    def execute(self):
+        for args, kwargs in self.commands:
+            self.client.set(*args, **kwargs)
+        self.commands = []
+
+
+def check_redis_store(store):
+    store.clear("sid-1")
+    store.put_best_frame("sid-1", FRAME_BYTES, META)
+    store.put_stats("sid-1", {"frame_count": 42})
+    assert store.get_best_frame("sid-1") == (FRAME_BYTES, META)
+    assert store.get_stats("sid-1") == {"frame_count": 42}
+    assert store.get_best_frame("sid-2") is None and store.get_stats("sid-2") is None
+
+    store.clear("sid-1")
+    assert store.get_best_frame("sid-1") is None
+    assert store.get_stats("sid-1") is None
+
+
+def test_session_store_is_abstract():
+    """Backends must implement every operation"""
+    with pytest.raises(TypeError):
+        SessionStore()
+
+    class Partial(SessionStore):
+        def put_best_frame(self, sid, frame_bytes, meta):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_redis_store_round_trip():
+    """RedisSessionStore keys, TTLs and encoding, against a fake client"""
+    client = FakeRedis()
+    store = RedisSessionStore(ttl=30.5, prefix="test:", client=client)
+    check_redis_store(store)
+
+    store.put_best_frame("sid-1", bytearray(FRAME_BYTES), META)
+    store.put_stats("sid-1", {"frame_count": 1})
+    assert client.ttls == {"test:sid-1:frame": 30, "test:sid-1:frame_meta": 30, "test:sid-1:stats": 30}
+
+    # A frame whose metadata is gone (expired or cleared mid-write) is not served
+    client.delete("test:sid-1:frame_meta")
+    assert store.get_best_frame("sid-1") is None
+
+
+def test_real_redis_round_trip():
+    """Same checks against a live server, when one is configured"""
+    url = os.getenv("REDIS_URL")
+    if not url or importlib.util.find_spec("redis") is None:
+        pytest.skip("set REDIS_URL and install the redis extra (uv sync --extra redis) to run")
+    check_redis_store(RedisSessionStore(url, ttl=60, prefix="tryon:test:"))
+
+
+def test_any_node_serves_best_frame():
+    """A node that doesn't hold the session answers from the shared store"""
+    store = InMemorySessionStore()
+    node_a, _ = create_app(session_store=store, warmup=False)
+    node_b, _ = create_app(session_store=store, warmup=False)
+
+    # What node A publishes when its session's winning frame changes
+    node_a.session_store.put_best_frame("remote-sid", FRAME_BYTES, META)
+    node_a.session_store.put_stats("remote-sid", {"node": "node-a", "frame_count": 30})
+
+    client = node_b.test_client()
+    response = client.get('/api/best-frame?session_id=remote-sid')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["success"] is True
+    assert body["confidence"] == META["confidence"]
+    assert body["stats"]["node"] == "node-a"
+    assert base64.b64decode(body["best_frame"].split(',')[1]) == FRAME_BYTES
+
+    response = client.get('/api/best-frame?session_id=remote-sid&format=jpeg')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/jpeg'
+    assert response.data == FRAME_BYTES
+
+    assert client.get('/api/best-frame?session_id=unknown-sid').status_code == 404
+
+
+if __name__ == "__main__":
+    print("🗄️ Shared Session Store Test")
+    print("=" * 50)
+    test_store_round_trip()
+    test_store_expiry()
+    test_session_store_is_abstract()
+    test_redis_store_round_trip()
+    test_any_node_serves_best_frame()
+    print("✅ Best frames are shared across nodes")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test that stream restarts and disconnects never reset a detector mid-frame
+
+start_stream resets the session's detector and disconnect recycles it, which
+resets it too. Both must wait for a frame already running on a dispatcher
+worker, or leave the detector alone if it doesn't finish in time, and
+start_stream must not let a frame sent during the reset run at all.
+"""
+
+import threading
+import time
+
+from app import create_app
+from config import Config
+from fake_pose import ScriptedPosePool
+from services.realtime_detection import RealtimeBodyDetector
+from services.session_store import InMemorySessionStore
+
+
+class SlowFrames:
+    """Stands in for a session's process_frame and reset; records resets and frames that overlap"""
+
+    def __init__(self, detector):
+        self.running = threading.Event()
+        self.release = threading.Event()
+        self.resetting = threading.Event()
+        self.resets = []
+        self.frames = []
+        self.during_reset = None  # Called mid-reset, e.g. to send a frame
+        self._reset = detector.reset
+        detector.process_frame = self.process_frame
+        detector.reset = self.reset
+
+    def process_frame(self, frame_data):
+        self.frames.append("during reset" if self.resetting.is_set() else "idle")
+        self.running.set()
+        self.release.wait(5.0)
+        self.running.clear()
+        return {"error": "test frame"}
+
+    def reset(self):
+        self.resets.append("during frame" if self.running.is_set() else "idle")
+        self.resetting.set()
+        if self.during_reset is not None:
+            self.during_reset()
+            time.sleep(0.1)  # Long enough for a worker to pick the frame up
+        self._reset()
+        self.resetting.clear()
+
+
+def start_session():
+    app, socketio = create_app(session_store=InMemorySessionStore(), warmup=False)
+    app.detector_pool._factory = lambda: RealtimeBodyDetector(inference_pool=ScriptedPosePool(), detection_mode="strict")
+    client = socketio.test_client(app)
+    client.emit('start_stream', {'detection_mode': 'strict'})
+    sid = socketio.server.manager.sid_from_eio_sid(client.eio_sid, '/')
+    frames = SlowFrames(app.detector_pool.get(sid))
+    app.frame_dispatcher.submit(sid, ("frame", None))
+    assert frames.running.wait(2.0)
+    return app, client, sid, frames
+
+
+def test_restart_waits_for_running_frame():
+    app, client, sid, frames = start_session()
+    try:
+        threading.Timer(0.1, frames.release.set).start()
+        client.emit('start_stream', {'detection_mode': 'strict'})
+        assert frames.resets == ["idle"]
+        assert any(message['name'] == 'stream_started' for message in client.get_received())
+    finally:
+        frames.release.set()
+        app.frame_dispatcher.shutdown()
+
+
+def test_restart_refused_while_frame_still_running():
+    app, client, sid, frames = start_session()
+    timeout, Config.FRAME_DRAIN_TIMEOUT = Config.FRAME_DRAIN_TIMEOUT, 0.05
+    try:
+        client.get_received()
+        client.emit('start_stream', {'detection_mode': 'strict'})
+        assert frames.resets == []
+        assert [message['name'] for message in client.get_received()] == ['stream_error']
+    finally:
+        Config.FRAME_DRAIN_TIMEOUT = timeout
+        frames.release.set()
+        app.frame_dispatcher.shutdown()
+
+
+def test_restart_drops_frames_sent_during_reset():
+    """A frame that arrives while start_stream resets the detector never runs"""
+    app, client, sid, frames = start_session()
+    try:
+        frames.release.set()
+        frames.during_reset = lambda: app.frame_dispatcher.submit(sid, ("frame", None))
+        client.emit('start_stream', {'detection_mode': 'strict'})
+        assert frames.resets == ["idle"]
+        assert frames.frames == ["idle"]
+        # Once the stream has restarted, frames run again
+        app.frame_dispatcher.submit(sid, ("frame", None))
+        deadline = time.monotonic() + 2.0
+        while len(frames.frames) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert frames.frames == ["idle", "idle"]
+    finally:
+        frames.release.set()
+        app.frame_dispatcher.shutdown()
+
+
+def test_disconnect_waits_before_recycling():
+    app, client, sid, frames = start_session()
+    try:
+        threading.Timer(0.1, frames.release.set).start()
+        client.disconnect()
+        assert frames.resets == ["idle"]
+        assert app.detector_pool.get(sid) is None
+    finally:
+        frames.release.set()
+        app.frame_dispatcher.shutdown()
+
+
+def test_disconnect_leaves_busy_detector_to_eviction():
+    app, client, sid, frames = start_session()
+    timeout, Config.FRAME_DRAIN_TIMEOUT = Config.FRAME_DRAIN_TIMEOUT, 0.05
+    try:
+        client.disconnect()
+        assert frames.resets == []
+        assert app.detector_pool.get(sid) is not None
+    finally:
+        Config.FRAME_DRAIN_TIMEOUT = timeout
+        frames.release.set()
+        app.frame_dispatcher.shutdown()
+
+
+if __name__ == "__main__":
+    print("🔁 Stream Lifecycle Test")
+    print("=" * 50)
+    test_restart_waits_for_running_frame()
+    test_restart_refused_while_frame_still_running()
+    test_restart_drops_frames_sent_during_reset()
+    test_disconnect_waits_before_recycling()
+    test_disconnect_leaves_busy_detector_to_eviction()
+    print("✅ Detectors are never reset mid-frame")
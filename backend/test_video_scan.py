@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Test parallel chunked scanning of uploaded videos
+
+Checks how videos are split into frame ranges and sampled, where faces are
+searched, which frames the coarse-to-fine search re-scans, that a range scan
+starts on exactly the right frame, and - where OpenCV ships its Haar
+cascades - that a scan split across worker processes, or seeking between
+samples instead of grabbing, picks the same frame as a single pass, and that
+the coarse-to-fine search only returns frames meeting the STRICT criteria.
+"""
+
+import os
+import tempfile
+
+import cv2
+import numpy as np
+import pytest
+
+from replay_benchmark import DEFAULT_VIDEO_IMAGES_DIR, load_frames
+from services.body_detection import (
+    DEFAULT_FRAME_STRIDE, SCAN_PROFILES, _detect, _scan_settings, _seek, calculate_detection_quality,
+    cascades_available, configure_video_scan, detect_body_pose_in_video, face_search_regions,
+    refine_frame_numbers, sample_stride, score_frame, split_frame_ranges
+)
+
+NO_CASCADES = "This OpenCV build ships without its Haar cascade files"
+
+
+def write_video(path, frames_per_image=30, size=(320, 180)):
+    """A short clip of the frontend's photos, each drifting for frames_per_image frames"""
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 25, size)
+    for frame_bytes in load_frames(DEFAULT_VIDEO_IMAGES_DIR):
+        image = cv2.imdecode(np.frombuffer(frame_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        scale = 0.9 * min(width / image.shape[1], height / image.shape[0])
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        for i in range(frames_per_image):
+            offset = i % 8
+            canvas = np.full((height, width, 3), 128, dtype=np.uint8)
+            canvas[offset:offset + image.shape[0], offset:offset + image.shape[1]] = image
+            writer.write(canvas)
+    writer.release()
+    return path
+
+
+def test_split_frame_ranges():
+    """Contiguous ranges of at least the minimum size, the last one open-ended"""
+    assert split_frame_ranges(120, 4) == [(0, 30), (30, 60), (60, 90), (90, None)]
+    assert split_frame_ranges(100, 3) == [(0, 33), (33, 66), (66, None)]
+    assert split_frame_ranges(120, 8, min_chunk_frames=50) == [(0, 60), (60, None)]
+    assert split_frame_ranges(30, 4, min_chunk_frames=60) == [(0, None)]
+    assert split_frame_ranges(0, 4) == [(0, None)]
+    assert split_frame_ranges(-1, 4) == [(0, None)]
+
+
+def test_sample_stride():
+    """About the requested number of samples for any length; unknown lengths use the default"""
+    assert sample_stride(250, 90) == 3
+    assert sample_stride(25 * 600, 90) == 167
+    assert sample_stride(60, 90) == 1
+    assert sample_stride(0, 90) == DEFAULT_FRAME_STRIDE
+    assert sample_stride(250, 0) == DEFAULT_FRAME_STRIDE
+    for frame_count in (90, 250, 1000, 25 * 600):
+        assert frame_count // sample_stride(frame_count, 90) <= 90
+
+
+def test_refine_frame_numbers():
+    """Neighborhoods of the top candidates, valid ones first, clipped to the video"""
+    scores = [(3, 0.9, False), (6, 0.5, True), (9, 0.8, True), (12, 0.8, True), (15, 0.1, False)]
+    assert refine_frame_numbers(scores, 3, 2, 1, 15) == [8, 9, 10, 11, 12, 13]
+    assert refine_frame_numbers(scores, 3, 1, 0, 15) == [9]
+    # Spread over the half-gap to the neighboring samples
+    assert refine_frame_numbers([(100, 0.9, True)], 40, 1, 2, 1000) == [80, 90, 100, 110, 120]
+    assert refine_frame_numbers([(2, 0.9, True)], 4, 1, 2, 3) == [1, 2, 3]
+    assert refine_frame_numbers([], 3, 5, 2, 100) == []
+
+
+def test_face_search_regions():
+    """Faces are searched in and above each body, merged when the regions mostly overlap"""
+    assert face_search_regions([], 640, 480) == []
+    # Widened by a quarter a side, extended up by half the height, clipped to the frame
+    assert face_search_regions([(200, 200, 100, 200)], 640, 480) == [(175, 100, 325, 400)]
+    assert face_search_regions([(10, 50, 100, 200)], 640, 480) == [(0, 0, 135, 250)]
+    # Far apart: searched separately
+    assert face_search_regions([(40, 200, 80, 160), (500, 200, 80, 160)], 640, 480) == [
+        (20, 120, 140, 360), (480, 120, 600, 360)
+    ]
+    # Nearly the same body: one covering region
+    assert face_search_regions([(200, 200, 100, 200), (205, 210, 100, 190)], 640, 480) == [(175, 100, 330, 400)]
+
+
+class BlobCascade:
+    """Cascade stand-in that "detects" solid blobs of one gray level in whatever image it's given"""
+
+    def __init__(self, level=None):
+        self.level = level
+        self.images = []
+
+    def detectMultiScale(self, image, scale_factor, min_neighbors, minSize):
+        self.images.append(image.shape)
+        if self.level is None:
+            return ()
+        count, _, stats, _ = cv2.connectedComponentsWithStats((image == self.level).astype(np.uint8))
+        return [tuple(box) for box in stats[1:count, :4].tolist()
+                if box[2] >= minSize[0] and box[3] >= minSize[1]]
+
+
+def blob_frame(body=None, faces=()):
+    """A dark 640x480 frame with a bright body box and mid-gray face boxes painted on it"""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    if body:
+        x, y, w, h = body
+        frame[y:y + h, x:x + w] = 200
+    for x, y, w, h in faces:
+        frame[y:y + h, x:x + w] = 100
+    # score_frame equalizes the histogram first: find out where the two levels end up
+    gray = cv2.equalizeHist(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    body_level = gray[body[1], body[0]] if body else None
+    face_level = gray[faces[0][1], faces[0][0]] if faces else None
+    cascades = {"face": BlobCascade(face_level), "face_alt": BlobCascade(),
+                "body": BlobCascade(body_level), "upper_body": BlobCascade()}
+    return frame, cascades
+
+
+def test_faces_outside_bodies_are_not_counted():
+    """
+    Faces are only searched around bodies, so a face outside every body region
+    no longer adds to face_confidence or the quality score
+    """
+    body, inner_face, outer_face = (250, 100, 140, 340), (300, 120, 36, 36), (40, 40, 36, 36)
+    frame, cascades = blob_frame(body, [inner_face, outer_face])
+    score = score_frame(frame, cascades)
+    assert score["bodies"].tolist() == [list(body)]
+    assert score["faces"].tolist() == [list(inner_face)]
+    assert score["face_confidence"] == 0.25
+    # A face search over the whole frame finds both faces, and would score higher
+    gray = cv2.equalizeHist(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    everywhere = _detect(gray, cascades, SCAN_PROFILES["strict"]["faces"], 1.0)
+    assert sorted(everywhere.tolist()) == sorted([list(inner_face), list(outer_face)])
+    assert score["quality_score"] < calculate_detection_quality(frame, everywhere, score["bodies"])
+
+    # No body: the face cascades don't run at all, so a lone face counts for nothing
+    frame, cascades = blob_frame(faces=[outer_face])
+    score = score_frame(frame, cascades)
+    assert len(score["faces"]) == 0 and score["face_confidence"] == 0.0
+    assert cascades["face"].images == []
+
+
+def test_seek_lands_on_frame():
+    """A range scan starts on the same frame a sequential read reaches"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_video(os.path.join(tmp, 'clip.mp4'))
+        capture = cv2.VideoCapture(path)
+        sequential = []
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            sequential.append(frame)
+        capture.release()
+
+        for index in (1, 29, 30, 61, len(sequential) - 1):
+            capture = cv2.VideoCapture(path)
+            _seek(capture, index)
+            ok, frame = capture.read()
+            capture.release()
+            assert ok and np.array_equal(frame, sequential[index]), f"seek to {index} landed elsewhere"
+
+
+def test_chunked_scan_matches_single_pass():
+    """Splitting a scan across processes, or seeking between samples, selects the same best frame"""
+    if not cascades_available():
+        pytest.skip(NO_CASCADES)
+    saved = dict(_scan_settings)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_video(os.path.join(tmp, 'clip.mp4'))
+        options = {"samples": 20, "time_budget": 0, "coarse_size": 0}
+        try:
+            configure_video_scan(min_chunk_frames=20, seek_seconds=0)
+            single = detect_body_pose_in_video(path, workers=1, **options)
+            chunked = detect_body_pose_in_video(path, workers=3, **options)
+            configure_video_scan(seek_seconds=0.1)
+            seeking = detect_body_pose_in_video(path, workers=1, **options)
+        finally:
+            configure_video_scan(**saved)
+
+    assert "Error" not in single["message"], single["message"]
+    assert single["frames_analyzed"] == chunked["frames_analyzed"] == seeking["frames_analyzed"] == 20
+    for key in ("success", "confidence", "frame_number", "annotations", "best_frame"):
+        assert chunked.get(key) == single.get(key), key
+        assert seeking.get(key) == single.get(key), key
+
+
+def test_coarse_to_fine_search():
+    """Only candidate neighborhoods get the STRICT pass, and what it returns meets the criteria"""
+    if not cascades_available():
+        pytest.skip(NO_CASCADES)
+    saved = dict(_scan_settings)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_video(os.path.join(tmp, 'clip.mp4'))
+        options = {"samples": 20, "time_budget": 0, "coarse_size": 160}
+        try:
+            configure_video_scan(min_chunk_frames=20, candidates=2, refine_radius=1)
+            single = detect_body_pose_in_video(path, workers=1, **options)
+            chunked = detect_body_pose_in_video(path, workers=3, **options)
+            configure_video_scan(candidates=5, refine_radius=2)
+            # 5 candidates x 5 frames would cover more than the 20 samples
+            short = detect_body_pose_in_video(path, workers=1, **options)
+        finally:
+            configure_video_scan(**saved)
+
+    assert "Error" not in single["message"], single["message"]
+    assert short["frames_strict"] == short["frames_analyzed"] == 20
+    assert single["frames_strict"] <= 2 * 3
+    assert single["frames_analyzed"] == 20 + single["frames_strict"]
+    if single["success"]:
+        assert single["confidence"] >= 0.7
+        assert single["annotations"]["full_body_validation"]["is_valid"]
+    for key in ("success", "confidence", "frame_number", "frames_analyzed", "best_frame"):
+        assert chunked.get(key) == single.get(key), key
+
+
+if __name__ == "__main__":
+    print("🎬 Video Scan Test")
+    print("=" * 50)
+    test_split_frame_ranges()
+    print("✅ Frame ranges")
+    test_sample_stride()
+    print("✅ Sample stride")
+    test_refine_frame_numbers()
+    print("✅ Refine frame numbers")
+    test_face_search_regions()
+    print("✅ Face search regions")
+    test_faces_outside_bodies_are_not_counted()
+    print("✅ Faces outside bodies are not counted")
+    test_seek_lands_on_frame()
+    print("✅ Range scans start on the right frame")
+    if cascades_available():
+        test_chunked_scan_matches_single_pass()
+        print("✅ Chunked scan matches a single pass")
+        test_coarse_to_fine_search()
+        print("✅ Coarse-to-fine search")
+    else:
+        print(f"⚠️ Skipped the full scans: {NO_CASCADES}")
@@ -0,0 +1,79 @@
+"""
+Background warm-up and readiness tracking
+
+create_app() starts warm-up on background threads, so the process serves
+/health straight away while /ready only reports ready once every component
+is warm:
+
+    detector  idle detectors built and a blank frame run through each graph
+    mongo     the MongoDB server answered a ping
+    http      pooled connections opened to the external APIs
+
+A step that raises is retried every retry_interval seconds until it
+succeeds, so a node whose database comes up late becomes ready on its own.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Thread-safe per-component warm-up state"""
+
+    def __init__(self, components: Iterable[str]):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = {
+            name: {"ready": False, "detail": "pending", "attempts": 0} for name in components
+        }
+
+    def mark(self, name: str, ready: bool, detail=None, elapsed_ms: float = None):
+        with self._lock:
+            state = self._state.setdefault(name, {"ready": False, "detail": "pending", "attempts": 0})
+            state["ready"] = ready
+            state["detail"] = detail
+            state["attempts"] += 1
+            if elapsed_ms is not None:
+                state["elapsed_ms"] = round(elapsed_ms, 1)
+
+    def is_ready(self) -> bool:
+        with self._lock:
+            return all(state["ready"] for state in self._state.values())
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: dict(state) for name, state in self._state.items()}
+
+
+def start_warmup(readiness: Readiness, steps: List[Tuple[str, Callable[[], object]]],
+                 retry_interval: float = 5.0) -> List[threading.Thread]:
+    """
+    Run each (name, fn) warm-up step on its own daemon thread
+
+    fn's return value is reported as the component's detail; an exception
+    marks the component not ready and the step is retried.
+    """
+    def run(name, fn):
+        while True:
+            started = time.perf_counter()
+            try:
+                detail = fn()
+            except Exception as e:
+                readiness.mark(name, False, f"{type(e).__name__}: {e}", (time.perf_counter() - started) * 1000)
+                logger.warning("Warm-up of %s failed, retrying in %.0fs: %s", name, retry_interval, e)
+                time.sleep(retry_interval)
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            readiness.mark(name, True, detail, elapsed_ms)
+            logger.info("Warm-up of %s done in %.0f ms", name, elapsed_ms)
+            return
+
+    threads = [
+        threading.Thread(target=run, args=(name, fn), name=f"warmup-{name}", daemon=True)
+        for name, fn in steps
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
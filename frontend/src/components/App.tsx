@@ -389,18 +389,8 @@ function App() {
     setLoading(true);
 
     try {
-      // Convert base64 data URL to a file for upload
-      const base64Data = selectedFrame.replace(
-        /^data:image\/[a-z]+;base64,/,
-        ""
-      );
-      const byteCharacters = atob(base64Data);
-      const byteNumbers = new Array(byteCharacters.length);
-      for (let i = 0; i < byteCharacters.length; i++) {
-        byteNumbers[i] = byteCharacters.charCodeAt(i);
-      }
-      const byteArray = new Uint8Array(byteNumbers);
-      const blob = new Blob([byteArray], { type: "image/jpeg" });
+      // Read the frame URL (data: or blob:) into a file for upload
+      const blob = await (await fetch(selectedFrame)).blob();
 
       const formData = new FormData();
       formData.append("person_image", blob, "detected_frame.jpg");
@@ -198,6 +198,9 @@ const RealtimeStreaming: React.FC<RealtimeStreamingProps> = ({
 
   const selectCurrentFrame = () => {
     if (currentFrame && detectionQuality) {
+      // Selected frames outlive the stream's per-frame URLs
+      streamingServiceRef.current?.retainFrame(currentFrame);
+      streamingServiceRef.current?.retainFrame(cleanFrame);
       onFrameSelected?.(cleanFrame || currentFrame, {
         annotated_frame: currentFrame,
         clean_frame: cleanFrame || currentFrame,
@@ -96,6 +96,9 @@ const SeamlessVideoStream: React.FC<SeamlessVideoStreamProps> = ({
 
             // Use current frame (which should be the best one)
             if (currentFrame) {
+              // Selected frames outlive the stream's per-frame URLs
+              streamingServiceRef.current?.retainFrame(currentFrame);
+              streamingServiceRef.current?.retainFrame(cleanFrame);
               onFrameSelected?.(cleanFrame || currentFrame, {
                 // Use clean frame if available, fallback to annotated
                 annotated_frame: currentFrame,
@@ -497,6 +500,9 @@ const SeamlessVideoStream: React.FC<SeamlessVideoStreamProps> = ({
             onClick={() => {
               stopStreaming();
               if (currentFrame) {
+                // Selected frames outlive the stream's per-frame URLs
+                streamingServiceRef.current?.retainFrame(currentFrame);
+                streamingServiceRef.current?.retainFrame(cleanFrame);
                 onFrameSelected?.(cleanFrame || currentFrame, {
                   // Use clean frame if available
                   annotated_frame: currentFrame,
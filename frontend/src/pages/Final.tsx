@@ -185,15 +185,8 @@ const Final = () => {
         throw new Error("No user photo available for try-on");
       }
 
-      // Convert base64 data URL to a file for upload
-      const base64Data = userPhoto.replace(/^data:image\/[a-z]+;base64,/, "");
-      const byteCharacters = atob(base64Data);
-      const byteNumbers = new Array(byteCharacters.length);
-      for (let i = 0; i < byteCharacters.length; i++) {
-        byteNumbers[i] = byteCharacters.charCodeAt(i);
-      }
-      const byteArray = new Uint8Array(byteNumbers);
-      const blob = new Blob([byteArray], { type: "image/jpeg" });
+      // Read the photo URL (data: or blob:) into a file for upload
+      const blob = await (await fetch(userPhoto)).blob();
 
       // Convert relative URL to absolute URL for the backend
       const garmentUrl = itemToTryOn.image_url.startsWith("http")
@@ -271,15 +264,8 @@ const Final = () => {
         throw new Error("No user photo available for try-on");
       }
 
-      // Convert base64 data URL to a file for upload
-      const base64Data = userPhoto.replace(/^data:image\/[a-z]+;base64,/, "");
-      const byteCharacters = atob(base64Data);
-      const byteNumbers = new Array(byteCharacters.length);
-      for (let i = 0; i < byteCharacters.length; i++) {
-        byteNumbers[i] = byteCharacters.charCodeAt(i);
-      }
-      const byteArray = new Uint8Array(byteNumbers);
-      const blob = new Blob([byteArray], { type: "image/jpeg" });
+      // Read the photo URL (data: or blob:) into a file for upload
+      const blob = await (await fetch(userPhoto)).blob();
 
       // Convert relative URL to absolute URL for the backend
       const garmentUrl = itemToTryOn.image_url.startsWith("http")
@@ -14,6 +14,7 @@ import { toast } from "sonner";
 import StreamingService from "../services/streamingService";
 import type {
   AnnotatedFrameData,
+  CaptureCompleteData,
   DetectionQuality,
 } from "../services/streamingService";
 
@@ -71,6 +72,7 @@ const TakePhoto: React.FC<TakePhotoProps> = () => {
 
   const videoRef = useRef<HTMLVideoElement>(null);
   const streamingServiceRef = useRef<StreamingService | null>(null);
+  const retainedFrameRef = useRef<string | null>(null);
   const streamRef = useRef<MediaStream | null>(null);
   const autoStopTimeoutRef = useRef<NodeJS.Timeout | null>(null);
 
@@ -202,10 +204,21 @@ const TakePhoto: React.FC<TakePhotoProps> = () => {
           data.confidence > confidence &&
           data.full_body_validation?.is_valid
         ) {
-          setBestFrame(data.clean_frame || data.annotated_frame);
+          // Keep the best frame's URL alive past the frames that follow it
+          const frame = service.retainFrame(
+            data.clean_frame || data.annotated_frame
+          );
+          service.releaseFrame(retainedFrameRef.current);
+          retainedFrameRef.current = frame;
+          setBestFrame(frame);
         }
       });
 
+      // Server-side auto-capture: the pose has been valid and steady, so finish now
+      service.setOnCaptureComplete((data: CaptureCompleteData) => {
+        stopStreamingAndCapture(data.best_frame);
+      });
+
       service.setOnError((errorMsg: string) => {
         console.error("Streaming error:", errorMsg);
         toast.error(errorMsg);
@@ -287,6 +300,7 @@ const TakePhoto: React.FC<TakePhotoProps> = () => {
         detection_mode: "realtime",
         confidence_threshold: confidenceThreshold,
         frame_rate: 15,
+        auto_capture: true,
       });
 
       setTimeout(() => {
@@ -298,7 +312,7 @@ const TakePhoto: React.FC<TakePhotoProps> = () => {
     }
   };
 
-  const stopStreamingAndCapture = () => {
+  const stopStreamingAndCapture = (capturedFrame?: string) => {
     try {
       if (autoStopTimeoutRef.current) {
         clearTimeout(autoStopTimeoutRef.current);
@@ -321,9 +335,10 @@ const TakePhoto: React.FC<TakePhotoProps> = () => {
         videoRef.current.srcObject = null;
       }
 
-      // Use the best frame captured
-      const finalFrame = bestFrame || cleanFrame || currentFrame;
+      // Use the frame the server froze, else the best frame captured
+      const finalFrame = capturedFrame || bestFrame || cleanFrame || currentFrame;
       if (finalFrame) {
+        streamingServiceRef.current?.retainFrame(finalFrame);
         setBestFrame(finalFrame);
         setDetectionComplete(true);
         setIsAutoCapturing(false);
@@ -350,6 +365,8 @@ const TakePhoto: React.FC<TakePhotoProps> = () => {
   const proceedToNextStep = () => {
     // Pass the captured frame data to the next page
     const frameToPass = bestFrame || cleanFrame || currentFrame;
+    // Leaving the page disconnects, which revokes frame URLs nothing retained
+    streamingServiceRef.current?.retainFrame(frameToPass);
 
     if (!frameToPass) {
       toast.error("No photo captured. Please try the detection again.");
@@ -502,7 +519,7 @@ const TakePhoto: React.FC<TakePhotoProps> = () => {
                         <Button
                           variant="secondary"
                           size="lg"
-                          onClick={stopStreamingAndCapture}
+                          onClick={() => stopStreamingAndCapture()}
                           className="w-full"
                         >
                           Stop & Use Current Pose
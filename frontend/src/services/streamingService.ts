@@ -50,8 +50,8 @@ export interface PoseLandmark {
 }
 
 export interface AnnotatedFrameData {
-  annotated_frame: string;
-  clean_frame: string; // Clean frame without annotations for try-on processing
+  annotated_frame: string; // Image URL: blob: with binary transport, data: with base64
+  clean_frame: string; // Client's own frame echoed back; null when clean_frame_mode is "omit"
   confidence: number;
   frame_number: number;
   timestamp: number;
@@ -61,12 +61,48 @@ export interface AnnotatedFrameData {
   eyes: BodyPart[];
   pose_landmarks: PoseLandmark[];
   full_body_validation?: FullBodyValidation;
+  frame_id?: string | number; // Echo of the frame_id sent with video_frame, if any
+  dropped_frames?: number; // Frames replaced by newer ones before processing
+  stale_frames?: number; // Frames skipped for waiting too long in the queue
+  queue_wait_ms?: number;
+  frame_size?: { width: number; height: number };
+  motion_skipped?: boolean; // Pose reused from a near-identical earlier frame
+  timings?: Record<string, number>; // Per-stage ms, only when include_timings is set
 }
 
+// Server-suggested capture settings, sent as load changes
+export interface RateHint {
+  fps: number;
+  jpeg_quality: number; // canvas.toBlob / toDataURL quality, 0-1
+  process_ms: number; // Server's smoothed processing time for this session
+  load: number; // Share of server workers the hinted rates add up to
+  backlog: boolean; // Frames were being dropped when the hint was computed
+}
+
+// Sent once an auto_capture stream has held a valid, steady pose
+export interface CaptureCompleteData {
+  best_frame: string; // Clean frame for try-on (bytes on the binary transport, normalized to a data URL)
+  confidence: number;
+  is_valid: boolean;
+  score: number;
+  frame_count: number; // Frames the server processed for this stream
+  jitter: number | null; // Landmark jitter over the stable frames
+  session_id: string;
+  stop_streaming: boolean;
+}
+
+export type FrameTransport = "base64" | "binary";
+
 export interface StreamConfig {
   detection_mode?: "realtime" | "strict" | "performance";
+  transport?: FrameTransport;
+  clean_frame_mode?: "echo" | "omit"; // "omit" skips clean_frame; use /api/best-frame instead
+  render_mode?: "image" | "vector"; // "vector" skips annotated_frame; draw from landmarks
   confidence_threshold?: number;
-  frame_rate?: number;
+  frame_rate?: number; // Maximum capture rate; rate_hint events may lower it
+  include_timings?: boolean; // Ask for per-stage server timings on each frame
+  adaptive_rate?: boolean; // Follow the server's rate_hint events (default true)
+  auto_capture?: boolean; // Let the server end the stream once the pose is valid and steady
 }
 
 interface StreamStartedData {
@@ -74,6 +110,8 @@ interface StreamStartedData {
   message: string;
   detection_mode: string;
   confidence_threshold: number;
+  transport?: FrameTransport; // Missing on older backends, which only speak base64
+  session_id?: string; // Pass as ?session_id= to /api/best-frame
 }
 
 interface StreamStoppedData {
@@ -81,6 +119,8 @@ interface StreamStoppedData {
   message: string;
 }
 
+type FrameField = "annotated_frame" | "clean_frame";
+
 interface ErrorData {
   error: string;
 }
@@ -89,11 +129,22 @@ class StreamingService {
   private socket: ReturnType<typeof io> | null = null;
   private isConnected = false;
   private isStreaming = false;
-  private frameRate = 15; // FPS
+  private frameRate = 15; // Current capture FPS
+  private maxFrameRate = 15; // FPS asked for in startStream
+  private jpegQuality = 0.8;
+  private adaptiveRate = true;
+  private transport: FrameTransport = "base64";
   private frameInterval: number | null = null;
   private videoElement: HTMLVideoElement | null = null;
   private canvas: HTMLCanvasElement | null = null;
   private ctx: CanvasRenderingContext2D | null = null;
+  private captureFrame: (() => void) | null = null;
+  // Object URLs of the latest binary frames, revoked when the next frame replaces them
+  private frameUrls: Record<FrameField, string | null> = {
+    annotated_frame: null,
+    clean_frame: null,
+  };
+  private retainedUrls = new Set<string>();
 
   // Event callbacks
   private onConnected?: () => void;
@@ -102,6 +153,8 @@ class StreamingService {
   private onStreamStarted?: () => void;
   private onStreamStopped?: () => void;
   private onError?: (error: string) => void;
+  private onRateHint?: (hint: RateHint) => void;
+  private onCaptureComplete?: (data: CaptureCompleteData) => void;
 
   constructor() {
     this.setupCanvas();
@@ -139,6 +192,7 @@ class StreamingService {
 
         this.socket.on("stream_started", (data: StreamStartedData) => {
           console.log("Stream started:", data);
+          this.transport = data.transport || "base64";
           this.isStreaming = true;
           this.onStreamStarted?.();
         });
@@ -150,6 +204,7 @@ class StreamingService {
         });
 
         this.socket.on("annotated_frame", (data: AnnotatedFrameData) => {
+          data = this.normalizeFrameData(data);
           console.log("📡 Received annotated frame from backend:", {
             hasFrame: !!data.annotated_frame,
             confidence: data.confidence,
@@ -158,6 +213,24 @@ class StreamingService {
           this.onAnnotatedFrame?.(data);
         });
 
+        this.socket.on("rate_hint", (hint: RateHint) => {
+          this.applyRateHint(hint);
+        });
+
+        this.socket.on("capture_complete", (data: CaptureCompleteData) => {
+          console.log("📸 Capture complete:", {
+            confidence: data.confidence,
+            frameCount: data.frame_count,
+          });
+          // The server has frozen its best frame and ignores further frames
+          this.stopFrameCapture();
+          this.isStreaming = false;
+          this.onCaptureComplete?.({
+            ...data,
+            best_frame: this.toDataUrl(data.best_frame),
+          });
+        });
+
         this.socket.on("frame_error", (data: ErrorData) => {
           console.error("Frame processing error:", data);
           this.onError?.(data.error || "Frame processing error");
@@ -187,6 +260,9 @@ class StreamingService {
     this.isConnected = false;
     this.isStreaming = false;
     this.stopFrameCapture();
+    this.revokeFrameUrl(this.frameUrls.annotated_frame);
+    this.revokeFrameUrl(this.frameUrls.clean_frame);
+    this.frameUrls = { annotated_frame: null, clean_frame: null };
   }
 
   startStream(config: StreamConfig = {}): void {
@@ -198,9 +274,17 @@ class StreamingService {
       detection_mode: config.detection_mode || "realtime",
       confidence_threshold: config.confidence_threshold || 0.7,
       frame_rate: config.frame_rate || this.frameRate,
+      transport: config.transport || "binary",
+      clean_frame_mode: config.clean_frame_mode || "echo",
+      render_mode: config.render_mode || "image",
+      include_timings: config.include_timings || false,
+      auto_capture: config.auto_capture || false,
     };
 
     this.frameRate = streamConfig.frame_rate;
+    this.maxFrameRate = streamConfig.frame_rate;
+    this.jpegQuality = 0.8;
+    this.adaptiveRate = config.adaptive_rate ?? true;
     this.socket.emit("start_stream", streamConfig);
   }
 
@@ -255,8 +339,25 @@ class StreamingService {
         // Draw video frame to canvas
         this.ctx.drawImage(this.videoElement, 0, 0);
 
+        if (this.transport === "binary") {
+          // Send raw JPEG bytes as a binary attachment
+          this.canvas.toBlob(
+            (blob) => {
+              if (!blob || !this.socket) return;
+              blob
+                .arrayBuffer()
+                .then((buffer) =>
+                  this.socket?.emit("video_frame", { frame: buffer })
+                );
+            },
+            "image/jpeg",
+            this.jpegQuality
+          );
+          return;
+        }
+
         // Convert to base64
-        const frameData = this.canvas.toDataURL("image/jpeg", 0.8);
+        const frameData = this.canvas.toDataURL("image/jpeg", this.jpegQuality);
 
         // Send frame to backend
         this.socket.emit("video_frame", { frame: frameData });
@@ -265,7 +366,8 @@ class StreamingService {
       }
     };
 
-    // Start frame capture at specified frame rate
+    // Start frame capture at the current frame rate
+    this.captureFrame = captureFrame;
     this.frameInterval = window.setInterval(
       captureFrame,
       1000 / this.frameRate
@@ -273,6 +375,31 @@ class StreamingService {
     console.log("✅ Frame capture started");
   }
 
+  // Follow the server's suggested rate and quality, never above what startStream asked for
+  private applyRateHint(hint: RateHint): void {
+    this.onRateHint?.(hint);
+    if (!this.adaptiveRate) return;
+
+    const frameRate = Math.min(this.maxFrameRate, Math.max(1, hint.fps));
+    this.jpegQuality = Math.min(1, Math.max(0.1, hint.jpeg_quality));
+    if (frameRate === this.frameRate) return;
+
+    console.log("⏱️ Server rate hint:", {
+      fps: frameRate,
+      jpegQuality: this.jpegQuality,
+      load: hint.load,
+    });
+    this.frameRate = frameRate;
+    if (this.frameInterval && this.captureFrame) {
+      // Restart the capture timer at the new interval
+      clearInterval(this.frameInterval);
+      this.frameInterval = window.setInterval(
+        this.captureFrame,
+        1000 / this.frameRate
+      );
+    }
+  }
+
   stopFrameCapture(): void {
     if (this.frameInterval) {
       clearInterval(this.frameInterval);
@@ -280,6 +407,52 @@ class StreamingService {
     }
   }
 
+  // capture_complete's best frame is kept and uploaded later, so it stays a data URL
+  private toDataUrl(frame: unknown): string {
+    if (typeof frame === "string" || !frame) return frame as string;
+    const bytes = new Uint8Array(frame as ArrayBuffer);
+    let binary = "";
+    for (let i = 0; i < bytes.length; i += 0x8000) {
+      binary += String.fromCharCode(...bytes.subarray(i, i + 0x8000));
+    }
+    return `data:image/jpeg;base64,${btoa(binary)}`;
+  }
+
+  // Per-frame images skip base64 entirely: the bytes go straight into a Blob
+  private toFrameUrl(field: FrameField, frame: unknown): string {
+    if (typeof frame === "string" || !frame) return frame as string;
+    const bytes = new Uint8Array(frame as ArrayBuffer);
+    const url = URL.createObjectURL(new Blob([bytes], { type: "image/jpeg" }));
+    this.revokeFrameUrl(this.frameUrls[field]);
+    this.frameUrls[field] = url;
+    return url;
+  }
+
+  private revokeFrameUrl(url: string | null): void {
+    if (url && !this.retainedUrls.has(url)) URL.revokeObjectURL(url);
+  }
+
+  private normalizeFrameData(data: AnnotatedFrameData): AnnotatedFrameData {
+    return {
+      ...data,
+      annotated_frame: this.toFrameUrl("annotated_frame", data.annotated_frame),
+      clean_frame: this.toFrameUrl("clean_frame", data.clean_frame),
+    };
+  }
+
+  // Frame URLs are revoked once the next frame arrives; retain one to keep it past that
+  retainFrame(url: string): string {
+    if (url?.startsWith("blob:")) this.retainedUrls.add(url);
+    return url;
+  }
+
+  // Give up a retained frame URL once nothing displays or uploads it any more
+  releaseFrame(url: string | null): void {
+    if (!url || !this.retainedUrls.delete(url)) return;
+    const { annotated_frame, clean_frame } = this.frameUrls;
+    if (url !== annotated_frame && url !== clean_frame) URL.revokeObjectURL(url);
+  }
+
   // Event setters
   setOnConnected(callback: () => void): void {
     this.onConnected = callback;
@@ -305,6 +478,14 @@ class StreamingService {
     this.onError = callback;
   }
 
+  setOnRateHint(callback: (hint: RateHint) => void): void {
+    this.onRateHint = callback;
+  }
+
+  setOnCaptureComplete(callback: (data: CaptureCompleteData) => void): void {
+    this.onCaptureComplete = callback;
+  }
+
   // Getters
   getIsConnected(): boolean {
     return this.isConnected;